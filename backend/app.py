@@ -4,13 +4,25 @@ import os
 from decimal import Decimal
 
 # 导入配置和路由蓝图
-from .config import SECRET_KEY, DEBUG, SESSION_TYPE
+from .config import (
+    SECRET_KEY, DEBUG, SESSION_TYPE, SESSION_FILE_DIR, SESSION_SQLITE_PATH, SESSION_LIFETIME
+)
+from .db import init_db
+from .session import init_session
+from .metrics import init_metrics
+from .querylog import init_query_log
+from .querycheck import init_query_check
+from .profiling import init_profiling
 from .routes.auth import auth_bp
 from .routes.student import student_bp
 from .routes.teacher import teacher_bp
 from .routes.course import course_bp
 from .routes.offering import offering_bp
 from .routes.score import score_bp
+from .routes.metrics import metrics_bp
+from .routes.profiling import profiling_bp
+from .routes.export import export_bp
+from .routes.batch import batch_bp
 
 # 自定义JSON编码器，支持Decimal类型
 class CustomJSONEncoder(json.JSONEncoder):
@@ -24,47 +36,92 @@ class CustomJSONEncoder(json.JSONEncoder):
             return float(obj)  # 将Decimal类型转换为float类型
         return super().default(obj)  # 其他类型使用默认转换
 
-# 创建Flask应用实例
-app = Flask(
-    __name__, 
-    static_folder='../frontend',  # 设置静态文件目录为frontend
-    template_folder='../frontend/templates'  # 设置模板文件目录
-)
-
-# 应用配置
-app.config['SECRET_KEY'] = SECRET_KEY  # 设置密钥，用于会话加密
-app.config['DEBUG'] = DEBUG  # 设置调试模式
-app.config['SESSION_TYPE'] = SESSION_TYPE  # 设置会话类型
-app.json_encoder = CustomJSONEncoder  # 使用自定义JSON编码器
-
-# 启用CORS（跨域资源共享）以允许前端发送请求
-CORS(app, supports_credentials=True)  # supports_credentials=True 允许跨域请求携带Cookie
-
-# 注册蓝图，每个蓝图代表一组相关功能的路由
-app.register_blueprint(auth_bp, url_prefix='/api/auth')  # 认证相关路由
-app.register_blueprint(student_bp, url_prefix='/api/student')  # 学生相关路由
-app.register_blueprint(teacher_bp, url_prefix='/api/teacher')  # 教师相关路由
-app.register_blueprint(course_bp, url_prefix='/api/course')  # 课程相关路由
-app.register_blueprint(offering_bp, url_prefix='/api/offering')  # 授课安排相关路由
-app.register_blueprint(score_bp, url_prefix='/api/score')  # 成绩相关路由
-
-# 前端路由处理
-@app.route('/')
-def index():
-    """首页路由
+def create_app(config=None):
+    """创建并配置Flask应用
     
-    返回前端应用的入口页面
-    """
-    return render_template('index.html')
-
-@app.route('/<path:path>')
-def static_file(path):
-    """静态文件服务
+    每个工作进程调用一次，配置依次来自 backend/config.py（可通过环境变量覆盖）、
+    环境变量 SMS_SETTINGS 指定的配置文件以及参数 config
+    
+    参数:
+        config (dict): 覆盖默认值的配置项，可选
     
-    处理所有其他路由，返回相应的静态文件
-    用于提供前端资源如JS、CSS、图片等
+    返回:
+        Flask: 配置完成的应用实例
     """
-    return send_from_directory('../frontend', path)
+    # 创建Flask应用实例
+    app = Flask(
+        __name__, 
+        static_folder='../frontend',  # 设置静态文件目录为frontend
+        template_folder='../frontend/templates'  # 设置模板文件目录
+    )
+    
+    # 应用配置
+    app.config['SECRET_KEY'] = SECRET_KEY  # 设置密钥，用于会话签名，所有工作进程必须一致
+    app.config['DEBUG'] = DEBUG  # 设置调试模式
+    app.config['SESSION_TYPE'] = SESSION_TYPE  # 设置会话类型
+    app.config['SESSION_FILE_DIR'] = SESSION_FILE_DIR
+    app.config['SESSION_SQLITE_PATH'] = SESSION_SQLITE_PATH
+    app.config['SESSION_LIFETIME'] = SESSION_LIFETIME
+    app.config.from_envvar('SMS_SETTINGS', silent=True)  # 配置文件中的设置优先
+    if config:
+        app.config.update(config)
+    app.json_encoder = CustomJSONEncoder  # 使用自定义JSON编码器
+    
+    # 按会话类型配置会话存储
+    init_session(app)
+    
+    # 请求结束时归还绑定到请求的数据库连接
+    init_db(app)
+    
+    # 收集各路由的耗时、状态码和SQL统计
+    init_metrics(app)
+    
+    # 记录慢查询、出错的SQL和抽样追踪的SQL
+    init_query_log(app)
+    
+    # 调试和测试时检查每个请求的SQL数量，发现N+1查询
+    init_query_check(app)
+    
+    # 管理员可按需对单个请求做性能分析
+    init_profiling(app)
+    
+    # 启用CORS（跨域资源共享）以允许前端发送请求
+    CORS(app, supports_credentials=True)  # supports_credentials=True 允许跨域请求携带Cookie
+    
+    # 注册蓝图，每个蓝图代表一组相关功能的路由
+    app.register_blueprint(auth_bp, url_prefix='/api/auth')  # 认证相关路由
+    app.register_blueprint(student_bp, url_prefix='/api/student')  # 学生相关路由
+    app.register_blueprint(teacher_bp, url_prefix='/api/teacher')  # 教师相关路由
+    app.register_blueprint(course_bp, url_prefix='/api/course')  # 课程相关路由
+    app.register_blueprint(offering_bp, url_prefix='/api/offering')  # 授课安排相关路由
+    app.register_blueprint(score_bp, url_prefix='/api/score')  # 成绩相关路由
+    app.register_blueprint(metrics_bp, url_prefix='/api/metrics')  # 请求指标
+    app.register_blueprint(profiling_bp, url_prefix='/api/profiles')  # 性能分析结果
+    app.register_blueprint(export_bp, url_prefix='/api/export')  # 列表导出
+    app.register_blueprint(batch_bp, url_prefix='/api/batch')  # 批量请求
+    
+    # 前端路由处理
+    @app.route('/')
+    def index():
+        """首页路由
+        
+        返回前端应用的入口页面
+        """
+        return render_template('index.html')
+    
+    @app.route('/<path:path>')
+    def static_file(path):
+        """静态文件服务
+        
+        处理所有其他路由，返回相应的静态文件
+        用于提供前端资源如JS、CSS、图片等
+        """
+        return send_from_directory('../frontend', path)
+    
+    return app
+
+# 默认应用实例，供 run.py 等直接导入使用
+app = create_app()
 
 # 应用入口
 if __name__ == '__main__':
@@ -0,0 +1,369 @@
+"""进程内缓存工具
+
+提供带过期时间的LRU缓存，以及按表维护的版本号。
+Database 每次成功执行写语句都会递增所涉及表的版本号，缓存条目把依赖表的版本号
+作为键的一部分，表一旦被修改，旧条目就不会再被命中，从而做到写后立即失效。
+
+配置了 TABLE_VERSIONS_FILE 时版本号保存在内存映射的共享文件中，
+同一主机上的所有工作进程看到同一组版本号；否则只在进程内有效。
+"""
+import copy
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，只能使用进程内版本号
+    fcntl = None
+
+from .config import TABLE_VERSIONS_FILE
+
+
+class TTLCache:
+    """线程安全的LRU缓存，条目超过 ttl 秒后过期"""
+
+    def __init__(self, maxsize=1024, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # 键 -> (过期时间, 值)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        """获取缓存值，不存在或已过期时返回 default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, value = item
+                if expires > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value):
+        """写入缓存，超出容量时淘汰最久未使用的条目"""
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key):
+        """删除指定条目"""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            return {'size': len(self._data), 'hits': self.hits, 'misses': self.misses}
+
+
+class SizedCache:
+    """按占用字节数限制容量的线程安全LRU缓存，条目超过 ttl 秒后过期
+
+    条目可以附带版本（如依赖表的版本号），读取时版本不一致的条目视为已失效
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()  # 键 -> (过期时间, 版本, 值, 字节数)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None, version=None):
+        """获取缓存值，不存在、已过期或版本不一致时返回 default"""
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None:
+                expires, item_version, value, _ = item
+                if expires > time.monotonic() and item_version == version:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._remove(key)
+            self.misses += 1
+            return default
+
+    def set(self, key, value, size, version=None):
+        """写入缓存，超出容量时淘汰最久未使用的条目
+
+        参数:
+            key: 缓存键
+            value: 缓存值
+            size (int): 该条目占用的字节数
+            version: 条目的版本
+        """
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._remove(key)
+            self._data[key] = (time.monotonic() + self.ttl, version, value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, _, evicted) = self._data.popitem(last=False)
+                self._bytes -= evicted
+
+    def _remove(self, key):
+        """删除条目并扣除占用字节数，调用方需持有锁"""
+        item = self._data.pop(key, None)
+        if item is not None:
+            self._bytes -= item[3]
+
+    def pop(self, key):
+        """删除指定条目"""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """获取缓存统计信息"""
+        with self._lock:
+            return {'size': len(self._data), 'bytes': self._bytes,
+                    'hits': self.hits, 'misses': self.misses}
+
+
+class _Call:
+    """一次正在执行的调用"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0  # 等待该调用结果的其他线程数
+
+
+class SingleFlight:
+    """合并并发的相同调用
+
+    同一个键同时只有一个线程真正执行，期间到达的相同调用等待其完成并共享结果，
+    避免热点数据失效或高峰时段大量相同查询同时打到数据库
+    """
+
+    def __init__(self):
+        self._calls = {}  # 键 -> 正在执行的 _Call
+        self._lock = threading.Lock()
+        self.executed = 0  # 实际执行的次数
+        self.shared = 0  # 直接共享他人结果的次数
+
+    def do(self, key, fn):
+        """执行调用，已有相同调用正在执行时等待并共享其结果
+
+        参数:
+            key: 调用的键，键相同的调用视为相同调用
+            fn (function): 无参数的实际执行函数
+
+        返回:
+            fn 的返回值；共享结果的调用方得到深拷贝，修改不会互相影响
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.shared += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.result)
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        if call.waiters:
+            # 等待者会拷贝结果，执行者自己也拿一份拷贝，避免返回后被修改影响等待者
+            return copy.deepcopy(call.result)
+        return call.result
+
+    def stats(self):
+        """获取统计信息"""
+        with self._lock:
+            return {'in_flight': len(self._calls), 'executed': self.executed, 'shared': self.shared}
+
+
+class SharedVersions:
+    """保存在共享文件中的表版本号
+
+    文件开头是创建时生成的随机标识，之后是固定数量的8字节计数器，
+    表名按哈希值映射到计数器，不同表偶尔共用一个计数器只会导致多失效一些缓存。
+    读取直接访问内存映射，递增时持有文件锁，多个进程可以安全地同时递增。
+    """
+
+    SLOTS = 256
+    HEADER = 16
+
+    def __init__(self, path):
+        self.path = path
+        self.epoch = None
+        self._pid = None
+        self._fd = None
+        self._map = None
+        self._lock = threading.Lock()
+
+    def _ensure_open(self):
+        """按进程打开共享文件
+
+        fork 出的子进程必须重新打开文件，否则与父进程共用同一个打开的文件，文件锁无法互斥
+        """
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            if self._map is not None:
+                self._map.close()
+                os.close(self._fd)
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            size = self.HEADER + self.SLOTS * 8
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            try:
+                if os.fstat(fd).st_size < size:
+                    os.ftruncate(fd, size)
+                    os.pwrite(fd, os.urandom(self.HEADER), 0)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            self._map = mmap.mmap(fd, size)
+            self._fd = fd
+            self.epoch = self._map[:self.HEADER].hex()[:16]
+            self._pid = os.getpid()
+
+    def _offset(self, table):
+        """表对应的计数器在文件中的位置"""
+        return self.HEADER + (zlib.crc32(table.encode()) % self.SLOTS) * 8
+
+    def bump(self, tables):
+        """递增各表的版本号"""
+        self._ensure_open()
+        with self._lock:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for offset in {self._offset(table) for table in tables}:
+                    value, = struct.unpack_from('<Q', self._map, offset)
+                    struct.pack_into('<Q', self._map, offset, value + 1)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def get(self, tables):
+        """读取各表的版本号"""
+        self._ensure_open()
+        return tuple(struct.unpack_from('<Q', self._map, self._offset(table))[0] for table in tables)
+
+
+_versions = {}
+_versions_lock = threading.Lock()
+
+# 本次进程启动时生成的标识，进程内版本号对外暴露时需要附带该标识
+_epoch = uuid.uuid4().hex[:8]
+
+_shared = None
+_shared_failed = False
+
+
+def _shared_versions():
+    """获取共享版本号存储，未配置或无法使用时返回None"""
+    global _shared, _shared_failed
+    if _shared is not None or _shared_failed:
+        return _shared
+    if not TABLE_VERSIONS_FILE or fcntl is None:
+        _shared_failed = True
+        return None
+    shared = SharedVersions(TABLE_VERSIONS_FILE)
+    try:
+        shared._ensure_open()
+    except OSError as e:
+        print(f"共享表版本号文件打开失败，改用进程内版本号: {e}")
+        _shared_failed = True
+        return None
+    _shared = shared
+    return _shared
+
+
+# 匹配写语句所修改的表名
+_WRITE_TABLE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM)\s+`?(\w+)`?',
+    re.IGNORECASE
+)
+
+
+def written_table(sql):
+    """解析写语句修改的表名，不是写语句时返回None"""
+    match = _WRITE_TABLE_RE.match(sql)
+    return match.group(1).lower() if match else None
+
+
+def bump_table_versions(*tables):
+    """递增各表的版本号，使依赖这些表的缓存条目失效"""
+    if not tables:
+        return
+    shared = _shared_versions()
+    if shared is not None:
+        shared.bump(tables)
+        return
+    with _versions_lock:
+        for table in tables:
+            _versions[table] = _versions.get(table, 0) + 1
+
+
+def table_versions(*tables):
+    """获取各表当前的版本号
+
+    返回:
+        tuple: 与参数顺序对应的版本号
+    """
+    shared = _shared_versions()
+    if shared is not None:
+        return shared.get(tables)
+    return tuple(_versions.get(table, 0) for table in tables)
+
+
+def versions_epoch():
+    """获取版本号的标识
+
+    进程内版本号在不同进程（以及同一进程重启前后）各自从0开始计数，共享文件重建后也从0开始，
+    把版本号用于ETag等对外可见的标识时应同时带上该值，避免误判为未修改
+
+    返回:
+        str: 共享文件的随机标识，或进程ID与启动时随机值组成的字符串
+    """
+    shared = _shared_versions()
+    if shared is not None:
+        return shared.epoch
+    return f'{os.getpid()}-{_epoch}'
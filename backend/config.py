@@ -1,20 +1,182 @@
 import os
+import secrets
+
+# 项目根目录，以及存放运行时生成文件（密钥、会话、共享版本号等）的实例目录
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INSTANCE_DIR = os.environ.get('SMS_INSTANCE_DIR', os.path.join(BASE_DIR, 'instance'))
+
+def _env_bool(name, default):
+    """读取布尔类型的环境变量，未设置时返回默认值"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
 
 # 数据库配置
-# 这些参数用于建立与MySQL数据库的连接
+# 这些参数用于建立与MySQL数据库的连接，部署时可通过环境变量覆盖
 DB_CONFIG = {
-    'host': 'localhost',  # 数据库服务器地址，本地开发环境通常为localhost
-    'user': 'root',  # 数据库用户名
-    'password': '123456',  # 数据库密码，实际部署时应使用环境变量或配置文件存储
-    'database': 'student_management',  # 要连接的数据库名称
+    'host': os.environ.get('SMS_DB_HOST', 'localhost'),  # 数据库服务器地址，本地开发环境通常为localhost
+    'user': os.environ.get('SMS_DB_USER', 'root'),  # 数据库用户名
+    'password': os.environ.get('SMS_DB_PASSWORD', '123456'),  # 数据库密码，实际部署时应使用环境变量存储
+    'database': os.environ.get('SMS_DB_NAME', 'student_management'),  # 要连接的数据库名称
     'charset': 'utf8mb4',  # 字符集，utf8mb4支持完整的Unicode字符集，包括表情符号
     'cursorclass': 'pymysql.cursors.DictCursor'  # 使用字典形式的游标，查询结果以字典返回而非元组
 }
 
+# 数据库连接池配置
+# 连接池在进程内复用已建立的连接，避免每条SQL都重新进行TCP握手和认证
+DB_POOL_CONFIG = {
+    'min_size': int(os.environ.get('SMS_DB_POOL_MIN_SIZE', 2)),  # 最少保持的连接数，首次使用连接池时预先建立
+    'max_size': int(os.environ.get('SMS_DB_POOL_MAX_SIZE', 10)),  # 每个进程同时存在的最大连接数，应不小于每个进程的线程数
+    'idle_timeout': 300,  # 多余空闲连接的最长保留时间（秒），超过后关闭
+    'ping_interval': 30,  # 连接空闲超过该秒数后，借出前先ping检测是否存活
+    'acquire_timeout': 10  # 连接全部被占用时等待可用连接的最长时间（秒）
+}
+
+def _load_secret_key():
+    """读取会话签名密钥
+    
+    依次使用环境变量 SMS_SECRET_KEY、SMS_SECRET_KEY_FILE 指定的文件（默认为实例目录下的 secret_key）。
+    密钥文件不存在时生成一个随机密钥并写入，之后启动的进程都读取同一个密钥，
+    多个工作进程签发的会话Cookie可以互相验证。多台主机部署时应通过环境变量或共享文件提供相同的密钥
+    
+    返回:
+        str: 密钥
+    """
+    key = os.environ.get('SMS_SECRET_KEY')
+    if key:
+        return key
+    path = os.environ.get('SMS_SECRET_KEY_FILE', os.path.join(INSTANCE_DIR, 'secret_key'))
+    try:
+        with open(path, encoding='utf-8') as f:
+            key = f.read().strip()
+        if key:
+            return key
+    except FileNotFoundError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    key = secrets.token_hex(32)
+    try:
+        # O_EXCL 保证多个进程同时启动时只有一个写入成功，其余进程读取它写入的密钥
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        with open(path, encoding='utf-8') as f:
+            return f.read().strip()
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        f.write(key)
+    return key
+
 # Flask应用配置
-SECRET_KEY = os.urandom(24)  # 生成随机密钥，用于会话安全和CSRF保护
-DEBUG = True  # 开启调试模式，生产环境应设为False
-SESSION_TYPE = 'filesystem'  # 会话类型，使用文件系统存储会话数据
+SECRET_KEY = _load_secret_key()  # 会话签名密钥，所有工作进程和主机必须一致
+DEBUG = _env_bool('SMS_DEBUG', True)  # 开启调试模式，生产环境应设为False
+# 会话类型：cookie 使用Flask默认的签名Cookie保存会话数据；
+# filesystem 和 sqlite 在服务端保存会话数据，Cookie中只保存会话ID
+SESSION_TYPE = os.environ.get('SMS_SESSION_TYPE', 'filesystem')
+SESSION_FILE_DIR = os.environ.get('SMS_SESSION_FILE_DIR', os.path.join(INSTANCE_DIR, 'sessions'))  # filesystem 会话的存放目录
+SESSION_SQLITE_PATH = os.environ.get('SMS_SESSION_SQLITE_PATH', os.path.join(INSTANCE_DIR, 'sessions.sqlite3'))  # sqlite 会话的数据库文件
+SESSION_LIFETIME = int(os.environ.get('SMS_SESSION_LIFETIME', 7 * 24 * 3600))  # 服务端会话的有效期（秒），从登录时算起
+
+# 表版本号共享文件
+# 缓存、ETag等依赖的表版本号保存在该文件中，同一主机上的多个工作进程共享，
+# 一个进程的写操作会立即使所有进程的相关缓存失效；设为空字符串时版本号只在进程内有效
+TABLE_VERSIONS_FILE = os.environ.get('SMS_TABLE_VERSIONS_FILE', os.path.join(INSTANCE_DIR, 'table_versions'))
+
+# 新建学生时同时创建的登录账户的初始密码，用户名为学号
+DEFAULT_PASSWORD = '123456'
 
 # 分页配置
-ITEMS_PER_PAGE = 10  # 每页显示的条目数，用于列表页面的分页显示
\ No newline at end of file
+ITEMS_PER_PAGE = 10  # 每页显示的条目数，用于列表页面的分页显示
+
+# 列表查询配置
+LIST_QUERY_CONFIG = {
+    # 用 COUNT(*) OVER() 随分页结果一并返回总数，省去单独的 COUNT(*) 查询；需要MySQL 8.0及以上，默认关闭
+    'window_count': _env_bool('SMS_LIST_WINDOW_COUNT', False),
+    'count_cache_ttl': 30,  # 列表总数的缓存时间（秒），应用的写操作会使其立即失效
+    'count_cache_size': 1024  # 最多缓存的列表总数条目数
+}
+
+# 学生选课集合缓存配置，用于学生查看授课安排时的权限检查
+ENROLLMENT_CACHE_CONFIG = {
+    'ttl': 60,  # 缓存时间（秒），本进程内该学生的选课变化会使其立即失效
+    'size': 10000  # 最多缓存的学生数
+}
+
+# 搜索索引配置
+SEARCH_INDEX_CONFIG = {
+    'enabled': True,  # 学生、教师、课程的关键词搜索使用进程内二元组索引，设为False时使用LIKE查询
+    'rebuild_interval': 600,  # 定期全量重建索引的间隔（秒），用于同步表版本号不共享的其他主机的写入
+    'refresh_interval': 5  # 表版本号变化（其他进程写入）后重建索引的最小间隔（秒）
+}
+
+# 参考数据（学院、班级、职称、课程类型）缓存配置
+REFERENCE_CACHE_CONFIG = {
+    'ttl': 300  # 缓存时间（秒），应用的增删改会使其立即失效，其他主机或直接修改数据库造成的变化最迟在此时间后可见
+}
+
+# 列表接口响应缓存配置
+RESPONSE_CACHE_CONFIG = {
+    'enabled': True,  # 是否启用响应缓存
+    'max_bytes': 32 * 1024 * 1024,  # 缓存占用的最大字节数，超出时淘汰最久未使用的响应
+    'max_entry_bytes': 1024 * 1024,  # 单个响应超过该大小时不缓存
+    'ttl': 300  # 缓存时间（秒），应用的写操作会使其立即失效，其他主机或直接修改数据库造成的变化最迟在此时间后可见
+}
+
+# 请求指标配置，管理员通过 /api/metrics 以Prometheus文本格式查看
+METRICS_CONFIG = {
+    'enabled': _env_bool('SMS_METRICS_ENABLED', True),  # 是否收集指标
+    'sample_rate': float(os.environ.get('SMS_METRICS_SAMPLE_RATE', 1.0)),  # 记录耗时和SQL统计的请求比例，0~1
+    'dir': os.environ.get('SMS_METRICS_DIR', os.path.join(INSTANCE_DIR, 'metrics')),  # 各工作进程写入指标快照的目录，汇总后输出；为空时只输出当前进程的指标
+    'flush_interval': 5,  # 工作进程写入指标快照的最短间隔（秒）
+    'token': os.environ.get('SMS_METRICS_TOKEN', '')  # 抓取程序使用的令牌（请求头 Authorization: Bearer 令牌），为空时只允许管理员登录后访问
+}
+
+# 慢查询日志配置
+SLOW_QUERY_CONFIG = {
+    'enabled': _env_bool('SMS_SLOW_QUERY_ENABLED', True),  # 是否记录慢查询
+    'threshold_ms': float(os.environ.get('SMS_SLOW_QUERY_MS', 200)),  # 执行时间超过该毫秒数的SQL写入日志
+    'trace_sample_rate': float(os.environ.get('SMS_SQL_TRACE_RATE', 0)),  # 抽样记录请求中全部SQL的比例，0~1，0表示不抽样
+    'log_params': _env_bool('SMS_SLOW_QUERY_LOG_PARAMS', False),  # 是否记录参数值，默认只记录参数类型和长度，避免密码等敏感数据写入日志
+    'file': os.environ.get('SMS_SLOW_QUERY_LOG', os.path.join(INSTANCE_DIR, 'logs', 'slow_query.log')),  # 日志文件
+    'max_bytes': 10 * 1024 * 1024,  # 单个日志文件的最大字节数，超过后轮转
+    'backup_count': 5  # 保留的历史日志文件数
+}
+
+# 请求SQL检查配置（调试和测试用）
+# 按SQL形状统计每个请求执行的SQL，同一形状重复超过 repeat_threshold 次（疑似N+1查询）
+# 或超过视图函数用 query_budget 声明的条数时：warn 打印警告，raise 抛出 QueryBudgetExceeded，off 不检查。
+# 检查会解析每条SQL，默认关闭，需通过 SMS_QUERY_CHECK 显式开启；开发服务器 run.py 默认开启 warn
+QUERY_CHECK_CONFIG = {
+    'mode': os.environ.get('SMS_QUERY_CHECK', 'off'),
+    'repeat_threshold': int(os.environ.get('SMS_QUERY_REPEAT_THRESHOLD', 5))
+}
+
+# 按需性能分析配置
+# 管理员请求时带上请求头 X-Profile 或查询参数 _profile（值为 cpu 或 cpu,mem），
+# 该请求在 cProfile 下执行，mem 同时用 tracemalloc 记录内存分配，结果保存在 dir 目录
+PROFILING_CONFIG = {
+    'enabled': _env_bool('SMS_PROFILING_ENABLED', True),  # 是否允许按需性能分析
+    'dir': os.environ.get('SMS_PROFILE_DIR', os.path.join(INSTANCE_DIR, 'profiles')),  # 分析结果的保存目录
+    'max_profiles': 100  # 最多保留的分析次数，超出时删除最早的结果
+}
+
+# 学生批量导入配置
+IMPORT_CONFIG = {
+    'chunk_size': int(os.environ.get('SMS_IMPORT_CHUNK_SIZE', 500)),  # 每批校验和插入的行数，每批在一个事务中写入
+    'encoding': 'utf-8-sig'  # CSV文件的默认编码，Excel另存的CSV通常为 gbk
+}
+
+# 列表导出配置
+EXPORT_CONFIG = {
+    'chunk_bytes': 64 * 1024,  # 流式导出CSV时每次发送的大致数据量（按字符计）
+    'net_write_timeout': 600,  # 导出连接的 net_write_timeout（秒），客户端下载较慢时MySQL等待读取结果的最长时间
+    # 每个进程同时存在的导出连接数上限，导出连接不在连接池中，MySQL连接总数需另外计入
+    'max_connections': int(os.environ.get('SMS_EXPORT_MAX_CONNECTIONS', 2)),
+    'acquire_timeout': 5  # 导出连接全部被占用时等待的最长时间（秒），超时后返回503
+}
+
+# 批量请求配置，前端用 /api/batch 把多个GET请求合并为一次HTTP请求
+BATCH_CONFIG = {
+    'max_requests': 20,  # 一次批量请求最多包含的子请求数
+    # 不能作为子请求的路径前缀：导出、性能分析结果下载、指标等返回文件或文本的接口
+    'excluded_prefixes': ('/api/export', '/api/profiles', '/api/metrics', '/api/batch')
+}
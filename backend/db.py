@@ -0,0 +1,490 @@
+"""数据库连接管理
+
+提供一个有界、线程安全的MySQL连接池，models.Database 通过它借出和归还连接，
+使每条SQL复用已经完成TCP握手和认证的连接，而不是每次都重新建立连接。
+
+在Flask请求中，连接在第一次执行SQL时借出并绑定到 flask.g，
+同一请求内创建的所有模型对象共用这一个连接，请求结束时统一归还。
+
+transaction() 在当前连接上开启显式事务，事务内各模型执行的写操作共用一次提交；
+嵌套调用加入外层事务，需要局部回滚时使用 savepoint()。
+"""
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import pymysql
+from flask import g, has_app_context
+from pymysql.cursors import DictCursor
+
+from .cache import bump_table_versions
+from .config import DB_CONFIG, DB_POOL_CONFIG
+
+
+class PoolTimeoutError(Exception):
+    """连接池耗尽且在等待时间内没有可用连接"""
+
+
+def is_connection_error(error):
+    """判断异常是否意味着连接已不可用，这类连接不应再归还连接池复用"""
+    return isinstance(error, (pymysql.err.OperationalError, pymysql.err.InterfaceError))
+
+
+def create_connection():
+    """新建一个MySQL连接
+
+    连接池中的连接使用自动提交模式，单条查询不会遗留未结束的事务，
+    归还后被其他请求复用时也不会读到旧的一致性快照
+
+    返回:
+        pymysql.connections.Connection: 新建立的数据库连接
+    """
+    return pymysql.connect(
+        host=DB_CONFIG['host'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        database=DB_CONFIG['database'],
+        charset=DB_CONFIG['charset'],
+        cursorclass=DictCursor,
+        autocommit=True
+    )
+
+
+class ConnectionPool:
+    """有界的线程安全连接池
+
+    空闲连接按归还时间先后存放，借出时优先复用最近归还的连接。
+    空闲超过 idle_timeout 的多余连接会被关闭，空闲超过 ping_interval 的连接
+    在借出前先 ping 一次，确认连接仍然可用。
+    """
+
+    def __init__(self, creator=create_connection, min_size=2, max_size=10,
+                 idle_timeout=300, ping_interval=30, acquire_timeout=10):
+        if max_size < 1:
+            raise ValueError('连接池最大连接数必须大于0')
+        self.creator = creator
+        self.min_size = min(min_size, max_size)
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.ping_interval = ping_interval
+        self.acquire_timeout = acquire_timeout
+
+        self._idle = deque()  # 元素为 (连接, 归还时间)
+        self._size = 0  # 当前已建立的连接总数（空闲 + 借出）
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            'created': 0,  # 累计新建连接数
+            'closed': 0,  # 累计关闭连接数
+            'acquired': 0,  # 累计借出次数
+            'reused': 0,  # 借出时复用空闲连接的次数
+            'waits': 0,  # 因连接池耗尽而等待的次数
+            'timeouts': 0,  # 等待超时次数
+            'ping_failures': 0,  # 借出前存活检测失败的次数
+        }
+
+    def warm_up(self):
+        """预先建立 min_size 个连接，失败时仅打印错误，不影响后续按需建立连接"""
+        conns = []
+        try:
+            while True:
+                with self._cond:
+                    if self._size >= self.min_size:
+                        break
+                    self._size += 1
+                conns.append(self._create())
+        except Exception as e:
+            print(f"连接池预热错误: {e}")
+        for conn in conns:
+            self.release(conn)
+
+    def _create(self):
+        """为已预留名额的位置建立新连接，失败时归还名额"""
+        try:
+            conn = self.creator()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._stats['created'] += 1
+        return conn
+
+    def _close(self, conn):
+        """关闭连接并从连接总数中扣除"""
+        try:
+            conn.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._size -= 1
+            self._stats['closed'] += 1
+            self._cond.notify()
+
+    def _is_alive(self, conn):
+        """检测连接是否存活"""
+        try:
+            conn.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def acquire(self, timeout=None):
+        """从连接池借出一个连接
+
+        参数:
+            timeout (float): 连接池耗尽时的最长等待秒数，默认使用 acquire_timeout
+
+        返回:
+            pymysql.connections.Connection: 可用的数据库连接
+
+        异常:
+            PoolTimeoutError: 等待超时仍没有可用连接
+        """
+        if timeout is None:
+            timeout = self.acquire_timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            stale = []
+            conn = None
+            idle_since = None
+            reserved = False
+            with self._cond:
+                while conn is None:
+                    now = time.monotonic()
+                    # 先取最近归还的空闲连接，同时淘汰空闲过久的多余连接
+                    while self._idle:
+                        candidate, since = self._idle.pop()
+                        if (now - since > self.idle_timeout
+                                and self._size - len(stale) > self.min_size):
+                            stale.append(candidate)
+                            continue
+                        conn, idle_since = candidate, since
+                        break
+                    if conn is not None or stale:
+                        break
+                    if self._size < self.max_size:
+                        # 预留一个连接名额，在锁外建立连接
+                        self._size += 1
+                        reserved = True
+                        break
+                    # 连接数已达上限，等待其他线程归还连接
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        self._stats['timeouts'] += 1
+                        raise PoolTimeoutError(f'等待数据库连接超时（{timeout}秒）')
+                    self._stats['waits'] += 1
+                    self._cond.wait(remaining)
+
+            for candidate in stale:
+                self._close(candidate)
+
+            if reserved:
+                conn = self._create()
+            elif conn is None:
+                # 淘汰连接腾出了名额，重新检查空闲队列
+                continue
+            elif (time.monotonic() - idle_since > self.ping_interval
+                    and not self._is_alive(conn)):
+                with self._cond:
+                    self._stats['ping_failures'] += 1
+                self._close(conn)
+                continue
+            else:
+                with self._cond:
+                    self._stats['reused'] += 1
+
+            with self._cond:
+                self._stats['acquired'] += 1
+            return conn
+
+    def release(self, conn, discard=False):
+        """归还连接
+
+        参数:
+            conn: 之前借出的连接
+            discard (bool): 为True时直接关闭连接，用于连接已损坏的情况
+        """
+        if discard or not conn.open:
+            self._close(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self):
+        """关闭所有空闲连接，借出中的连接在归还时正常处理"""
+        with self._cond:
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+        for conn in idle:
+            self._close(conn)
+
+    def stats(self):
+        """获取连接池统计信息
+
+        返回:
+            dict: 连接总数、空闲数、借出数以及各项累计计数
+        """
+        with self._cond:
+            result = dict(self._stats)
+            result.update({
+                'size': self._size,
+                'idle': len(self._idle),
+                'in_use': self._size - len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+            })
+        return result
+
+
+_pool = None
+_pool_pid = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """获取进程内共享的连接池，首次调用时按配置创建并预热
+
+    多进程服务器在加载应用后 fork 工作进程，子进程不能使用从父进程继承的连接
+    （同一个socket被多个进程同时读写会导致数据错乱），因此进程ID变化后重新创建连接池
+    """
+    global _pool, _pool_pid
+    if _pool is None or _pool_pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool_pid != os.getpid():
+                # 继承来的连接直接丢弃，不能在子进程中关闭，否则会断开父进程的连接
+                pool = ConnectionPool(**DB_POOL_CONFIG)
+                pool.warm_up()
+                _pool = pool
+                _pool_pid = os.getpid()
+    return _pool
+
+
+# SQL执行监听器，每条SQL执行完后以 (sql, params, 耗时秒数, 异常或None) 调用
+_query_listeners = []
+
+
+def add_query_listener(listener):
+    """注册SQL执行监听器，用于统计、慢查询日志等
+
+    参数:
+        listener (function): 接收 (sql, params, seconds, error) 的函数，
+            批量执行时 params 为参数列表；监听器抛出的异常会被忽略
+    """
+    _query_listeners.append(listener)
+
+
+def has_query_listeners():
+    """是否注册了SQL执行监听器，没有时执行SQL可以跳过计时"""
+    return bool(_query_listeners)
+
+
+def notify_query(sql, params, seconds, error=None):
+    """通知所有监听器一条SQL已执行完"""
+    for listener in _query_listeners:
+        try:
+            listener(sql, params, seconds, error)
+        except Exception as e:
+            print(f"SQL监听器错误: {e}")
+
+
+def pool_stats():
+    """当前进程连接池的统计信息，尚未创建连接池时返回None"""
+    if _pool is None or _pool_pid != os.getpid():
+        return None
+    return _pool.stats()
+
+
+_local = threading.local()
+
+
+class _Transaction:
+    """当前正在进行的事务"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.savepoints = 0  # 已创建的保存点数量，用于生成保存点名称
+        self.tables = set()  # 事务中修改过的表
+        self.callbacks = []  # 提交后执行的回调
+
+
+def _current_transaction():
+    """获取当前请求或当前线程中正在进行的事务"""
+    if has_app_context():
+        return g.get('_db_tx')
+    return getattr(_local, 'tx', None)
+
+
+def _set_transaction(tx):
+    """设置当前请求或当前线程中正在进行的事务"""
+    if has_app_context():
+        if tx is None:
+            g.pop('_db_tx', None)
+        else:
+            g._db_tx = tx
+    else:
+        _local.tx = tx
+
+
+def in_transaction():
+    """当前是否处于显式事务中"""
+    return _current_transaction() is not None
+
+
+def record_write(table):
+    """记录一次对表的写操作，使依赖该表的缓存失效
+
+    写入时立即递增表版本号；处于事务中时，事务结束后再递增一次，
+    防止其他请求在提交前读到旧数据并以新版本号缓存
+
+    参数:
+        table (str): 被修改的表名
+    """
+    bump_table_versions(table)
+    tx = _current_transaction()
+    if tx is not None:
+        tx.tables.add(table)
+
+
+def after_commit(callback):
+    """在当前事务提交后执行 callback，用于同步进程内的索引等不随事务回滚的状态
+
+    不在事务中时写操作已自动提交，立即执行；事务回滚时不执行，
+    保存点回滚时丢弃保存点内登记的回调
+
+    参数:
+        callback (function): 无参数的函数
+    """
+    tx = _current_transaction()
+    if tx is None:
+        callback()
+    else:
+        tx.callbacks.append(callback)
+
+
+def acquire_connection():
+    """获取执行SQL所用的连接
+
+    处于事务中时返回事务所用的连接；在应用上下文中返回绑定到当前请求的连接，
+    第一次调用时才从连接池借出；不在应用上下文中（如命令行脚本）时直接从连接池借出
+
+    返回:
+        pymysql.connections.Connection: 数据库连接
+    """
+    tx = _current_transaction()
+    if tx is not None:
+        return tx.conn
+    if has_app_context():
+        conn = g.get('_db_conn')
+        if conn is None:
+            conn = get_pool().acquire()
+            g._db_conn = conn
+        return conn
+    return get_pool().acquire()
+
+
+def release_connection(conn, discard=False):
+    """交还 acquire_connection 获取的连接
+
+    事务所用的连接在事务结束时处理；请求绑定的连接保留到请求结束再归还，
+    但连接已损坏时立即丢弃，后续SQL会重新借出新连接
+
+    参数:
+        conn: 要交还的连接
+        discard (bool): 连接已损坏时为True
+    """
+    tx = _current_transaction()
+    if tx is not None and tx.conn is conn:
+        return
+    if has_app_context() and g.get('_db_conn') is conn:
+        if not discard:
+            return
+        g.pop('_db_conn')
+    get_pool().release(conn, discard=discard)
+
+
+@contextmanager
+def transaction():
+    """显式事务
+
+    with 块正常结束时提交，抛出异常时回滚并继续抛出异常。
+    已处于事务中时直接加入外层事务，由最外层统一提交或回滚；
+    最外层提交后执行 after_commit 登记的回调。
+
+    用法:
+        with transaction():
+            student_model.add_student(data)
+            user_model.create_user(...)
+    """
+    tx = _current_transaction()
+    if tx is not None:
+        yield tx.conn
+        return
+
+    conn = acquire_connection()
+    tx = _Transaction(conn)
+    _set_transaction(tx)
+    discard = False
+    try:
+        conn.begin()
+        yield conn
+        conn.commit()
+    except BaseException as e:
+        discard = is_connection_error(e)
+        if not discard:
+            try:
+                conn.rollback()
+            except Exception:
+                discard = True
+        raise
+    finally:
+        _set_transaction(None)
+        bump_table_versions(*tx.tables)
+        release_connection(conn, discard=discard)
+    for callback in tx.callbacks:
+        try:
+            callback()
+        except Exception as e:
+            print(f"事务提交后的回调错误: {e}")
+
+
+@contextmanager
+def savepoint():
+    """事务内的保存点
+
+    with 块抛出异常时只回滚到保存点并继续抛出异常，外层事务中之前的写操作不受影响；
+    不在事务中时会先开启一个事务
+    """
+    with transaction() as conn:
+        tx = _current_transaction()
+        tx.savepoints += 1
+        name = f'sp_{tx.savepoints}'
+        callbacks = len(tx.callbacks)
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f'SAVEPOINT {name}')
+            try:
+                yield name
+            except BaseException:
+                cursor.execute(f'ROLLBACK TO SAVEPOINT {name}')
+                del tx.callbacks[callbacks:]
+                raise
+            cursor.execute(f'RELEASE SAVEPOINT {name}')
+        finally:
+            cursor.close()
+
+
+def teardown_connection(exception=None):
+    """应用上下文销毁时归还请求绑定的连接"""
+    conn = g.pop('_db_conn', None)
+    if conn is not None:
+        get_pool().release(conn)
+
+
+def init_db(app):
+    """在Flask应用上注册请求结束时的连接回收"""
+    app.teardown_appcontext(teardown_connection)
@@ -0,0 +1,256 @@
+"""列表导出
+
+把学生、教师、课程、授课安排和成绩整表导出为CSV或XLSX。
+
+普通查询用 fetchall() 把全部结果读入内存，导出百万行的选课成绩表时内存会随行数增长。
+导出使用单独建立的连接和非缓冲的服务端游标（SSCursor），MySQL边查询边发送结果，
+应用每读出一批行就编码成CSV发给客户端，内存占用与总行数无关，响应头和表头立即发出。
+
+导出连接不从连接池借出：非缓冲游标在结果读完之前独占连接，
+下载较慢时会长时间占用连接池中的连接；响应结束或客户端断开时关闭该连接。
+每个进程同时存在的导出连接数不超过 EXPORT_CONFIG['max_connections']，
+超出时等待 acquire_timeout 秒，仍没有空位则抛出 ExportBusyError。
+
+XLSX需要安装 openpyxl。XLSX不是流式导出：以只写模式把全部行写入临时文件，
+写完后关闭导出连接，再把整个文件发送给客户端。
+"""
+import csv
+import io
+import tempfile
+import threading
+import time
+
+from pymysql.cursors import SSCursor
+
+try:
+    import openpyxl
+except ImportError:  # 未安装时只支持CSV
+    openpyxl = None
+
+from .config import EXPORT_CONFIG
+from .db import create_connection, has_query_listeners, notify_query
+
+# 导出连接的空位，限制每个进程同时存在的导出连接数
+_connection_slots = threading.BoundedSemaphore(EXPORT_CONFIG['max_connections'])
+
+
+class ExportBusyError(Exception):
+    """导出连接数已达上限且在等待时间内没有空位"""
+
+
+# 导出名称 -> 查询语句、列（字段标题）、可用的筛选参数（参数名 -> (列, 类型)）
+EXPORTS = {
+    'students': {
+        'sql': """
+            SELECT s.student_no, s.name, s.gender, s.birth_date, s.id_card, s.enrollment_date,
+            c.class_name, co.college_name, s.address, s.phone, s.email, s.status
+            FROM student s
+            JOIN class c ON s.class_id = c.class_id
+            JOIN college co ON c.college_id = co.college_id
+        """,
+        'order_by': 's.student_id',
+        'headers': ('学号', '姓名', '性别', '出生日期', '身份证号', '入学日期',
+                    '班级', '学院', '地址', '电话', '邮箱', '学籍状态'),
+        'filters': {'class_id': ('s.class_id', int), 'college_id': ('c.college_id', int), 'status': ('s.status', str)},
+    },
+    'teachers': {
+        'sql': """
+            SELECT t.teacher_no, t.name, t.gender, t.birth_date, ti.title_name, co.college_name,
+            t.phone, t.email
+            FROM teacher t
+            LEFT JOIN title ti ON t.title_id = ti.title_id
+            JOIN college co ON t.college_id = co.college_id
+        """,
+        'order_by': 't.teacher_id',
+        'headers': ('工号', '姓名', '性别', '出生日期', '职称', '学院', '电话', '邮箱'),
+        'filters': {'college_id': ('t.college_id', int), 'title_id': ('t.title_id', int)},
+    },
+    'courses': {
+        'sql': """
+            SELECT c.course_code, c.course_name, c.credit, c.hours, ct.type_name, co.college_name
+            FROM course c
+            JOIN course_type ct ON c.type_id = ct.type_id
+            JOIN college co ON c.college_id = co.college_id
+        """,
+        'order_by': 'c.course_id',
+        'headers': ('课程代码', '课程名称', '学分', '学时', '课程类型', '开课学院'),
+        'filters': {'college_id': ('c.college_id', int), 'type_id': ('c.type_id', int)},
+    },
+    'offerings': {
+        'sql': """
+            SELECT o.offering_id, c.course_code, c.course_name, t.teacher_no, t.name,
+            o.semester, o.year, o.classroom, o.class_time
+            FROM course_offering o
+            JOIN course c ON o.course_id = c.course_id
+            JOIN teacher t ON o.teacher_id = t.teacher_id
+        """,
+        'order_by': 'o.offering_id',
+        'headers': ('授课ID', '课程代码', '课程名称', '教师工号', '教师姓名', '学期', '学年', '教室', '上课时间'),
+        'filters': {'course_id': ('o.course_id', int), 'teacher_id': ('o.teacher_id', int),
+                    'year': ('o.year', int), 'semester': ('o.semester', str)},
+    },
+    'scores': {
+        'sql': """
+            SELECT s.student_no, s.name, c.course_code, c.course_name, c.credit, t.name,
+            o.semester, o.year, sc.score, sc.status
+            FROM student_course sc
+            JOIN student s ON sc.student_id = s.student_id
+            JOIN course_offering o ON sc.offering_id = o.offering_id
+            JOIN course c ON o.course_id = c.course_id
+            JOIN teacher t ON o.teacher_id = t.teacher_id
+        """,
+        'order_by': 'sc.sc_id',
+        'headers': ('学号', '姓名', '课程代码', '课程名称', '学分', '任课教师', '学期', '学年', '成绩', '状态'),
+        'filters': {'student_id': ('sc.student_id', int), 'offering_id': ('sc.offering_id', int),
+                    'year': ('o.year', int), 'semester': ('o.semester', str)},
+    },
+}
+
+
+def supported_formats():
+    """可用的导出格式，未安装 openpyxl 时只有 csv"""
+    return ('csv', 'xlsx') if openpyxl is not None else ('csv',)
+
+
+def build_query(name, args):
+    """生成导出查询
+
+    参数:
+        name (str): 导出名称，EXPORTS 中的键
+        args (dict): 筛选参数，未列在 filters 中的参数被忽略
+
+    返回:
+        tuple: (SQL, 参数)
+
+    异常:
+        ValueError: 筛选参数的值类型不正确
+    """
+    export = EXPORTS[name]
+    conditions, params = [], []
+    for param, (column, value_type) in export['filters'].items():
+        value = args.get(param)
+        if value in (None, ''):
+            continue
+        try:
+            params.append(value_type(value))
+        except ValueError:
+            raise ValueError(f'参数 {param} 格式不正确')
+        conditions.append(f'{column} = %s')
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ''
+    return f"{export['sql'].strip()}{where} ORDER BY {export['order_by']}", tuple(params)
+
+
+class RowStream:
+    """非缓冲查询的结果，逐行迭代，用完后调用 close() 关闭导出连接并释放空位"""
+
+    def __init__(self, conn, cursor):
+        self.conn = conn
+        self.cursor = cursor
+
+    def __iter__(self):
+        while self.conn is not None:
+            rows = self.cursor.fetchmany(1000)
+            if not rows:
+                break
+            yield from rows
+
+    def close(self):
+        """关闭导出连接，结果未读完时直接断开，不再读取剩余的结果"""
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            finally:
+                self.conn = None
+                _connection_slots.release()
+
+
+def open_rows(sql, params):
+    """在单独的连接上用非缓冲游标执行查询
+
+    参数:
+        sql (str): 查询语句
+        params (tuple): 参数
+
+    返回:
+        RowStream: 查询结果，调用方负责关闭
+
+    异常:
+        ExportBusyError: 导出连接数已达上限，等待 acquire_timeout 秒后仍没有空位
+        连接或执行SQL出错时抛出数据库异常
+    """
+    if not _connection_slots.acquire(timeout=EXPORT_CONFIG['acquire_timeout']):
+        raise ExportBusyError(f"导出连接数已达上限 {EXPORT_CONFIG['max_connections']}")
+    try:
+        conn = create_connection()
+    except Exception:
+        _connection_slots.release()
+        raise
+    try:
+        with conn.cursor() as setup:
+            setup.execute('SET SESSION net_write_timeout = %s', (EXPORT_CONFIG['net_write_timeout'],))
+        cursor = conn.cursor(SSCursor)
+        start = time.perf_counter()
+        try:
+            cursor.execute(sql, params)
+        except Exception as e:
+            if has_query_listeners():
+                notify_query(sql, params, time.perf_counter() - start, e)
+            raise
+        if has_query_listeners():
+            # 非缓冲查询的耗时只计到返回第一批结果为止
+            notify_query(sql, params, time.perf_counter() - start)
+    except Exception:
+        conn.close()
+        _connection_slots.release()
+        raise
+    return RowStream(conn, cursor)
+
+
+def iter_csv(headers, rows):
+    """把结果行编码为CSV，按 chunk_bytes 分块产生
+
+    第一块为带BOM的表头，Excel打开时能正确识别UTF-8编码的中文
+
+    参数:
+        headers (tuple): 列标题
+        rows (iterable): 结果行
+
+    返回:
+        generator: 逐块产生UTF-8编码的字节串
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+    yield ('\ufeff' + buffer.getvalue()).encode('utf-8')
+    buffer.seek(0)
+    buffer.truncate()
+    chunk_bytes = EXPORT_CONFIG['chunk_bytes']
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= chunk_bytes:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+def write_xlsx(headers, rows):
+    """把结果行逐行写入XLSX临时文件，全部写完后才能发送
+
+    参数:
+        headers (tuple): 列标题
+        rows (iterable): 结果行
+
+    返回:
+        file: 已写完并回到开头的临时文件，关闭后自动删除
+    """
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(headers)
+    for row in rows:
+        sheet.append(row)
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return output
@@ -0,0 +1,347 @@
+"""请求指标
+
+记录每个路由的请求耗时分布、响应状态码计数，以及每个请求执行的SQL条数和耗时，
+由 /api/metrics 以Prometheus文本格式输出。
+
+耗时和SQL统计只对按 sample_rate 抽样的请求记录，sample_rate 为0时不注册SQL监听器，
+执行SQL不再计时；状态码计数覆盖全部请求。
+
+多进程部署时每个工作进程各自统计，并定期把累计值写入指标目录下以进程命名的快照文件，
+输出时汇总所有进程的快照；已退出进程的快照并入 archive.json，保证计数只增不减。
+"""
+import bisect
+import glob
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，不合并已退出进程的快照
+    fcntl = None
+
+from flask import g, request, has_request_context
+
+from .config import METRICS_CONFIG
+from .db import add_query_listener, pool_stats
+
+# 请求耗时分布的桶上界（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# 每个请求SQL条数分布的桶上界
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# 指标名称 -> (类型, 说明, 标签名, 直方图桶上界)
+FAMILIES = {
+    'sms_request_duration_seconds': ('histogram', '请求处理耗时（秒）', ('endpoint', 'method'), LATENCY_BUCKETS),
+    'sms_request_queries': ('histogram', '每个请求执行的SQL条数', ('endpoint',), QUERY_COUNT_BUCKETS),
+    'sms_request_query_seconds_total': ('counter', '请求中SQL执行的累计耗时（秒）', ('endpoint',), None),
+    'sms_query_errors_total': ('counter', 'SQL执行出错的次数', ('endpoint',), None),
+    'sms_requests_total': ('counter', '按状态码统计的请求数', ('endpoint', 'method', 'status'), None),
+    'sms_cache_hits_total': ('counter', '缓存命中次数', ('cache',), None),
+    'sms_cache_misses_total': ('counter', '缓存未命中次数', ('cache',), None),
+    'sms_db_pool_connections': ('gauge', '数据库连接池中的连接数', ('state',), None),
+    'sms_metrics_sample_rate': ('gauge', '记录耗时和SQL统计的请求比例', (), None),
+}
+
+
+class Metrics:
+    """进程内的指标累计值"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = {}  # (指标名称, 标签值) -> 计数，直方图为 [各桶计数..., 超出最大桶的计数, 总和]
+
+    def inc(self, name, labels, amount=1):
+        """计数器加 amount"""
+        key = (name, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def observe(self, name, labels, value):
+        """在直方图中记录一个观测值"""
+        buckets = FAMILIES[name][3]
+        key = (name, labels)
+        with self._lock:
+            hist = self._values.get(key)
+            if hist is None:
+                hist = self._values[key] = [0] * (len(buckets) + 2)
+            hist[bisect.bisect_left(buckets, value)] += 1
+            hist[-1] += value
+
+    def snapshot(self):
+        """导出可以JSON序列化的累计值
+
+        返回:
+            list: [指标名称, 标签值列表, 值] 组成的列表
+        """
+        with self._lock:
+            return [
+                [name, list(labels), list(value) if isinstance(value, list) else value]
+                for (name, labels), value in self._values.items()
+            ]
+
+
+_metrics = Metrics()
+
+
+def _process_snapshot():
+    """当前进程的完整快照，包括累计值、缓存统计和连接池状态
+
+    返回:
+        dict: counters 为可以跨进程累加的值，gauges 为只对存活进程有意义的瞬时值
+    """
+    # 延迟导入，避免与模型模块循环导入
+    from .models import cache_stats, single_flight_stats
+    from .utils import response_cache_stats
+
+    counters = _metrics.snapshot()
+    caches = cache_stats()
+    caches['response'] = response_cache_stats()
+    for name, stats in caches.items():
+        counters.append(['sms_cache_hits_total', [name], stats['hits']])
+        counters.append(['sms_cache_misses_total', [name], stats['misses']])
+    flights = single_flight_stats()
+    counters.append(['sms_cache_hits_total', ['single_flight'], flights['shared']])
+    counters.append(['sms_cache_misses_total', ['single_flight'], flights['executed']])
+
+    gauges = []
+    pool = pool_stats()
+    if pool is not None:
+        gauges.append(['sms_db_pool_connections', ['idle'], pool['idle']])
+        gauges.append(['sms_db_pool_connections', ['in_use'], pool['in_use']])
+    return {'counters': counters, 'gauges': gauges}
+
+
+def _merge(target, items):
+    """把 [指标名称, 标签值列表, 值] 列表累加到 target 字典中"""
+    for name, labels, value in items:
+        key = (name, tuple(labels))
+        current = target.get(key)
+        if current is None:
+            target[key] = list(value) if isinstance(value, list) else value
+        elif isinstance(value, list):
+            target[key] = [a + b for a, b in zip(current, value)]
+        else:
+            target[key] = current + value
+
+
+# 当前进程快照文件的标识，fork 后重新生成
+_process_id = None
+_process_token = None
+_last_flush = 0.0
+_flush_lock = threading.Lock()
+
+
+def _snapshot_path():
+    """当前进程的快照文件路径"""
+    global _process_id, _process_token
+    if _process_id != os.getpid():
+        _process_id = os.getpid()
+        _process_token = uuid.uuid4().hex[:8]
+    return os.path.join(METRICS_CONFIG['dir'], f'{_process_id}-{_process_token}.json')
+
+
+def _write_json(path, data):
+    """先写临时文件再替换，读取方不会读到写了一半的文件"""
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.unlink(tmp_path)
+        raise
+
+
+def _read_json(path):
+    """读取快照文件，不存在或损坏时返回None"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def flush(force=False):
+    """把当前进程的累计值写入快照文件
+
+    参数:
+        force (bool): 为False时距上次写入不足 flush_interval 秒则跳过
+    """
+    global _last_flush
+    if not METRICS_CONFIG['dir']:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush < METRICS_CONFIG['flush_interval']:
+        return
+    with _flush_lock:
+        _last_flush = now
+        try:
+            os.makedirs(METRICS_CONFIG['dir'], exist_ok=True)
+            _write_json(_snapshot_path(), _process_snapshot())
+        except Exception as e:
+            print(f"写入指标快照错误: {e}")
+
+
+def _is_alive(pid):
+    """判断进程是否仍在运行"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True
+    return True
+
+
+def _archive_dead(directory):
+    """把已退出进程的快照并入 archive.json 并删除，调用方需持有目录锁"""
+    archive_path = os.path.join(directory, 'archive.json')
+    archive = {}
+    _merge(archive, (_read_json(archive_path) or {}).get('counters', []))
+    dead = []
+    for path in glob.glob(os.path.join(directory, '*-*.json')):
+        pid = int(os.path.basename(path).split('-')[0])
+        if pid != os.getpid() and not _is_alive(pid):
+            snapshot = _read_json(path)
+            if snapshot:
+                _merge(archive, snapshot['counters'])
+            dead.append(path)
+    if dead:
+        _write_json(archive_path, {'counters': [[name, list(labels), value] for (name, labels), value in archive.items()]})
+        for path in dead:
+            os.unlink(path)
+
+
+def collect():
+    """汇总所有进程的指标
+
+    返回:
+        dict: (指标名称, 标签值) -> 值
+    """
+    values = {}
+    directory = METRICS_CONFIG['dir']
+    if not directory:
+        snapshot = _process_snapshot()
+        _merge(values, snapshot['counters'])
+        _merge(values, snapshot['gauges'])
+    else:
+        flush(force=True)
+        if fcntl is not None:
+            with open(os.path.join(directory, '.lock'), 'w') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    _archive_dead(directory)
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            snapshot = _read_json(path)
+            if snapshot:
+                _merge(values, snapshot.get('counters', []))
+                _merge(values, snapshot.get('gauges', []))
+    values[('sms_metrics_sample_rate', ())] = METRICS_CONFIG['sample_rate']
+    return values
+
+
+def _escape(value):
+    """转义Prometheus标签值"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names, values, extra=None):
+    """生成 {名称="值",...} 形式的标签，没有标签时返回空字符串"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def render_prometheus():
+    """以Prometheus文本格式输出所有指标
+
+    返回:
+        str: 指标文本
+    """
+    values = collect()
+    lines = []
+    for name, (kind, help_text, label_names, buckets) in FAMILIES.items():
+        entries = sorted((labels, value) for (metric, labels), value in values.items() if metric == name)
+        if not entries:
+            continue
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} {kind}')
+        for labels, value in entries:
+            if kind == 'histogram':
+                cumulative = 0
+                for bound, count in zip(buckets, value):
+                    cumulative += count
+                    bucket_labels = _format_labels(label_names, labels, 'le="%s"' % bound)
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                cumulative += value[len(buckets)]
+                bucket_labels = _format_labels(label_names, labels, 'le="+Inf"')
+                lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(label_names, labels)} {value[-1]}')
+                lines.append(f'{name}_count{_format_labels(label_names, labels)} {cumulative}')
+            else:
+                lines.append(f'{name}{_format_labels(label_names, labels)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def _endpoint():
+    """当前请求的路由名称，未匹配到路由时为 unmatched"""
+    return request.endpoint or 'unmatched'
+
+
+def _on_query(sql, params, seconds, error):
+    """SQL监听器，累计抽样请求中的SQL条数和耗时"""
+    if not has_request_context():
+        return
+    stats = g.get('_metrics_sql')
+    if stats is None:
+        return
+    stats[0] += 1
+    stats[1] += seconds
+    if error is not None:
+        _metrics.inc('sms_query_errors_total', (_endpoint(),))
+
+
+def _start_request():
+    """请求开始时决定是否抽样并开始计时"""
+    rate = METRICS_CONFIG['sample_rate']
+    if rate > 0 and (rate >= 1 or random.random() < rate):
+        g._metrics_start = time.perf_counter()
+        g._metrics_sql = [0, 0.0]  # SQL条数，SQL累计耗时
+
+
+def _finish_request(response):
+    """请求结束时记录状态码，抽样请求还记录耗时和SQL统计"""
+    endpoint = _endpoint()
+    _metrics.inc('sms_requests_total', (endpoint, request.method, str(response.status_code)))
+    start = g.get('_metrics_start')
+    if start is not None:
+        _metrics.observe('sms_request_duration_seconds', (endpoint, request.method), time.perf_counter() - start)
+        queries, query_seconds = g._metrics_sql
+        _metrics.observe('sms_request_queries', (endpoint,), queries)
+        _metrics.inc('sms_request_query_seconds_total', (endpoint,), query_seconds)
+    flush()
+    return response
+
+
+_listening = False
+
+
+def init_metrics(app):
+    """在Flask应用上注册指标收集"""
+    global _listening
+    if not METRICS_CONFIG['enabled']:
+        return
+    if METRICS_CONFIG['sample_rate'] > 0 and not _listening:
+        add_query_listener(_on_query)
+        _listening = True
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
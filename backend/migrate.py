@@ -0,0 +1,115 @@
+"""数据库迁移
+
+迁移脚本存放在 database/migrations 目录，文件名形如 001_add_name_indexes.sql，
+前面的数字为版本号。已执行的版本记录在 schema_version 表中，
+upgrade() 按版本号顺序执行尚未执行的迁移，status() 列出每个迁移的执行情况。
+
+MySQL 的DDL语句会隐式提交，迁移中途失败时已执行的语句无法回滚，
+需要根据错误信息手动处理后再重新执行。
+"""
+import os
+import re
+
+from .db import create_connection
+
+# 迁移脚本目录
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'database', 'migrations')
+
+# 迁移脚本文件名格式：版本号_名称.sql
+_FILENAME_RE = re.compile(r'^(\d+)_(\w+)\.sql$')
+
+
+def load_migrations():
+    """读取迁移脚本列表
+
+    返回:
+        list: 按版本号排序的 (版本号, 名称, 文件路径) 列表
+
+    异常:
+        ValueError: 存在重复的版本号
+    """
+    migrations = {}
+    for filename in os.listdir(MIGRATIONS_DIR):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        version = int(match.group(1))
+        if version in migrations:
+            raise ValueError(f'迁移版本号重复: {version}')
+        migrations[version] = (version, match.group(2), os.path.join(MIGRATIONS_DIR, filename))
+    return [migrations[version] for version in sorted(migrations)]
+
+
+def split_statements(sql):
+    """将迁移脚本拆分为单条SQL语句，忽略 -- 开头的注释行"""
+    lines = [line for line in sql.splitlines() if not line.strip().startswith('--')]
+    return [stmt.strip() for stmt in '\n'.join(lines).split(';') if stmt.strip()]
+
+
+def _ensure_version_table(cursor):
+    """创建记录迁移版本的 schema_version 表"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def _applied_versions(cursor):
+    """获取已执行的迁移版本及执行时间"""
+    cursor.execute("SELECT version, applied_at FROM schema_version")
+    return {row['version']: row['applied_at'] for row in cursor.fetchall()}
+
+
+def status():
+    """获取各迁移的执行情况
+
+    返回:
+        list: 每个迁移一个字典 {version, name, applied_at}，未执行的 applied_at 为None
+    """
+    conn = create_connection()
+    try:
+        with conn.cursor() as cursor:
+            _ensure_version_table(cursor)
+            applied = _applied_versions(cursor)
+    finally:
+        conn.close()
+    return [
+        {'version': version, 'name': name, 'applied_at': applied.get(version)}
+        for version, name, _ in load_migrations()
+    ]
+
+
+def upgrade(target=None):
+    """按版本号顺序执行尚未执行的迁移
+
+    参数:
+        target (int): 目标版本号，只执行不大于该版本的迁移；为None时执行全部
+
+    返回:
+        list: 本次执行的 (版本号, 名称) 列表
+    """
+    conn = create_connection()
+    done = []
+    try:
+        with conn.cursor() as cursor:
+            _ensure_version_table(cursor)
+            applied = _applied_versions(cursor)
+            for version, name, path in load_migrations():
+                if version in applied or (target is not None and version > target):
+                    continue
+                with open(path, encoding='utf-8') as f:
+                    statements = split_statements(f.read())
+                print(f"执行迁移 {version:03d}_{name}...")
+                for stmt in statements:
+                    cursor.execute(stmt)
+                cursor.execute(
+                    "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                    (version, name)
+                )
+                done.append((version, name))
+    finally:
+        conn.close()
+    return done
@@ -1,94 +1,365 @@
-import pymysql
-from pymysql.cursors import DictCursor
-from .config import DB_CONFIG
+import functools
+import time
+
+from .db import (
+    acquire_connection, release_connection, is_connection_error,
+    in_transaction, transaction, savepoint, record_write,
+    has_query_listeners, notify_query
+)
+from .cache import TTLCache, SingleFlight, written_table, table_versions
+from .search import SearchIndex, page_ids
+from .config import (
+    DEFAULT_PASSWORD, LIST_QUERY_CONFIG, ENROLLMENT_CACHE_CONFIG, SEARCH_INDEX_CONFIG,
+    REFERENCE_CACHE_CONFIG
+)
 
 class Database:
     def __init__(self):
         self.conn = None
         self.cursor = None
+        self.lastrowid = None  # 最近一次插入语句生成的自增ID
         
     def connect(self):
-        """连接数据库"""
+        """获取数据库连接
+        
+        请求中复用绑定到当前请求的连接，同一请求内的所有模型共用一个连接
+        """
         try:
-            self.conn = pymysql.connect(
-                host=DB_CONFIG['host'],
-                user=DB_CONFIG['user'],
-                password=DB_CONFIG['password'],
-                database=DB_CONFIG['database'],
-                charset=DB_CONFIG['charset'],
-                cursorclass=DictCursor
-            )
+            self.conn = acquire_connection()
             self.cursor = self.conn.cursor()
             return True
         except Exception as e:
             print(f"数据库连接错误: {e}")
             return False
     
-    def close(self):
-        """关闭数据库连接"""
+    def close(self, discard=False):
+        """关闭游标并交还连接
+        
+        请求绑定的连接在请求结束时才归还连接池
+        
+        参数:
+            discard (bool): 连接已损坏时为True，连接池会直接关闭该连接而不复用
+        """
         if self.cursor:
             self.cursor.close()
         if self.conn:
-            self.conn.close()
+            release_connection(self.conn, discard=discard)
+        self.conn = None
+        self.cursor = None
+    
+    def transaction(self):
+        """开启显式事务，with 块内所有模型的写操作共用一次提交
+        
+        事务中的SQL错误不再被吞掉，而是抛出异常使整个事务回滚
+        """
+        return transaction()
+    
+    def savepoint(self):
+        """在当前事务中创建保存点，with 块出错时只回滚到保存点"""
+        return savepoint()
+    
+    def _execute(self, sql, params, many=False):
+        """在当前游标上执行SQL，注册了监听器时记录耗时并通知监听器
+        
+        参数:
+            sql (str): SQL语句
+            params: 参数，many 为True时为参数列表
+            many (bool): 是否使用 executemany 批量执行
+            
+        返回:
+            int: 受影响的行数
+        """
+        run = self.cursor.executemany if many else self.cursor.execute
+        if not has_query_listeners():
+            return run(sql, params)
+        start = time.perf_counter()
+        try:
+            result = run(sql, params)
+        except Exception as e:
+            notify_query(sql, params, time.perf_counter() - start, e)
+            raise
+        notify_query(sql, params, time.perf_counter() - start)
+        return result
+    
+    def _record_write(self, sql):
+        """写语句执行成功后递增对应表的版本号，使依赖该表的缓存失效"""
+        table = written_table(sql)
+        if table:
+            record_write(table)
     
     def execute_query(self, sql, params=None):
         """执行查询语句"""
         result = None
+        discard = False
         try:
             self.connect()
-            self.cursor.execute(sql, params or ())
+            self._execute(sql, params or ())
             result = self.cursor.fetchall()
         except Exception as e:
             print(f"查询执行错误: {e}")
+            if in_transaction():
+                raise
+            discard = is_connection_error(e)
         finally:
-            self.close()
+            self.close(discard)
         return result
     
     def execute_one(self, sql, params=None):
         """执行查询语句并返回一条结果"""
         result = None
+        discard = False
         try:
             self.connect()
-            self.cursor.execute(sql, params or ())
+            self._execute(sql, params or ())
             result = self.cursor.fetchone()
         except Exception as e:
             print(f"查询执行错误: {e}")
+            if in_transaction():
+                raise
+            discard = is_connection_error(e)
         finally:
-            self.close()
+            self.close(discard)
         return result
     
     def execute_update(self, sql, params=None):
-        """执行更新语句"""
+        """执行更新语句
+        
+        连接池中的连接处于自动提交模式，语句执行成功即已提交，失败时由MySQL回滚该语句；
+        在显式事务中则等到事务结束时统一提交
+        """
         result = False
+        discard = False
         try:
             self.connect()
-            rows = self.cursor.execute(sql, params or ())
-            self.conn.commit()
-            result = rows
+            result = self._execute(sql, params or ())
+            self.lastrowid = self.cursor.lastrowid
+            self._record_write(sql)
         except Exception as e:
-            if self.conn:
-                self.conn.rollback()
             print(f"更新执行错误: {e}")
+            if in_transaction():
+                raise
+            discard = is_connection_error(e)
         finally:
-            self.close()
+            self.close(discard)
         return result
     
     def execute_many(self, sql, params_list):
-        """批量执行SQL语句"""
+        """批量执行SQL语句
+        
+        整批语句在一个事务中执行，要么全部成功要么全部回滚；已处于事务中时加入外层事务
+        """
         result = False
         try:
-            self.connect()
-            rows = self.cursor.executemany(sql, params_list)
-            self.conn.commit()
-            result = rows
+            with transaction():
+                self.connect()
+                try:
+                    result = self._execute(sql, params_list, many=True)
+                    self.lastrowid = self.cursor.lastrowid
+                    self._record_write(sql)
+                finally:
+                    self.close()
         except Exception as e:
-            if self.conn:
-                self.conn.rollback()
             print(f"批量执行错误: {e}")
-        finally:
-            self.close()
+            if in_transaction():
+                raise
         return result
 
+# 列表总数缓存，键中包含相关表的版本号，表被修改后旧的总数不会再被使用
+_count_cache = TTLCache(
+    maxsize=LIST_QUERY_CONFIG['count_cache_size'],
+    ttl=LIST_QUERY_CONFIG['count_cache_ttl']
+)
+
+def _fetch_page(db, select_sql, count_sql, key, where=None, params=(),
+                page=1, items_per_page=10, after=None, tables=()):
+    """执行分页列表查询
+    
+    页码模式使用 LIMIT offset, n；游标模式按主键定位，只读取主键大于 after 的下一页，
+    无论翻到第几页代价都相同。
+    
+    页码模式的总数按 (计数语句, 搜索条件, 相关表版本号) 缓存，命中时只执行一条分页查询；
+    未命中时用 COUNT(*) OVER() 在分页查询中一并返回总数，只需一次往返
+    
+    参数:
+        db (Database): 执行查询的数据库对象
+        select_sql (str): 不含 WHERE/ORDER BY/LIMIT 的查询语句
+        count_sql (str): 不含 WHERE 的计数语句
+        key (str): 排序和定位所用的主键列，如 s.student_id
+        where (str): 搜索条件，可选
+        params (tuple): 搜索条件的参数
+        page (int): 页码模式下的页码，从1开始
+        items_per_page (int): 每页条目数
+        after (int): 游标模式下上一页最后一条记录的主键，为None时使用页码模式
+        tables (tuple): 查询涉及的表，用于总数缓存失效
+        
+    返回:
+        tuple: 页码模式返回 (当前页记录, 总数)；
+               游标模式返回 (当前页记录, 下一页的起始主键，没有下一页时为None)
+    """
+    if after is not None:
+        conditions = [f"({where})"] if where else []
+        conditions.append(f"{key} > %s")
+        sql = f"{select_sql} WHERE {' AND '.join(conditions)} ORDER BY {key} LIMIT %s"
+        # 多取一条用于判断是否还有下一页
+        rows = db.execute_query(sql, tuple(params) + (after, items_per_page + 1))
+        if rows is None:
+            return None, None
+        next_after = None
+        if len(rows) > items_per_page:
+            rows = rows[:items_per_page]
+            next_after = rows[-1][key.split('.')[-1]]
+        return rows, next_after
+    
+    offset = (page - 1) * items_per_page
+    where_sql = f" WHERE {where}" if where else ""
+    cache_key = (count_sql, where, tuple(params), table_versions(*tables))
+    total = _count_cache.get(cache_key)
+    
+    if total is None and LIST_QUERY_CONFIG['window_count']:
+        # 窗口函数在 LIMIT 之前计算，返回的是满足条件的全部记录数
+        select_sql = select_sql.replace("SELECT", "SELECT COUNT(*) OVER() AS _total,", 1)
+    sql = f"{select_sql}{where_sql} ORDER BY {key} LIMIT %s, %s"
+    rows = db.execute_query(sql, tuple(params) + (offset, items_per_page))
+    if rows is None:
+        return None, 0
+    
+    if total is None:
+        if rows and '_total' in rows[0]:
+            total = rows[0]['_total']
+        else:
+            # 页码超出范围或未启用窗口函数时单独计数
+            result = db.execute_one(f"{count_sql}{where_sql}", tuple(params))
+            if result is None:
+                return rows, 0
+            total = result['count']
+        _count_cache.set(cache_key, total)
+    for row in rows:
+        row.pop('_total', None)
+    return rows, total
+
+# 批量按ID查询时每条 IN (...) 语句包含的最大ID数量
+ID_CHUNK_SIZE = 500
+
+def _fetch_by_ids(db, select_sql, key, ids):
+    """按主键批量查询
+    
+    ID去重后按 ID_CHUNK_SIZE 分块，每块执行一条 WHERE key IN (...) 查询
+    
+    参数:
+        db (Database): 执行查询的数据库对象
+        select_sql (str): 不含 WHERE 的查询语句
+        key (str): 主键列，如 s.student_id
+        ids (iterable): 要查询的主键
+        
+    返回:
+        dict: 主键到记录的映射，不存在的主键不出现在结果中
+    """
+    unique_ids = list(dict.fromkeys(ids))
+    column = key.split('.')[-1]
+    result = {}
+    for i in range(0, len(unique_ids), ID_CHUNK_SIZE):
+        chunk = unique_ids[i:i + ID_CHUNK_SIZE]
+        placeholders = ', '.join(['%s'] * len(chunk))
+        rows = db.execute_query(f"{select_sql} WHERE {key} IN ({placeholders})", tuple(chunk))
+        for row in rows or []:
+            result[row[column]] = row
+    return result
+
+def _fetch_id_page(db, select_sql, key, ids, page=1, items_per_page=10, after=None):
+    """对搜索索引返回的升序ID分页，只按主键取出当前页的记录
+    
+    参数与返回值同 _fetch_page
+    """
+    chunk, extra = page_ids(ids, page, items_per_page, after)
+    rows = _fetch_by_ids(db, select_sql, key, chunk)
+    return [rows[id_] for id_ in chunk if id_ in rows], extra
+
+def _make_search_index(table, key, fields):
+    """创建一张表的搜索索引，首次搜索时从数据库加载主键和搜索字段"""
+    sql = f"SELECT {', '.join((key,) + fields)} FROM {table}"
+    return SearchIndex(
+        lambda: Database().execute_query(sql), key, fields, table=table,
+        rebuild_interval=SEARCH_INDEX_CONFIG['rebuild_interval'],
+        refresh_interval=SEARCH_INDEX_CONFIG['refresh_interval']
+    )
+
+def _search_ids(index, search):
+    """通过搜索索引查找匹配的ID，未启用或索引不可用时返回None"""
+    if not SEARCH_INDEX_CONFIG['enabled']:
+        return None
+    return index.search(search)
+
+# 学生、教师、课程的搜索索引，由各模型的增删改方法增量维护
+student_search = _make_search_index('student', 'student_id', ('name', 'student_no'))
+teacher_search = _make_search_index('teacher', 'teacher_id', ('name', 'teacher_no'))
+course_search = _make_search_index('course', 'course_id', ('course_name', 'course_code'))
+
+# 参考数据缓存，键中包含相关表的版本号，对应表的增删改会使缓存立即失效
+_reference_cache = TTLCache(maxsize=64, ttl=REFERENCE_CACHE_CONFIG['ttl'])
+
+def _cached_reference(name, tables, loader):
+    """读取参考数据，优先使用缓存
+    
+    参数:
+        name (str): 缓存名称
+        tables (tuple): 数据来源的表
+        loader (function): 缓存未命中时查询数据库的函数
+        
+    返回:
+        list: 记录列表的副本，调用方修改不会影响缓存
+    """
+    key = (name, table_versions(*tables))
+    rows = _reference_cache.get(key)
+    if rows is None:
+        rows = loader()
+        if rows is None:
+            return None
+        _reference_cache.set(key, rows)
+    return [dict(row) for row in rows]
+
+def reference_cache_stats():
+    """参考数据缓存的命中和未命中次数"""
+    return _reference_cache.stats()
+
+# 热点读方法的并发合并
+_flights = SingleFlight()
+
+def _coalesced(*tables):
+    """合并并发的相同读调用的装饰器
+    
+    方法名和参数都相同的并发调用只执行一次查询，其余调用等待并共享结果；
+    键中包含相关表的版本号，写操作之后开始的调用不会拿到写之前的结果。
+    事务中的调用可能读到未提交的数据，不参与合并
+    
+    参数:
+        tables (str): 方法读取的表名
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if in_transaction():
+                return method(self, *args, **kwargs)
+            key = (method.__qualname__, args, tuple(sorted(kwargs.items())), table_versions(*tables))
+            return _flights.do(key, lambda: method(self, *args, **kwargs))
+        return wrapper
+    return decorator
+
+def single_flight_stats():
+    """并发合并的统计信息"""
+    return _flights.stats()
+
+def cache_stats():
+    """模型层各缓存的统计信息
+    
+    返回:
+        dict: 缓存名称到统计信息的映射
+    """
+    return {
+        'list_count': _count_cache.stats(),
+        'reference': _reference_cache.stats(),
+        'enrollment': _enrollment_cache.stats(),
+    }
+
 # 用户模型
 class User:
     def __init__(self):
@@ -150,40 +421,42 @@ class Student:
     def __init__(self):
         self.db = Database()
     
-    def get_all_students(self, page=1, items_per_page=10, search=None):
-        """获取所有学生"""
-        offset = (page - 1) * items_per_page
+    def get_all_students(self, page=1, items_per_page=10, search=None, after=None):
+        """获取所有学生
         
+        参数:
+            page (int): 页码，从1开始
+            items_per_page (int): 每页条目数
+            search (str): 搜索关键词，可选
+            after (int): 游标分页时上一页最后一条记录的ID，为None时按页码分页
+            
+        返回:
+            tuple: 页码分页返回 (列表, 总数)，游标分页返回 (列表, 下一页起始ID)
+        """
+        sql = """
+            SELECT s.*, c.class_name, co.college_name 
+            FROM student s
+            JOIN class c ON s.class_id = c.class_id
+            JOIN college co ON c.college_id = co.college_id
+        """
+        count_sql = "SELECT COUNT(*) as count FROM student s"
+        where, params = None, ()
         if search:
-            sql = """
-                SELECT s.*, c.class_name, co.college_name 
-                FROM student s
-                JOIN class c ON s.class_id = c.class_id
-                JOIN college co ON c.college_id = co.college_id
-                WHERE s.name LIKE %s OR s.student_no LIKE %s
-                ORDER BY s.student_id
-                LIMIT %s, %s
-            """
+            # 优先用搜索索引得到匹配的ID，只按主键取当前页，避免 LIKE '%x%' 全表扫描
+            ids = _search_ids(student_search, search)
+            if ids is not None:
+                return _fetch_id_page(
+                    self.db, sql, 's.student_id', ids,
+                    page=page, items_per_page=items_per_page, after=after
+                )
             search_param = f"%{search}%"
-            count_sql = """
-                SELECT COUNT(*) as count 
-                FROM student s
-                WHERE s.name LIKE %s OR s.student_no LIKE %s
-            """
-            total = self.db.execute_one(count_sql, (search_param, search_param))
-            return self.db.execute_query(sql, (search_param, search_param, offset, items_per_page)), total['count']
-        else:
-            sql = """
-                SELECT s.*, c.class_name, co.college_name 
-                FROM student s
-                JOIN class c ON s.class_id = c.class_id
-                JOIN college co ON c.college_id = co.college_id
-                ORDER BY s.student_id
-                LIMIT %s, %s
-            """
-            count_sql = "SELECT COUNT(*) as count FROM student"
-            total = self.db.execute_one(count_sql)
-            return self.db.execute_query(sql, (offset, items_per_page)), total['count']
+            where = "s.name LIKE %s OR s.student_no LIKE %s"
+            params = (search_param, search_param)
+        return _fetch_page(
+            self.db, sql, count_sql, 's.student_id', where, params,
+            page=page, items_per_page=items_per_page, after=after,
+            tables=('student', 'class', 'college')
+        )
     
     def get_student_by_id(self, student_id):
         """根据ID获取学生"""
@@ -196,23 +469,129 @@ class Student:
         """
         return self.db.execute_one(sql, (student_id,))
     
-    def add_student(self, data):
-        """添加学生"""
-        sql = """
-            INSERT INTO student 
-            (student_no, name, gender, birth_date, id_card, enrollment_date, 
-            class_id, address, phone, email) 
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-        params = (
+    # 新增学生的SQL，单条添加和批量导入共用
+    INSERT_SQL = """
+        INSERT INTO student 
+        (student_no, name, gender, birth_date, id_card, enrollment_date, 
+        class_id, address, phone, email) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """
+    
+    @staticmethod
+    def _insert_params(data):
+        """新增学生SQL的参数"""
+        return (
             data['student_no'], data['name'], data['gender'], data['birth_date'], 
             data['id_card'], data['enrollment_date'], data['class_id'], 
             data['address'], data['phone'], data['email']
         )
-        return self.db.execute_update(sql, params)
+    
+    def add_student(self, data):
+        """添加学生"""
+        result = self.db.execute_update(self.INSERT_SQL, self._insert_params(data))
+        if result:
+            student_search.update(dict(data, student_id=self.db.lastrowid))
+        return result
+    
+    def add_student_with_account(self, data, password=DEFAULT_PASSWORD):
+        """添加学生并为其创建登录账户
+        
+        学生记录和用户记录在同一个事务中写入，任一失败则全部回滚
+        
+        参数:
+            data (dict): 学生信息
+            password (str): 登录账户的初始密码
+            
+        返回:
+            int or bool: 新学生的ID，失败时返回False
+        """
+        try:
+            with self.db.transaction():
+                self.add_student(data)
+                student_id = self.db.lastrowid
+                User().create_user(data['student_no'], password, 'student', student_id)
+            return student_id
+        except Exception as e:
+            print(f"添加学生失败: {e}")
+            return False
+    
+    def add_students_with_accounts(self, rows, password=DEFAULT_PASSWORD):
+        """批量添加学生并为每个学生创建登录账户
+        
+        学生和用户记录各用一条批量插入写入，全部在同一个事务中，任一失败则整批回滚；
+        调用方需事先检查学号、班级等，保证整批都能插入
+        
+        参数:
+            rows (list): 学生信息列表
+            password (str): 登录账户的初始密码
+            
+        返回:
+            dict: 学号到新学生ID的映射
+            
+        异常:
+            插入失败时抛出数据库异常
+        """
+        student_nos = [data['student_no'] for data in rows]
+        with self.db.transaction():
+            self.db.execute_many(self.INSERT_SQL, [self._insert_params(data) for data in rows])
+            # 并发插入时自增ID不一定连续，按学号取回新学生的ID
+            new_ids = {}
+            for i in range(0, len(student_nos), ID_CHUNK_SIZE):
+                chunk = student_nos[i:i + ID_CHUNK_SIZE]
+                placeholders = ', '.join(['%s'] * len(chunk))
+                found = self.db.execute_query(
+                    f"SELECT student_id, student_no FROM student WHERE student_no IN ({placeholders})",
+                    tuple(chunk)
+                )
+                new_ids.update((row['student_no'], row['student_id']) for row in found)
+            self.db.execute_many(
+                "INSERT INTO user (username, password, role, related_id) VALUES (%s, %s, 'student', %s)",
+                [(student_no, password, new_ids[student_no]) for student_no in student_nos]
+            )
+        for data in rows:
+            student_search.update(dict(data, student_id=new_ids[data['student_no']]))
+        return new_ids
+    
+    def find_existing(self, student_nos, id_cards):
+        """查找数据库中已存在的学号和身份证号
+        
+        学号同时是登录用户名，已被其他用户占用的学号也视为已存在；
+        比较时不区分大小写，与数据库默认排序规则一致
+        
+        参数:
+            student_nos (iterable): 要检查的学号
+            id_cards (iterable): 要检查的身份证号
+            
+        返回:
+            tuple: (已存在学号的小写集合, 已存在身份证号的小写集合)
+        """
+        checks = (
+            ("SELECT student_no AS value FROM student WHERE student_no IN ({})", student_nos),
+            ("SELECT username AS value FROM user WHERE username IN ({})", student_nos),
+            ("SELECT id_card AS value FROM student WHERE id_card IN ({})", id_cards),
+        )
+        found = []
+        for sql, values in checks:
+            values = list(dict.fromkeys(values))
+            existing = set()
+            for i in range(0, len(values), ID_CHUNK_SIZE):
+                chunk = values[i:i + ID_CHUNK_SIZE]
+                rows = self.db.execute_query(sql.format(', '.join(['%s'] * len(chunk))), tuple(chunk))
+                if rows is None:
+                    raise RuntimeError('查询已存在的学号和身份证号失败')
+                existing.update(str(row['value']).lower() for row in rows)
+            found.append(existing)
+        return found[0] | found[1], found[2]
     
     def update_student(self, student_id, data):
-        """更新学生信息"""
+        """更新学生信息
+        
+        学号同时是登录用户名，学生记录和登录账户的用户名在同一个事务中更新，
+        新学号已被其他用户占用时全部回滚
+        
+        返回:
+            int or bool: 受影响的行数，失败时返回False
+        """
         sql = """
             UPDATE student 
             SET student_no = %s, name = %s, gender = %s, birth_date = %s, 
@@ -225,52 +604,82 @@ class Student:
             data['id_card'], data['enrollment_date'], data['class_id'], 
             data['address'], data['phone'], data['email'], data['status'], student_id
         )
-        return self.db.execute_update(sql, params)
+        try:
+            with self.db.transaction():
+                result = self.db.execute_update(sql, params)
+                self.db.execute_update(
+                    "UPDATE user SET username = %s WHERE role = 'student' AND related_id = %s",
+                    (data['student_no'], student_id)
+                )
+        except Exception as e:
+            print(f"更新学生失败: {e}")
+            return False
+        if result:
+            student_search.update(dict(data, student_id=student_id))
+        return result
     
     def delete_student(self, student_id):
-        """删除学生"""
-        sql = "DELETE FROM student WHERE student_id = %s"
-        return self.db.execute_update(sql, (student_id,))
+        """删除学生及其登录账户
+        
+        学生记录和登录账户在同一个事务中删除，任一失败则全部回滚
+        
+        返回:
+            int or bool: 删除的学生记录数，失败时返回False
+        """
+        try:
+            with self.db.transaction():
+                self.db.execute_update(
+                    "DELETE FROM user WHERE role = 'student' AND related_id = %s", (student_id,)
+                )
+                result = self.db.execute_update("DELETE FROM student WHERE student_id = %s", (student_id,))
+        except Exception as e:
+            print(f"删除学生失败: {e}")
+            return False
+        if result:
+            student_search.remove(student_id)
+        return result
 
 # 教师模型
 class Teacher:
     def __init__(self):
         self.db = Database()
     
-    def get_all_teachers(self, page=1, items_per_page=10, search=None):
-        """获取所有教师"""
-        offset = (page - 1) * items_per_page
+    def get_all_teachers(self, page=1, items_per_page=10, search=None, after=None):
+        """获取所有教师
         
+        参数:
+            page (int): 页码，从1开始
+            items_per_page (int): 每页条目数
+            search (str): 搜索关键词，可选
+            after (int): 游标分页时上一页最后一条记录的ID，为None时按页码分页
+            
+        返回:
+            tuple: 页码分页返回 (列表, 总数)，游标分页返回 (列表, 下一页起始ID)
+        """
+        sql = """
+            SELECT t.*, c.college_name, tt.title_name 
+            FROM teacher t
+            JOIN college c ON t.college_id = c.college_id
+            LEFT JOIN title tt ON t.title_id = tt.title_id
+        """
+        count_sql = "SELECT COUNT(*) as count FROM teacher t"
+        where, params = None, ()
         if search:
-            sql = """
-                SELECT t.*, c.college_name, tt.title_name 
-                FROM teacher t
-                JOIN college c ON t.college_id = c.college_id
-                LEFT JOIN title tt ON t.title_id = tt.title_id
-                WHERE t.name LIKE %s OR t.teacher_no LIKE %s
-                ORDER BY t.teacher_id
-                LIMIT %s, %s
-            """
+            # 优先用搜索索引得到匹配的ID，只按主键取当前页，避免 LIKE '%x%' 全表扫描
+            ids = _search_ids(teacher_search, search)
+            if ids is not None:
+                return _fetch_id_page(
+                    self.db, sql, 't.teacher_id', ids,
+                    page=page, items_per_page=items_per_page, after=after
+                )
             search_param = f"%{search}%"
-            count_sql = """
-                SELECT COUNT(*) as count 
-                FROM teacher t
-                WHERE t.name LIKE %s OR t.teacher_no LIKE %s
-            """
-            total = self.db.execute_one(count_sql, (search_param, search_param))
-            return self.db.execute_query(sql, (search_param, search_param, offset, items_per_page)), total['count']
-        else:
-            sql = """
-                SELECT t.*, c.college_name, tt.title_name 
-                FROM teacher t
-                JOIN college c ON t.college_id = c.college_id
-                LEFT JOIN title tt ON t.title_id = tt.title_id
-                ORDER BY t.teacher_id
-                LIMIT %s, %s
-            """
-            count_sql = "SELECT COUNT(*) as count FROM teacher"
-            total = self.db.execute_one(count_sql)
-            return self.db.execute_query(sql, (offset, items_per_page)), total['count']
+            where = "t.name LIKE %s OR t.teacher_no LIKE %s"
+            params = (search_param, search_param)
+        return _fetch_page(
+            self.db, sql, count_sql, 't.teacher_id', where, params,
+            page=page, items_per_page=items_per_page, after=after,
+            tables=('teacher', 'college', 'title')
+        )
     
     def get_teacher_by_id(self, teacher_id):
         """根据ID获取教师"""
@@ -294,7 +703,10 @@ class Teacher:
             data['teacher_no'], data['name'], data['gender'], data['birth_date'], 
             data['title_id'], data['college_id'], data['phone'], data['email']
         )
-        return self.db.execute_update(sql, params)
+        result = self.db.execute_update(sql, params)
+        if result:
+            teacher_search.update(dict(data, teacher_id=self.db.lastrowid))
+        return result
     
     def update_teacher(self, teacher_id, data):
         """更新教师信息"""
@@ -308,53 +720,63 @@ class Teacher:
             data['teacher_no'], data['name'], data['gender'], data['birth_date'], 
             data['title_id'], data['college_id'], data['phone'], data['email'], teacher_id
         )
-        return self.db.execute_update(sql, params)
+        result = self.db.execute_update(sql, params)
+        if result:
+            teacher_search.update(dict(data, teacher_id=teacher_id))
+        return result
     
     def delete_teacher(self, teacher_id):
         """删除教师"""
         sql = "DELETE FROM teacher WHERE teacher_id = %s"
-        return self.db.execute_update(sql, (teacher_id,))
+        result = self.db.execute_update(sql, (teacher_id,))
+        if result:
+            teacher_search.remove(teacher_id)
+        return result
 
 # 课程模型
 class Course:
     def __init__(self):
         self.db = Database()
     
-    def get_all_courses(self, page=1, items_per_page=10, search=None):
-        """获取所有课程"""
-        offset = (page - 1) * items_per_page
+    @_coalesced('course', 'course_type', 'college')
+    def get_all_courses(self, page=1, items_per_page=10, search=None, after=None):
+        """获取所有课程
         
+        参数:
+            page (int): 页码，从1开始
+            items_per_page (int): 每页条目数
+            search (str): 搜索关键词，可选
+            after (int): 游标分页时上一页最后一条记录的ID，为None时按页码分页
+            
+        返回:
+            tuple: 页码分页返回 (列表, 总数)，游标分页返回 (列表, 下一页起始ID)
+        """
+        sql = """
+            SELECT c.*, ct.type_name, co.college_name 
+            FROM course c
+            JOIN course_type ct ON c.type_id = ct.type_id
+            JOIN college co ON c.college_id = co.college_id
+        """
+        count_sql = "SELECT COUNT(*) as count FROM course c"
+        where, params = None, ()
         if search:
-            sql = """
-                SELECT c.*, ct.type_name, co.college_name 
-                FROM course c
-                JOIN course_type ct ON c.type_id = ct.type_id
-                JOIN college co ON c.college_id = co.college_id
-                WHERE c.course_name LIKE %s OR c.course_code LIKE %s
-                ORDER BY c.course_id
-                LIMIT %s, %s
-            """
+            # 优先用搜索索引得到匹配的ID，只按主键取当前页，避免 LIKE '%x%' 全表扫描
+            ids = _search_ids(course_search, search)
+            if ids is not None:
+                return _fetch_id_page(
+                    self.db, sql, 'c.course_id', ids,
+                    page=page, items_per_page=items_per_page, after=after
+                )
             search_param = f"%{search}%"
-            count_sql = """
-                SELECT COUNT(*) as count 
-                FROM course c
-                WHERE c.course_name LIKE %s OR c.course_code LIKE %s
-            """
-            total = self.db.execute_one(count_sql, (search_param, search_param))
-            return self.db.execute_query(sql, (search_param, search_param, offset, items_per_page)), total['count']
-        else:
-            sql = """
-                SELECT c.*, ct.type_name, co.college_name 
-                FROM course c
-                JOIN course_type ct ON c.type_id = ct.type_id
-                JOIN college co ON c.college_id = co.college_id
-                ORDER BY c.course_id
-                LIMIT %s, %s
-            """
-            count_sql = "SELECT COUNT(*) as count FROM course"
-            total = self.db.execute_one(count_sql)
-            return self.db.execute_query(sql, (offset, items_per_page)), total['count']
+            where = "c.course_name LIKE %s OR c.course_code LIKE %s"
+            params = (search_param, search_param)
+        return _fetch_page(
+            self.db, sql, count_sql, 'c.course_id', where, params,
+            page=page, items_per_page=items_per_page, after=after,
+            tables=('course', 'course_type', 'college')
+        )
     
+    @_coalesced('course', 'course_type', 'college')
     def get_course_by_id(self, course_id):
         """根据ID获取课程"""
         sql = """
@@ -366,6 +788,29 @@ class Course:
         """
         return self.db.execute_one(sql, (course_id,))
     
+    def get_student_courses(self, student_id):
+        """获取学生已选的课程及其成绩和状态
+        
+        一条关联查询返回全部课程，查询次数与学生选课数量无关
+        
+        参数:
+            student_id (int): 学生ID
+            
+        返回:
+            list: 课程列表，每门课程附带 score 和 status
+        """
+        sql = """
+            SELECT c.*, ct.type_name, co.college_name, sc.score, sc.status
+            FROM student_course sc
+            JOIN course_offering o ON sc.offering_id = o.offering_id
+            JOIN course c ON o.course_id = c.course_id
+            JOIN course_type ct ON c.type_id = ct.type_id
+            JOIN college co ON c.college_id = co.college_id
+            WHERE sc.student_id = %s
+            ORDER BY o.year DESC, o.semester DESC
+        """
+        return self.db.execute_query(sql, (student_id,))
+    
     def add_course(self, data):
         """添加课程"""
         sql = """
@@ -377,7 +822,10 @@ class Course:
             data['course_code'], data['course_name'], data['credit'], 
             data['hours'], data['type_id'], data['college_id']
         )
-        return self.db.execute_update(sql, params)
+        result = self.db.execute_update(sql, params)
+        if result:
+            course_search.update(dict(data, course_id=self.db.lastrowid))
+        return result
     
     def update_course(self, course_id, data):
         """更新课程信息"""
@@ -391,12 +839,18 @@ class Course:
             data['course_code'], data['course_name'], data['credit'], 
             data['hours'], data['type_id'], data['college_id'], course_id
         )
-        return self.db.execute_update(sql, params)
+        result = self.db.execute_update(sql, params)
+        if result:
+            course_search.update(dict(data, course_id=course_id))
+        return result
     
     def delete_course(self, course_id):
         """删除课程"""
         sql = "DELETE FROM course WHERE course_id = %s"
-        return self.db.execute_update(sql, (course_id,))
+        result = self.db.execute_update(sql, (course_id,))
+        if result:
+            course_search.remove(course_id)
+        return result
 
 # 班级模型
 class Class:
@@ -404,14 +858,14 @@ class Class:
         self.db = Database()
     
     def get_all_classes(self):
-        """获取所有班级"""
+        """获取所有班级，结果缓存，班级或学院被修改后失效"""
         sql = """
             SELECT c.*, co.college_name 
             FROM class c
             JOIN college co ON c.college_id = co.college_id
             ORDER BY c.class_id
         """
-        return self.db.execute_query(sql)
+        return _cached_reference('classes', ('class', 'college'), lambda: self.db.execute_query(sql))
     
     def get_class_by_id(self, class_id):
         """根据ID获取班级"""
@@ -461,9 +915,9 @@ class College:
         self.db = Database()
     
     def get_all_colleges(self):
-        """获取所有学院"""
+        """获取所有学院，结果缓存，学院被修改后失效"""
         sql = "SELECT * FROM college ORDER BY college_id"
-        return self.db.execute_query(sql)
+        return _cached_reference('colleges', ('college',), lambda: self.db.execute_query(sql))
         
     def get_college_by_id(self, college_id):
         """根据ID获取学院"""
@@ -501,9 +955,9 @@ class Title:
         self.db = Database()
     
     def get_all_titles(self):
-        """获取所有职称"""
+        """获取所有职称，结果缓存，职称被修改后失效"""
         sql = "SELECT * FROM title ORDER BY title_id"
-        return self.db.execute_query(sql)
+        return _cached_reference('titles', ('title',), lambda: self.db.execute_query(sql))
 
 # 课程类型模型
 class CourseType:
@@ -511,51 +965,52 @@ class CourseType:
         self.db = Database()
     
     def get_all_course_types(self):
-        """获取所有课程类型"""
+        """获取所有课程类型，结果缓存，课程类型被修改后失效"""
         sql = "SELECT * FROM course_type ORDER BY type_id"
-        return self.db.execute_query(sql)
+        return _cached_reference('course_types', ('course_type',), lambda: self.db.execute_query(sql))
 
 # 授课安排模型
 class CourseOffering:
     def __init__(self):
         self.db = Database()
     
-    def get_all_offerings(self, page=1, items_per_page=10, search=None):
-        """获取所有授课安排"""
-        offset = (page - 1) * items_per_page
+    @_coalesced('course_offering', 'course', 'teacher')
+    def get_all_offerings(self, page=1, items_per_page=10, search=None, after=None):
+        """获取所有授课安排
         
+        参数:
+            page (int): 页码，从1开始
+            items_per_page (int): 每页条目数
+            search (str): 搜索关键词，可选
+            after (int): 游标分页时上一页最后一条记录的ID，为None时按页码分页
+            
+        返回:
+            tuple: 页码分页返回 (列表, 总数)，游标分页返回 (列表, 下一页起始ID)
+        """
+        sql = """
+            SELECT co.*, c.course_name, c.course_code, t.name as teacher_name 
+            FROM course_offering co
+            JOIN course c ON co.course_id = c.course_id
+            JOIN teacher t ON co.teacher_id = t.teacher_id
+        """
+        count_sql = "SELECT COUNT(*) as count FROM course_offering co"
+        where, params = None, ()
         if search:
-            sql = """
-                SELECT co.*, c.course_name, c.course_code, t.name as teacher_name 
-                FROM course_offering co
-                JOIN course c ON co.course_id = c.course_id
-                JOIN teacher t ON co.teacher_id = t.teacher_id
-                WHERE c.course_name LIKE %s OR t.name LIKE %s
-                ORDER BY co.offering_id
-                LIMIT %s, %s
-            """
             search_param = f"%{search}%"
+            # 搜索条件涉及课程名和教师名，计数时也需要关联这两张表
             count_sql = """
                 SELECT COUNT(*) as count 
                 FROM course_offering co
                 JOIN course c ON co.course_id = c.course_id
                 JOIN teacher t ON co.teacher_id = t.teacher_id
-                WHERE c.course_name LIKE %s OR t.name LIKE %s
             """
-            total = self.db.execute_one(count_sql, (search_param, search_param))
-            return self.db.execute_query(sql, (search_param, search_param, offset, items_per_page)), total['count']
-        else:
-            sql = """
-                SELECT co.*, c.course_name, c.course_code, t.name as teacher_name 
-                FROM course_offering co
-                JOIN course c ON co.course_id = c.course_id
-                JOIN teacher t ON co.teacher_id = t.teacher_id
-                ORDER BY co.offering_id
-                LIMIT %s, %s
-            """
-            count_sql = "SELECT COUNT(*) as count FROM course_offering"
-            total = self.db.execute_one(count_sql)
-            return self.db.execute_query(sql, (offset, items_per_page)), total['count']
+            where = "c.course_name LIKE %s OR t.name LIKE %s"
+            params = (search_param, search_param)
+        return _fetch_page(
+            self.db, sql, count_sql, 'co.offering_id', where, params,
+            page=page, items_per_page=items_per_page, after=after,
+            tables=('course_offering', 'course', 'teacher')
+        )
     
     def add_offering(self, data):
         """添加授课安排"""
@@ -570,6 +1025,7 @@ class CourseOffering:
         )
         return self.db.execute_update(sql, params)
     
+    @_coalesced('course_offering', 'course', 'teacher')
     def get_offering_by_id(self, offering_id):
         """根据ID获取授课安排"""
         sql = """
@@ -581,6 +1037,29 @@ class CourseOffering:
         """
         return self.db.execute_one(sql, (offering_id,))
     
+    def get_student_offerings(self, student_id):
+        """获取学生已选的授课安排及其成绩和状态
+        
+        一条关联查询返回全部授课安排，查询次数与学生选课数量无关
+        
+        参数:
+            student_id (int): 学生ID
+            
+        返回:
+            list: 授课安排列表，每条附带 score 和 status
+        """
+        sql = """
+            SELECT co.*, c.course_name, c.course_code, t.name as teacher_name,
+            sc.score, sc.status
+            FROM student_course sc
+            JOIN course_offering co ON sc.offering_id = co.offering_id
+            JOIN course c ON co.course_id = c.course_id
+            JOIN teacher t ON co.teacher_id = t.teacher_id
+            WHERE sc.student_id = %s
+            ORDER BY co.year DESC, co.semester DESC
+        """
+        return self.db.execute_query(sql, (student_id,))
+    
     def update_offering(self, offering_id, data):
         """更新授课安排"""
         sql = """
@@ -600,6 +1079,18 @@ class CourseOffering:
         sql = "DELETE FROM course_offering WHERE offering_id = %s"
         return self.db.execute_update(sql, (offering_id,))
 
+# 学生已选授课安排ID集合的缓存，键为学生ID
+_enrollment_cache = TTLCache(
+    maxsize=ENROLLMENT_CACHE_CONFIG['size'],
+    ttl=ENROLLMENT_CACHE_CONFIG['ttl']
+)
+
+def _same_score(stored, score):
+    """比较数据库中的成绩与新成绩是否相同，成绩列保留两位小数"""
+    if stored is None or score is None:
+        return stored is None and score is None
+    return round(float(stored), 2) == round(float(score), 2)
+
 # 成绩模型
 class Score:
     def __init__(self):
@@ -608,7 +1099,7 @@ class Score:
     def get_student_scores(self, student_id):
         """获取学生的成绩"""
         sql = """
-            SELECT sc.*, c.course_name, c.credit, t.name as teacher_name,
+            SELECT sc.*, co.course_id, c.course_name, c.credit, t.name as teacher_name,
             co.semester, co.year
             FROM student_course sc
             JOIN course_offering co ON sc.offering_id = co.offering_id
@@ -619,6 +1110,48 @@ class Score:
         """
         return self.db.execute_query(sql, (student_id,))
     
+    def get_enrolled_offering_ids(self, student_id):
+        """获取学生已选的授课安排ID集合
+        
+        只查询 student_course 表，结果按学生缓存，该学生的选课记录增删时失效
+        
+        参数:
+            student_id (int): 学生ID
+            
+        返回:
+            frozenset: 授课安排ID集合
+        """
+        offering_ids = _enrollment_cache.get(student_id)
+        if offering_ids is None:
+            sql = "SELECT offering_id FROM student_course WHERE student_id = %s"
+            rows = self.db.execute_query(sql, (student_id,))
+            if rows is None:
+                return frozenset()
+            offering_ids = frozenset(row['offering_id'] for row in rows)
+            _enrollment_cache.set(student_id, offering_ids)
+        return offering_ids
+    
+    def is_enrolled(self, student_id, offering_id):
+        """检查学生是否选了某个授课安排
+        
+        先查缓存的选课集合；集合中没有时再按 (student_id, offering_id) 唯一索引确认一次，
+        避免其他进程刚写入的选课因缓存未失效而被拒绝
+        
+        参数:
+            student_id (int): 学生ID
+            offering_id (int): 授课安排ID
+            
+        返回:
+            bool: 是否已选
+        """
+        if offering_id in self.get_enrolled_offering_ids(student_id):
+            return True
+        sql = "SELECT 1 FROM student_course WHERE student_id = %s AND offering_id = %s LIMIT 1"
+        if self.db.execute_one(sql, (student_id, offering_id)) is None:
+            return False
+        _enrollment_cache.pop(student_id)
+        return True
+    
     def add_score(self, data):
         """添加成绩"""
         sql = """
@@ -627,7 +1160,76 @@ class Score:
             VALUES (%s, %s, %s, %s)
         """
         params = (data['student_id'], data['offering_id'], data['score'], data['status'])
-        return self.db.execute_update(sql, params)
+        result = self.db.execute_update(sql, params)
+        _enrollment_cache.pop(data['student_id'])
+        return result
+    
+    def save_offering_scores(self, offering_id, rows):
+        """批量录入一个授课安排的成绩
+        
+        学生没有该授课安排的选课记录时新增，已有时更新成绩和状态；
+        所有记录用一条 INSERT ... ON DUPLICATE KEY UPDATE 批量语句在同一个事务中写入，任一失败则整批回滚
+        
+        参数:
+            offering_id (int): 授课安排ID
+            rows (list): 已校验的成绩 [{student_id, score, status}]，学生ID不重复
+            
+        返回:
+            dict: 学生ID到结果的映射，结果为 created（新增）、updated（更新）、
+                  unchanged（与原记录相同）或 missing（学生不存在，未写入）
+            
+        异常:
+            写入失败时抛出数据库异常
+        """
+        student_ids = [row['student_id'] for row in rows]
+        outcome = {}
+        with self.db.transaction():
+            found, existing = set(), {}
+            for i in range(0, len(student_ids), ID_CHUNK_SIZE):
+                chunk = tuple(student_ids[i:i + ID_CHUNK_SIZE])
+                placeholders = ', '.join(['%s'] * len(chunk))
+                students = self.db.execute_query(
+                    f"SELECT student_id FROM student WHERE student_id IN ({placeholders})", chunk
+                )
+                found.update(row['student_id'] for row in students)
+                # 锁定已有的选课记录，保证新增和更新的判断在提交前有效
+                records = self.db.execute_query(
+                    f"""
+                    SELECT student_id, score, status FROM student_course
+                    WHERE offering_id = %s AND student_id IN ({placeholders}) FOR UPDATE
+                    """,
+                    (offering_id,) + chunk
+                )
+                existing.update((row['student_id'], row) for row in records)
+            
+            params = []
+            for row in rows:
+                student_id = row['student_id']
+                if student_id not in found:
+                    outcome[student_id] = 'missing'
+                    continue
+                record = existing.get(student_id)
+                if record is None:
+                    outcome[student_id] = 'created'
+                elif record['status'] == row['status'] and _same_score(record['score'], row['score']):
+                    outcome[student_id] = 'unchanged'
+                    continue
+                else:
+                    outcome[student_id] = 'updated'
+                params.append((student_id, offering_id, row['score'], row['status']))
+            if params:
+                self.db.execute_many(
+                    """
+                    INSERT INTO student_course (student_id, offering_id, score, status)
+                    VALUES (%s, %s, %s, %s)
+                    ON DUPLICATE KEY UPDATE score = VALUES(score), status = VALUES(status)
+                    """,
+                    params
+                )
+        for student_id, result in outcome.items():
+            if result == 'created':
+                _enrollment_cache.pop(student_id)
+        return outcome
     
     def update_score(self, sc_id, score):
         """更新成绩"""
@@ -650,5 +1252,9 @@ class Score:
         
     def delete_score(self, sc_id):
         """删除成绩记录"""
+        record = self.db.execute_one("SELECT student_id FROM student_course WHERE sc_id = %s", (sc_id,))
         sql = "DELETE FROM student_course WHERE sc_id = %s"
-        return self.db.execute_update(sql, (sc_id,)) 
\ No newline at end of file
+        result = self.db.execute_update(sql, (sc_id,))
+        if record:
+            _enrollment_cache.pop(record['student_id'])
+        return result 
\ No newline at end of file
@@ -0,0 +1,199 @@
+"""按需性能分析
+
+管理员在请求中带上请求头 X-Profile 或查询参数 _profile 时，该请求在 cProfile 下执行：
+值包含 mem 时同时用 tracemalloc 记录请求期间的内存分配。
+每次分析保存为 PROFILING_CONFIG['dir'] 目录下的一组文件：
+    <ID>.prof      pstats 格式的分析数据，可用 python -m pstats 或 snakeviz 查看
+    <ID>.mem       tracemalloc 快照，可用 tracemalloc.Snapshot.load 读取（仅 mem）
+    <ID>.txt       文字摘要：累计耗时最多的函数和分配内存最多的代码行
+响应头 X-Profile-Id 返回本次分析的ID。
+
+未带开关的请求只多一次请求头和查询参数的查找，没有其他开销。
+tracemalloc 是进程级的，分析期间同一进程其他线程的内存分配也会被计入，同一时间只允许一个请求记录内存分配。
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+
+from flask import g, request, session
+
+from .config import PROFILING_CONFIG
+
+# 开关请求头和查询参数
+PROFILE_HEADER = 'X-Profile'
+PROFILE_PARAM = '_profile'
+
+# 分析ID的格式，下载时用于校验文件名
+PROFILE_ID_RE = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{8}$')
+
+# 保证同一时间只有一个请求使用 tracemalloc
+_memory_lock = threading.Lock()
+
+
+def _requested_modes():
+    """解析请求中的分析开关，没有开关时返回None"""
+    value = request.headers.get(PROFILE_HEADER) or request.args.get(PROFILE_PARAM)
+    if not value:
+        return None
+    modes = {mode.strip().lower() for mode in value.split(',')}
+    modes.add('cpu')
+    return modes
+
+
+def _start_profiling():
+    """请求开始时按开关启动分析，只对管理员生效"""
+    modes = _requested_modes()
+    if modes is None or session.get('role') != 'admin':
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # 已有其他分析器在运行（如另一个线程正在分析）
+        print(f"性能分析启动失败: {e}")
+        return
+    g._profiler = profiler
+    g._profile_request = request._get_current_object()
+    g._profile_started = time.perf_counter()
+    if 'mem' in modes and not tracemalloc.is_tracing() and _memory_lock.acquire(blocking=False):
+        tracemalloc.start(25)
+        g._profile_memory = True
+
+
+def _finish_profiling(response):
+    """请求结束时停止分析并保存结果"""
+    profiler = g.pop('_profiler', None)
+    if profiler is None:
+        return response
+    g.pop('_profile_request', None)
+    profiler.disable()
+    elapsed = time.perf_counter() - g.pop('_profile_started')
+    snapshot = None
+    if g.pop('_profile_memory', False):
+        try:
+            snapshot = tracemalloc.take_snapshot()
+        finally:
+            tracemalloc.stop()
+            _memory_lock.release()
+    try:
+        profile_id = save_profile(profiler, snapshot, elapsed, response.status_code)
+        response.headers['X-Profile-Id'] = profile_id
+    except Exception as e:
+        print(f"保存性能分析结果错误: {e}")
+    return response
+
+
+def _cleanup_profiling(exception=None):
+    """请求异常结束、未执行 after_request 时停止分析，释放 tracemalloc
+
+    批量请求的子请求与外层请求共用 g，子请求结束时不处理外层请求的分析
+    """
+    if g.get('_profile_request') is not request._get_current_object():
+        return
+    g.pop('_profile_request')
+    profiler = g.pop('_profiler', None)
+    if profiler is not None:
+        profiler.disable()
+    if g.pop('_profile_memory', False):
+        tracemalloc.stop()
+        _memory_lock.release()
+
+
+def save_profile(profiler, snapshot, elapsed, status):
+    """保存一次分析的结果
+
+    参数:
+        profiler (cProfile.Profile): 已停止的分析器
+        snapshot (tracemalloc.Snapshot): 内存分配快照，没有时为None
+        elapsed (float): 请求耗时（秒）
+        status (int): 响应状态码
+
+    返回:
+        str: 分析ID
+    """
+    directory = PROFILING_CONFIG['dir']
+    os.makedirs(directory, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    base = os.path.join(directory, profile_id)
+
+    profiler.dump_stats(base + '.prof')
+    summary = io.StringIO()
+    summary.write(json.dumps({
+        'id': profile_id,
+        'method': request.method,
+        'path': request.full_path.rstrip('?'),
+        'endpoint': request.endpoint,
+        'status': status,
+        'elapsed_ms': round(elapsed * 1000, 3),
+        'memory': snapshot is not None,
+    }, ensure_ascii=False) + '\n\n')
+    stats = pstats.Stats(profiler, stream=summary)
+    stats.sort_stats('cumulative').print_stats(40)
+    if snapshot is not None:
+        snapshot = snapshot.filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ))
+        snapshot.dump(base + '.mem')
+        summary.write('\n分配内存最多的代码行:\n')
+        for stat in snapshot.statistics('lineno')[:30]:
+            summary.write(f'{stat}\n')
+    with open(base + '.txt', 'w', encoding='utf-8') as f:
+        f.write(summary.getvalue())
+
+    _remove_old_profiles(directory)
+    return profile_id
+
+
+def _remove_old_profiles(directory):
+    """只保留最近的 max_profiles 次分析结果"""
+    ids = sorted({name.split('.')[0] for name in os.listdir(directory) if PROFILE_ID_RE.match(name.split('.')[0])})
+    for profile_id in ids[:-PROFILING_CONFIG['max_profiles']]:
+        for suffix in ('.prof', '.mem', '.txt'):
+            try:
+                os.unlink(os.path.join(directory, profile_id + suffix))
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles():
+    """列出已保存的分析结果，最新的在前
+
+    返回:
+        list: 每次分析一个字典 {id, 请求信息..., files: [文件名列表]}
+    """
+    directory = PROFILING_CONFIG['dir']
+    if not os.path.isdir(directory):
+        return []
+    files = {}
+    for name in os.listdir(directory):
+        profile_id = name.split('.')[0]
+        if PROFILE_ID_RE.match(profile_id):
+            files.setdefault(profile_id, []).append(name)
+    result = []
+    for profile_id in sorted(files, reverse=True):
+        info = {'id': profile_id}
+        try:
+            with open(os.path.join(directory, profile_id + '.txt'), encoding='utf-8') as f:
+                info.update(json.loads(f.readline()))
+        except (OSError, ValueError):
+            pass
+        info['files'] = sorted(files[profile_id])
+        result.append(info)
+    return result
+
+
+def init_profiling(app):
+    """在Flask应用上注册按需性能分析"""
+    if not PROFILING_CONFIG['enabled']:
+        return
+    app.before_request(_start_profiling)
+    app.after_request(_finish_profiling)
+    app.teardown_request(_cleanup_profiling)
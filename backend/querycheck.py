@@ -0,0 +1,97 @@
+"""请求SQL检查（调试和测试用）
+
+按SQL形状统计每个请求执行的SQL，在请求结束时检查：
+同一形状重复超过 repeat_threshold 次通常意味着在循环中逐条查询（N+1查询），
+应改为关联查询或按ID批量查询；视图函数用 utils.query_budget 声明了条数上限时，同时检查总条数。
+
+检查模式由应用配置 QUERY_CHECK_MODE 决定（默认取 QUERY_CHECK_CONFIG['mode']）：
+warn 打印警告，raise 抛出 QueryBudgetExceeded 使请求失败，便于测试及早发现查询数量膨胀；off 不检查。
+"""
+from collections import Counter
+
+from flask import current_app, g, request, has_request_context
+
+from .config import QUERY_CHECK_CONFIG
+from .db import add_query_listener
+from .querylog import normalize_sql
+
+
+class QueryBudgetExceeded(Exception):
+    """请求执行的SQL超出预算或同一形状重复次数过多"""
+
+
+class _RequestQueries:
+    """一个请求中执行的SQL统计"""
+
+    def __init__(self):
+        self.total = 0
+        self.shapes = Counter()
+
+
+def _on_query(sql, params, seconds, error):
+    """SQL监听器，按形状累计当前请求执行的SQL"""
+    if not has_request_context():
+        return
+    stats = g.get('_query_check')
+    if stats is None:
+        return
+    stats.total += 1
+    stats.shapes[normalize_sql(sql)] += 1
+
+
+def _mode():
+    return current_app.config.get('QUERY_CHECK_MODE', QUERY_CHECK_CONFIG['mode'])
+
+
+def _start_request():
+    """请求开始时开始统计"""
+    if _mode() != 'off':
+        g._query_check = _RequestQueries()
+
+
+def check_queries():
+    """检查当前请求执行的SQL
+
+    返回:
+        list: 发现的问题描述，没有问题时为空列表
+    """
+    stats = g.get('_query_check')
+    if stats is None:
+        return []
+    problems = []
+    threshold = current_app.config.get('QUERY_REPEAT_THRESHOLD', QUERY_CHECK_CONFIG['repeat_threshold'])
+    for shape, count in stats.shapes.most_common():
+        if count <= threshold:
+            break
+        problems.append(f'同一形状的SQL执行了 {count} 次（疑似N+1查询）: {shape}')
+    budget = g.get('_query_budget')
+    if budget is not None and stats.total > budget:
+        problems.append(f'执行了 {stats.total} 条SQL，超出预算 {budget} 条')
+    return problems
+
+
+def _finish_request(response):
+    """请求结束时检查SQL，按模式警告或抛出异常"""
+    problems = check_queries()
+    if problems:
+        message = f'{request.method} {request.full_path.rstrip("?")} ({request.endpoint}): ' + '；'.join(problems)
+        if _mode() == 'raise':
+            raise QueryBudgetExceeded(message)
+        print(f"SQL检查警告: {message}")
+    return response
+
+
+_listening = False
+
+
+def init_query_check(app):
+    """在Flask应用上注册请求SQL检查，模式为 off 时不注册"""
+    global _listening
+    app.config.setdefault('QUERY_CHECK_MODE', QUERY_CHECK_CONFIG['mode'])
+    if app.config['QUERY_CHECK_MODE'] == 'off':
+        return
+    if not _listening:
+        add_query_listener(_on_query)
+        _listening = True
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
@@ -0,0 +1,261 @@
+"""慢查询日志与SQL追踪
+
+通过 db.add_query_listener 监听 Database 执行的每条SQL：
+执行时间超过阈值的SQL、执行出错的SQL，以及按 trace_sample_rate 抽中的请求中的全部SQL，
+以每行一个JSON对象的格式写入可轮转的本地日志文件。
+
+每条记录包含规范化后的SQL形状（字面量和参数替换为 ?，IN 列表折叠）及其指纹、
+参数（默认只记录类型和长度）、发起查询的模型方法和当前路由，
+按指纹汇总即可找出占用时间最多的 LIKE 扫描和关联查询，无需开启MySQL的general log。
+"""
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+import uuid
+from logging.handlers import RotatingFileHandler
+
+try:
+    import fcntl
+except ImportError:  # Windows 没有 fcntl，多进程同时轮转时可能丢失少量日志
+    fcntl = None
+
+from flask import g, request, has_request_context
+
+from .config import SLOW_QUERY_CONFIG
+from .db import add_query_listener
+
+logger = logging.getLogger('sms.sql')
+
+
+class SharedRotatingFileHandler(RotatingFileHandler):
+    """可供多个进程同时写入的轮转日志处理器
+
+    写入和轮转时持有文件锁，只有一个进程执行轮转；
+    其他进程发现日志文件已被轮转（inode变化）后重新打开新文件
+    """
+
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, **kwargs)
+        self._lock_file = None
+        self._lock_pid = None
+
+    def _acquire_file_lock(self):
+        """获取文件锁，fork 后的子进程重新打开锁文件，否则与父进程共用同一把锁"""
+        if self._lock_pid != os.getpid():
+            self._lock_file = open(self.baseFilename + '.lock', 'a')
+            self._lock_pid = os.getpid()
+        fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+
+    def _reopen_if_rotated(self):
+        """日志文件已被其他进程轮转时重新打开"""
+        if self.stream is None:
+            return
+        try:
+            rotated = os.stat(self.baseFilename).st_ino != os.fstat(self.stream.fileno()).st_ino
+        except FileNotFoundError:
+            rotated = True
+        if rotated:
+            self.stream.close()
+            self.stream = self._open()
+
+    def emit(self, record):
+        if fcntl is None:
+            super().emit(record)
+            return
+        try:
+            self._acquire_file_lock()
+        except Exception:
+            self.handleError(record)
+            return
+        try:
+            self._reopen_if_rotated()
+            super().emit(record)
+        finally:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+
+# SQL规范化使用的正则表达式
+_STRING_RE = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_PLACEHOLDER_RE = re.compile(r'%s|%\(\w+\)s')
+_IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+_VALUES_RE = re.compile(r'\bVALUES\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\(\s*\?(?:\s*,\s*\?)*\s*\))*', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql):
+    """把SQL规范化为形状：字面量和参数占位符替换为 ?，IN 列表和多行 VALUES 折叠，空白压缩
+
+    参数:
+        sql (str): 原始SQL
+
+    返回:
+        str: 规范化后的SQL
+    """
+    shape = _STRING_RE.sub('?', sql)
+    shape = _PLACEHOLDER_RE.sub('?', shape)
+    shape = _NUMBER_RE.sub('?', shape)
+    shape = _SPACE_RE.sub(' ', shape).strip()
+    shape = _IN_LIST_RE.sub('IN (...)', shape)
+    shape = _VALUES_RE.sub(r'VALUES \1', shape)
+    return shape
+
+
+def fingerprint(shape):
+    """SQL形状的短指纹，便于按形状汇总"""
+    return hashlib.md5(shape.encode()).hexdigest()[:12]
+
+
+def _describe_value(value):
+    """参数值的脱敏描述：只保留类型，字符串和字节串附带长度"""
+    if value is None:
+        return None
+    if isinstance(value, (str, bytes)):
+        return f'<{type(value).__name__}:{len(value)}>'
+    return f'<{type(value).__name__}>'
+
+
+def redact_params(params, many=False):
+    """按配置处理要写入日志的参数
+
+    参数:
+        params: 单条SQL的参数（元组、列表或字典），批量执行时为参数列表
+        many (bool): 是否为批量执行
+
+    返回:
+        可以JSON序列化的参数描述；批量执行只记录条数和第一组参数
+    """
+    if many:
+        params = list(params)
+        return {'rows': len(params), 'first': redact_params(params[0]) if params else None}
+    if params is None:
+        return None
+    if not SLOW_QUERY_CONFIG['log_params']:
+        if isinstance(params, dict):
+            return {key: _describe_value(value) for key, value in params.items()}
+        return [_describe_value(value) for value in params]
+    if isinstance(params, dict):
+        return {key: _json_value(value) for key, value in params.items()}
+    return [_json_value(value) for value in params]
+
+
+def _is_batch(params):
+    """判断参数是否为 executemany 的参数列表（列表中的每一项是一组参数）"""
+    return isinstance(params, list) and bool(params) and isinstance(params[0], (tuple, list, dict))
+
+
+def _json_value(value):
+    """把参数值转换为可以JSON序列化的形式，过长的值截断"""
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    text = str(value)
+    return text if len(text) <= 200 else text[:200] + '...'
+
+
+# 模型模块的文件路径，用于在调用栈中定位模型方法
+_MODELS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models.py')
+
+
+def caller_method():
+    """查找发起查询的模型方法，如 Student.get_all_students
+
+    从调用栈中找出第一个位于 models.py、且不属于 Database 的实例方法
+
+    返回:
+        str or None: 类名.方法名，找不到时为None
+    """
+    frame = sys._getframe(1)
+    depth = 0
+    while frame is not None and depth < 30:
+        code = frame.f_code
+        if code.co_filename == _MODELS_FILE:
+            owner = frame.f_locals.get('self')
+            if owner is not None and type(owner).__name__ != 'Database':
+                return f'{type(owner).__name__}.{code.co_name}'
+        frame = frame.f_back
+        depth += 1
+    return None
+
+
+def _request_info():
+    """当前请求的路由信息，不在请求中时返回None"""
+    if not has_request_context():
+        return None
+    return {
+        'endpoint': request.endpoint,
+        'method': request.method,
+        'path': request.full_path.rstrip('?')
+    }
+
+
+def _tracing():
+    """当前请求是否被抽中记录全部SQL，返回追踪ID或None"""
+    rate = SLOW_QUERY_CONFIG['trace_sample_rate']
+    if rate <= 0:
+        return None
+    if not has_request_context():
+        return uuid.uuid4().hex[:12] if random.random() < rate else None
+    trace = g.get('_sql_trace')
+    if trace is None:
+        trace = uuid.uuid4().hex[:12] if random.random() < rate else ''
+        g._sql_trace = trace
+    return trace or None
+
+
+def _on_query(sql, params, seconds, error):
+    """SQL监听器，记录慢查询、出错的SQL和抽样追踪的SQL"""
+    elapsed_ms = seconds * 1000
+    trace = _tracing()
+    slow = elapsed_ms >= SLOW_QUERY_CONFIG['threshold_ms']
+    if not slow and error is None and trace is None:
+        return
+
+    shape = normalize_sql(sql)
+    record = {
+        'kind': 'error' if error is not None else ('slow' if slow else 'trace'),
+        'ms': round(elapsed_ms, 3),
+        'fingerprint': fingerprint(shape),
+        'sql': shape,
+        'params': redact_params(params, many=_is_batch(params)),
+        'caller': caller_method(),
+        'request': _request_info(),
+        'pid': os.getpid(),
+    }
+    if trace is not None:
+        record['trace'] = trace
+    if error is not None:
+        record['error'] = f'{type(error).__name__}: {error}'
+    level = logging.ERROR if error is not None else (logging.WARNING if slow else logging.INFO)
+    logger.log(level, json.dumps(record, ensure_ascii=False, default=str))
+
+
+_installed = False
+
+
+def init_query_log(app=None):
+    """配置慢查询日志并注册SQL监听器，重复调用时只注册一次"""
+    global _installed
+    if _installed or not SLOW_QUERY_CONFIG['enabled']:
+        return
+    path = SLOW_QUERY_CONFIG['file']
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        handler = SharedRotatingFileHandler(
+            path,
+            maxBytes=SLOW_QUERY_CONFIG['max_bytes'],
+            backupCount=SLOW_QUERY_CONFIG['backup_count'],
+            encoding='utf-8'
+        )
+    except OSError as e:
+        print(f"慢查询日志文件打开失败: {e}")
+        return
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    add_query_listener(_on_query)
+    _installed = True
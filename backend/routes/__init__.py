@@ -7,5 +7,9 @@
 # - course.py: 课程信息管理相关路由
 # - offering.py: 授课安排管理相关路由
 # - score.py: 成绩管理相关路由
+# - metrics.py: 请求指标路由
+# - profiling.py: 性能分析结果路由
+# - export.py: 列表导出路由
+# - batch.py: 批量请求路由
 #
 # 各蓝图在app.py中进行注册 
\ No newline at end of file
@@ -0,0 +1,132 @@
+import json
+import posixpath
+from urllib.parse import unquote
+
+from flask import Blueprint, current_app, request, jsonify, session, g
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from ..config import BATCH_CONFIG
+from ..utils import login_required
+
+# 创建批量请求相关的蓝图
+batch_bp = Blueprint('batch', __name__)
+
+# 子请求不继承的请求头：请求体相关的头，以及只对外层请求有意义的条件请求和性能分析开关；
+# 子请求的条件请求由各子请求自己的 etag 指定
+_DROPPED_ENVIRON_KEYS = (
+    'CONTENT_TYPE', 'CONTENT_LENGTH', 'HTTP_IF_NONE_MATCH', 'HTTP_X_PROFILE', 'REQUEST_URI', 'RAW_URI'
+)
+
+def _sub_environ(path, etag=None):
+    """以外层请求为基础生成子请求的WSGI环境，方法为GET，路径和查询参数替换为子请求的，
+    指定 etag 时作为子请求的 If-None-Match"""
+    environ = dict(request.environ)
+    for key in _DROPPED_ENVIRON_KEYS:
+        environ.pop(key, None)
+    sub = EnvironBuilder(path=path, method='GET').get_environ()
+    for key in ('REQUEST_METHOD', 'PATH_INFO', 'QUERY_STRING', 'wsgi.input'):
+        environ[key] = sub[key]
+    if etag:
+        environ['HTTP_IF_NONE_MATCH'] = etag
+    return environ
+
+def _dispatch(path, etag=None):
+    """在当前应用上下文中执行一个GET子请求
+    
+    子请求使用新的请求上下文，但与外层请求共用应用上下文（g）、会话和数据库连接；
+    视图函数及其权限装饰器照常执行，不执行 before_request/after_request 钩子
+    
+    参数:
+        path (str): 子请求路径，可以带查询参数
+        etag (str): 客户端保存的ETag，未修改时子请求返回304
+    
+    返回:
+        tuple: (状态码, JSON响应体文本，响应不是JSON或为流式响应时为 null, ETag或None)
+    """
+    ctx = current_app.request_context(_sub_environ(path, etag))
+    ctx.session = session._get_current_object()
+    ctx.push()
+    response = None
+    try:
+        try:
+            rv = current_app.dispatch_request()
+        except HTTPException as e:
+            rv = current_app.handle_user_exception(e)
+        response = current_app.make_response(rv)
+        # 流式响应的内容要在发送时才生成，不能嵌入批量响应
+        etag = response.headers.get('ETag')
+        if response.is_json and not response.is_streamed:
+            return response.status_code, response.get_data(as_text=True), etag
+        return response.status_code, 'null', etag
+    except Exception as e:
+        print(f"批量请求中的子请求 {path} 错误: {e}")
+        return 500, json.dumps({'error': '服务器内部错误'}), None
+    finally:
+        if response is not None:
+            # 执行响应的 call_on_close 回调，释放响应占用的资源
+            response.close()
+        ctx.pop()
+
+def _allowed_path(path):
+    """子请求路径必须是 /api/ 下的接口，且不属于 BATCH_CONFIG['excluded_prefixes']"""
+    if not isinstance(path, str) or not path.startswith('/api/'):
+        return False
+    # 按解码、规范化之后的路径判断，与子请求实际匹配的路由一致
+    route = posixpath.normpath(unquote(path.split('?')[0]))
+    return not any(route == prefix or route.startswith(prefix + '/') for prefix in BATCH_CONFIG['excluded_prefixes'])
+
+@batch_bp.route('', methods=['POST'])
+@login_required
+def run_batch():
+    """批量请求
+    
+    在一次HTTP请求中依次执行多个GET子请求，返回各自的状态码和响应体。
+    子请求与单独请求时经过相同的权限检查，共用一个数据库连接，
+    前端加载页面所需的多组数据只需一次往返
+    
+    请求体:
+        requests: 子请求列表，每项为 {path: '/api/...', etag: 上次响应的ETag（可选）}，path 可以带查询参数，
+                  导出等不返回JSON的接口（BATCH_CONFIG['excluded_prefixes']）不能作为子请求
+        
+    返回:
+        成功: {responses: [{path, status: 状态码, body: 响应体, etag}]}，与请求顺序一致；
+              etag 与接口的ETag相同时 status 为304、body 为 null，客户端使用自己保存的响应体
+        失败: {error: '错误信息'}, 状态码
+    
+    权限要求:
+        需要登录，各子请求另按各自接口的权限要求检查
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get('requests')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': '子请求列表不能为空'}), 400
+    if len(items) > BATCH_CONFIG['max_requests']:
+        return jsonify({'error': f"一次最多包含 {BATCH_CONFIG['max_requests']} 个子请求"}), 400
+    
+    subrequests = []
+    for item in items:
+        path = item.get('path') if isinstance(item, dict) else None
+        if not _allowed_path(path):
+            return jsonify({'error': f'无效的子请求路径: {path}'}), 400
+        etag = item.get('etag')
+        subrequests.append((path, etag if isinstance(etag, str) else None))
+    
+    # 子请求的视图函数用 query_budget 声明的SQL条数累加为整个批量请求的预算
+    budget = 0
+    parts = []
+    for path, etag in subrequests:
+        g.pop('_query_budget', None)
+        status, body, etag = _dispatch(path, etag)
+        sub_budget = g.pop('_query_budget', None)
+        budget = None if budget is None or sub_budget is None else budget + sub_budget
+        parts.append(
+            f'{{"path": {json.dumps(path, ensure_ascii=False)}, "status": {status}, '
+            f'"body": {body}, "etag": {json.dumps(etag)}}}'
+        )
+    if budget is not None:
+        g._query_budget = budget
+    
+    return current_app.response_class(
+        '{"responses": [' + ', '.join(parts) + ']}',
+        mimetype='application/json'
+    )
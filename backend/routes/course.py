@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify, session
 from ..models import Course, CourseType, College, Score
-from ..utils import login_required, admin_required, teacher_required
+from ..utils import encode_cursor, decode_cursor, login_required, admin_required, teacher_required, conditional_get, cached_response, query_budget
 
 # 创建课程相关的蓝图
 course_bp = Blueprint('course', __name__)
 
 @course_bp.route('/', methods=['GET'])
 @login_required
+@conditional_get('course', 'course_type', 'college', 'course_offering', 'student_course')
+@cached_response('course', 'course_type', 'college', 'course_offering', 'student_course')
+@query_budget(3)
 def get_courses():
     """获取课程列表
     
@@ -16,6 +19,8 @@ def get_courses():
     URL参数:
         page: 页码，默认为1
         search: 搜索关键词，可选
+        after: 游标分页的游标，首页传空字符串；提供该参数时忽略page，按主键定位下一页，
+               返回 {列表, next_cursor: 下一页游标，没有下一页时为null}
         
     返回:
         {
@@ -30,6 +35,7 @@ def get_courses():
     # 获取页码和搜索参数
     page = int(request.args.get('page', 1))
     search = request.args.get('search', None)
+    after = request.args.get('after', None)
     
     # 实例化课程模型
     course_model = Course()
@@ -39,19 +45,8 @@ def get_courses():
         # 如果是学生用户，只返回与该学生相关的课程
         student_id = session.get('related_id')
         
-        # 查询学生已选课程
-        score_model = Score()
-        scores = score_model.get_student_scores(student_id)
-        
-        # 从成绩记录中提取课程信息
-        courses = []
-        for score in scores:
-            course = course_model.get_course_by_id(score['course_id'])
-            if course:
-                # 添加成绩信息到课程对象
-                course['score'] = score['score']
-                course['status'] = score['status']
-                courses.append(course)
+        # 一次查询取出学生已选的全部课程及成绩
+        courses = course_model.get_student_courses(student_id) or []
         
         return jsonify({
             'courses': courses,
@@ -60,6 +55,18 @@ def get_courses():
         })
     else:
         # 管理员或教师可以查看所有课程
+        # 游标分页模式：按主键定位下一页，翻到任何位置的代价都相同
+        if after is not None:
+            try:
+                after_id = decode_cursor(after)
+            except ValueError:
+                return jsonify({'error': '无效的分页游标'}), 400
+            courses, next_after = course_model.get_all_courses(search=search, after=after_id)
+            return jsonify({
+                'courses': courses,
+                'next_cursor': encode_cursor(next_after)
+            })
+
         courses, total = course_model.get_all_courses(page=page, search=search)
         
         # 返回课程列表、总数和页码
@@ -71,6 +78,8 @@ def get_courses():
 
 @course_bp.route('/<int:course_id>', methods=['GET'])
 @login_required
+@conditional_get('course', 'course_type', 'college', 'course_offering', 'teacher', 'student_course')
+@query_budget(2)
 def get_course(course_id):
     """获取单个课程信息
     
@@ -228,6 +237,8 @@ def delete_course(course_id):
 
 @course_bp.route('/type', methods=['GET'])
 @login_required
+@conditional_get('course_type')
+@query_budget(1)
 def get_course_types():
     """获取课程类型列表
     
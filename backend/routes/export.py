@@ -0,0 +1,71 @@
+import time
+
+from flask import Blueprint, Response, request, jsonify, send_file
+from ..export import EXPORTS, ExportBusyError, supported_formats, build_query, open_rows, iter_csv, write_xlsx
+from ..utils import teacher_required
+
+# 创建列表导出相关的蓝图
+export_bp = Blueprint('export', __name__)
+
+@export_bp.route('/<name>', methods=['GET'])
+@teacher_required
+def export_list(name):
+    """导出列表
+    
+    把学生、教师、课程、授课安排或成绩整表导出为文件。
+    CSV边查询边发送，内存占用与行数无关，适合导出全部选课成绩等大表；
+    XLSX先写入临时文件，写完后再发送
+    
+    URL参数:
+        name: 导出名称，students、teachers、courses、offerings 或 scores
+        format: 文件格式，csv（默认）或 xlsx（使用 openpyxl）
+        以及各导出支持的筛选参数，如 students 的 class_id、college_id、status，
+        scores 的 student_id、offering_id、year、semester
+        
+    返回:
+        成功: 文件下载
+        失败: {error: '错误信息'}, 状态码（同时进行的导出过多时为503）
+    
+    权限要求:
+        需要教师或管理员权限
+    """
+    if name not in EXPORTS:
+        return jsonify({'error': '不支持的导出类型'}), 404
+    file_format = request.args.get('format', 'csv').lower()
+    if file_format not in supported_formats():
+        return jsonify({'error': f'不支持的导出格式: {file_format}'}), 400
+    try:
+        sql, params = build_query(name, request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    try:
+        rows = open_rows(sql, params)
+    except ExportBusyError as e:
+        print(f"导出连接已满: {e}")
+        return jsonify({'error': '同时进行的导出过多，请稍后再试'}), 503
+    except Exception as e:
+        print(f"导出查询错误: {e}")
+        return jsonify({'error': '导出失败'}), 500
+    
+    headers = EXPORTS[name]['headers']
+    filename = f"{name}-{time.strftime('%Y%m%d-%H%M%S')}.{file_format}"
+    if file_format == 'xlsx':
+        try:
+            output = write_xlsx(headers, rows)
+        except Exception as e:
+            print(f"导出xlsx文件错误: {e}")
+            return jsonify({'error': '导出失败'}), 500
+        finally:
+            rows.close()
+        return send_file(
+            output, as_attachment=True, download_name=filename,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        )
+    
+    # 生成器不依赖请求上下文，不使用 stream_with_context，请求绑定的数据库连接在发送前即已归还
+    response = Response(iter_csv(headers, rows), mimetype='text/csv')
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Accel-Buffering'] = 'no'  # 经nginx反向代理时不缓冲整个响应
+    response.call_on_close(rows.close)
+    return response
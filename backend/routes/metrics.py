@@ -0,0 +1,29 @@
+import hmac
+
+from flask import Blueprint, request, jsonify, session, Response
+from ..config import METRICS_CONFIG
+from ..metrics import render_prometheus
+
+# 创建指标相关的蓝图
+metrics_bp = Blueprint('metrics', __name__)
+
+@metrics_bp.route('', methods=['GET'])
+def get_metrics():
+    """获取请求指标
+    
+    以Prometheus文本格式返回各路由的请求耗时分布、状态码计数、SQL条数和耗时、缓存命中情况等，
+    多进程部署时为所有工作进程的汇总
+    
+    返回:
+        Prometheus文本格式的指标
+    
+    权限要求:
+        管理员登录，或请求头 Authorization: Bearer 配置的令牌（供Prometheus抓取使用）
+    """
+    token = METRICS_CONFIG['token']
+    auth = request.headers.get('Authorization', '')
+    authorized = bool(token) and hmac.compare_digest(auth, f'Bearer {token}')
+    if not authorized and session.get('role') != 'admin':
+        return jsonify({'error': '无权限访问'}), 403
+    
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
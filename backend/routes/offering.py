@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify, session
 from ..models import CourseOffering, Course, Teacher, Score
-from ..utils import login_required, admin_required, teacher_required
+from ..utils import encode_cursor, decode_cursor, login_required, admin_required, teacher_required, conditional_get, cached_response, query_budget
 
 # 创建授课安排相关的蓝图
 offering_bp = Blueprint('offering', __name__)
 
 @offering_bp.route('/', methods=['GET'])
 @login_required
+@conditional_get('course_offering', 'course', 'teacher', 'student_course')
+@cached_response('course_offering', 'course', 'teacher', 'student_course')
+@query_budget(3)
 def get_offerings():
     """获取授课安排列表
     
@@ -16,6 +19,8 @@ def get_offerings():
     URL参数:
         page: 页码，默认为1
         search: 搜索关键词，可选
+        after: 游标分页的游标，首页传空字符串；提供该参数时忽略page，按主键定位下一页，
+               返回 {列表, next_cursor: 下一页游标，没有下一页时为null}
         
     返回:
         {
@@ -30,6 +35,7 @@ def get_offerings():
     # 获取页码和搜索参数
     page = int(request.args.get('page', 1))
     search = request.args.get('search', None)
+    after = request.args.get('after', None)
     
     # 实例化授课安排模型
     offering_model = CourseOffering()
@@ -39,19 +45,8 @@ def get_offerings():
         # 如果是学生用户，只返回与该学生相关的授课安排
         student_id = session.get('related_id')
         
-        # 查询学生已选课程
-        score_model = Score()
-        scores = score_model.get_student_scores(student_id)
-        
-        # 从成绩记录中提取授课安排信息
-        offerings = []
-        for score in scores:
-            offering = offering_model.get_offering_by_id(score['offering_id'])
-            if offering:
-                # 添加成绩信息到授课安排对象
-                offering['score'] = score['score']
-                offering['status'] = score['status']
-                offerings.append(offering)
+        # 一次查询取出学生已选的全部授课安排及成绩
+        offerings = offering_model.get_student_offerings(student_id) or []
         
         return jsonify({
             'offerings': offerings,
@@ -60,6 +55,18 @@ def get_offerings():
         })
     else:
         # 管理员或教师可以查看所有授课安排
+        # 游标分页模式：按主键定位下一页，翻到任何位置的代价都相同
+        if after is not None:
+            try:
+                after_id = decode_cursor(after)
+            except ValueError:
+                return jsonify({'error': '无效的分页游标'}), 400
+            offerings, next_after = offering_model.get_all_offerings(search=search, after=after_id)
+            return jsonify({
+                'offerings': offerings,
+                'next_cursor': encode_cursor(next_after)
+            })
+
         offerings, total = offering_model.get_all_offerings(page=page, search=search)
         
         # 返回授课安排列表、总数和页码
@@ -71,6 +78,8 @@ def get_offerings():
 
 @offering_bp.route('/<int:offering_id>', methods=['GET'])
 @login_required
+@conditional_get('course_offering', 'course', 'teacher', 'student_course')
+@query_budget(3)
 def get_offering(offering_id):
     """获取单个授课安排信息
     
@@ -98,12 +107,9 @@ def get_offering(offering_id):
     if session.get('role') == 'student':
         student_id = session.get('related_id')
         
-        # 查询学生是否已选该授课安排
+        # 查询学生是否已选该授课安排，使用缓存的选课集合，无需关联查询整份成绩单
         score_model = Score()
-        scores = score_model.get_student_scores(student_id)
-        
-        offering_ids = [score['offering_id'] for score in scores]
-        if offering_id not in offering_ids:
+        if not score_model.is_enrolled(student_id, offering_id):
             return jsonify({'error': '您没有权限查看未选课程的授课安排'}), 403
     
     # 找到授课安排，返回授课安排信息
@@ -0,0 +1,44 @@
+from flask import Blueprint, jsonify, send_from_directory
+from ..config import PROFILING_CONFIG
+from ..profiling import PROFILE_ID_RE, list_profiles
+from ..utils import admin_required
+
+# 创建性能分析相关的蓝图
+profiling_bp = Blueprint('profiling', __name__)
+
+@profiling_bp.route('', methods=['GET'])
+@admin_required
+def get_profiles():
+    """获取性能分析结果列表
+    
+    管理员请求时带上请求头 X-Profile: cpu（或 cpu,mem）或查询参数 _profile=cpu，
+    该请求的分析结果会出现在此列表中
+    
+    返回:
+        {profiles: [分析结果列表，最新的在前]}
+    
+    权限要求:
+        管理员
+    """
+    return jsonify({'profiles': list_profiles()})
+
+@profiling_bp.route('/<filename>', methods=['GET'])
+@admin_required
+def download_profile(filename):
+    """下载性能分析结果文件
+    
+    URL参数:
+        filename: 文件名，形如 <ID>.prof、<ID>.mem 或 <ID>.txt
+        
+    返回:
+        成功: 文件内容
+        失败: {error: '错误信息'}, 状态码
+    
+    权限要求:
+        管理员
+    """
+    profile_id, _, suffix = filename.partition('.')
+    if not PROFILE_ID_RE.match(profile_id) or suffix not in ('prof', 'mem', 'txt'):
+        return jsonify({'error': '无效的文件名'}), 400
+    
+    return send_from_directory(PROFILING_CONFIG['dir'], filename, as_attachment=suffix != 'txt')
@@ -1,12 +1,57 @@
+import math
+
 from flask import Blueprint, request, jsonify, session
 from ..models import Score, Student, CourseOffering
-from ..utils import login_required, admin_required, teacher_required
+from ..utils import login_required, admin_required, teacher_required, conditional_get, query_budget
 
 # 创建成绩相关的蓝图
 score_bp = Blueprint('score', __name__)
 
+# 选课记录的状态，与 student_course 表中 status 的定义一致
+SCORE_STATUSES = ('选课中', '已修完', '已取消')
+
+def validate_score(data):
+    """校验成绩和状态，添加、更新成绩和批量录入成绩共用
+    
+    状态为已修完时必须填写0-100之间的成绩，其他状态的成绩置为None
+    
+    参数:
+        data (dict): 包含 status 和 score 的成绩数据，校验通过时 score 被规范化
+        
+    返回:
+        str or None: 错误信息，校验通过时为None
+    """
+    if data.get('status') not in SCORE_STATUSES:
+        return f"状态必须是 {'、'.join(SCORE_STATUSES)} 之一"
+    
+    # 如果状态为已修完，必须有成绩
+    if data['status'] == '已修完':
+        score = data.get('score')
+        if score is None:
+            return '已修完状态必须填写成绩'
+        
+        # 验证分数范围；布尔值不是分数，NaN、Infinity 无法写入数据库
+        if isinstance(score, bool):
+            return '成绩必须是数字'
+        if not isinstance(score, (int, float)):
+            try:
+                score = float(score)
+            except (TypeError, ValueError):
+                return '成绩必须是数字'
+        if not math.isfinite(score):
+            return '成绩必须是数字'
+        if score < 0 or score > 100:
+            return '成绩必须在0-100之间'
+        data['score'] = score
+    else:
+        # 如果不是已修完状态，成绩设为None
+        data['score'] = None
+    return None
+
 @score_bp.route('/<int:student_id>', methods=['GET'])
 @login_required
+@conditional_get('student_course', 'course_offering', 'course', 'teacher')
+@query_budget(1)
 def get_student_scores(student_id):
     """获取学生成绩
     
@@ -62,18 +107,10 @@ def add_score():
         if field not in data:
             return jsonify({'error': f'字段 {field} 不能为空'}), 400
     
-    # 如果状态为已修完，必须有成绩
-    if data['status'] == '已修完':
-        if 'score' not in data or data['score'] is None:
-            return jsonify({'error': '已修完状态必须填写成绩'}), 400
-        
-        # 验证分数范围
-        score = data['score']
-        if isinstance(score, (int, float)) and (score < 0 or score > 100):
-            return jsonify({'error': '成绩必须在0-100之间'}), 400
-    else:
-        # 如果不是已修完状态，成绩设为None
-        data['score'] = None
+    # 验证状态和成绩
+    error = validate_score(data)
+    if error:
+        return jsonify({'error': error}), 400
     
     # 实例化成绩模型并添加成绩
     score_model = Score()
@@ -86,19 +123,98 @@ def add_score():
         # 添加失败
         return jsonify({'error': '成绩添加失败'}), 500
 
+@score_bp.route('/offering/<int:offering_id>', methods=['POST'])
+@teacher_required
+def save_offering_scores(offering_id):
+    """批量录入成绩
+    
+    一次提交一个授课安排的全部成绩：学生没有选课记录时新增，已有时更新成绩和状态。
+    每行的校验规则与添加成绩相同，未通过校验的行被跳过，其余行在一个事务中写入
+    
+    URL参数:
+        offering_id: 授课安排ID
+        
+    请求体:
+        scores: 成绩列表，每项为 {student_id, score, status} 或 [student_id, score, status]
+        
+    返回:
+        成功: {success: 是否全部成功, saved: 成功条数（含与原记录相同的行）, failed: 失败条数,
+               results: [{student_id, result: created/updated/unchanged} 或 {student_id, error}]，与请求顺序一致}
+        失败: {error: '错误信息'}, 状态码
+    
+    权限要求:
+        需要教师或管理员权限
+    """
+    # 获取请求中的JSON数据
+    data = request.get_json(silent=True) or {}
+    items = data.get('scores')
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': '成绩列表不能为空'}), 400
+    
+    # 检查授课安排是否存在
+    if not CourseOffering().get_offering_by_id(offering_id):
+        return jsonify({'error': '授课安排不存在'}), 404
+    
+    # 逐行校验，记录每行的结果
+    results = []
+    valid_rows = []
+    seen = set()
+    for item in items:
+        if isinstance(item, (list, tuple)) and len(item) == 3:
+            item = dict(zip(('student_id', 'score', 'status'), item))
+        if not isinstance(item, dict):
+            results.append({'student_id': None, 'error': '格式应为 {student_id, score, status}'})
+            continue
+        row = {'student_id': item.get('student_id'), 'score': item.get('score'), 'status': item.get('status')}
+        try:
+            row['student_id'] = int(row['student_id'])
+        except (TypeError, ValueError):
+            results.append({'student_id': row['student_id'], 'error': '学生ID必须是整数'})
+            continue
+        error = validate_score(row)
+        if error is None and row['student_id'] in seen:
+            error = '同一学生的成绩重复提交'
+        results.append({'student_id': row['student_id'], 'error': error} if error else {'student_id': row['student_id']})
+        if error is None:
+            seen.add(row['student_id'])
+            valid_rows.append(row)
+    
+    # 通过校验的行在一个事务中写入
+    outcome = {}
+    if valid_rows:
+        score_model = Score()
+        try:
+            outcome = score_model.save_offering_scores(offering_id, valid_rows)
+        except Exception as e:
+            print(f"批量录入成绩错误: {e}")
+            return jsonify({'error': '成绩录入失败'}), 500
+    
+    saved = 0
+    for result in results:
+        if 'error' in result:
+            continue
+        status = outcome[result['student_id']]
+        if status == 'missing':
+            result['error'] = '学生不存在'
+        else:
+            result['result'] = status
+            saved += 1
+    failed = len(results) - saved
+    return jsonify({'success': failed == 0, 'saved': saved, 'failed': failed, 'results': results})
+
 @score_bp.route('/<int:sc_id>', methods=['PUT'])
 @teacher_required
 def update_score(sc_id):
     """更新成绩
     
-    根据成绩ID更新成绩信息，可更新成绩分数和/或状态
+    根据成绩ID更新成绩信息，可更新成绩分数和/或状态，按添加成绩的规则校验
     
     URL参数:
         sc_id: 成绩ID
         
     请求体:
-        score: 成绩分数，可选
-        status: 状态，可选（如'已修完'、'在修'等）
+        score: 成绩分数，可选，只提供成绩时状态同时改为已修完
+        status: 状态，可选，选课中、已修完或已取消；只提供状态时，已修完必须同时填写成绩，其他状态清空成绩
         
     返回:
         成功: {success: true, message: '成绩更新成功'}
@@ -108,32 +224,27 @@ def update_score(sc_id):
         需要教师或管理员权限
     """
     # 获取请求中的JSON数据
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or ('score' not in data and 'status' not in data):
+        return jsonify({'error': '请提供成绩或状态'}), 400
     
-    # 验证数据
-    if 'score' in data and data['score'] is not None:
-        score = data['score']
-        if isinstance(score, (int, float)) and (score < 0 or score > 100):
-            return jsonify({'error': '成绩必须在0-100之间'}), 400
+    # 只提供成绩时按已修完校验，与仅更新成绩时写入的状态一致
+    update = {'status': data.get('status', '已修完'), 'score': data.get('score')}
+    error = validate_score(update)
+    if error:
+        return jsonify({'error': error}), 400
     
-    # 如果提供了状态
-    if 'status' in data:
-        if data['status'] == '已修完' and ('score' not in data or data['score'] is None):
-            return jsonify({'error': '已修完状态必须填写成绩'}), 400
-        
-        # 实例化成绩模型
-        score_model = Score()
-        
-        if 'score' in data:
-            # 同时更新成绩和状态
-            result = score_model.update_score_with_status(sc_id, data['score'], data['status'])
-        else:
-            # 仅更新状态
-            result = score_model.update_status(sc_id, data['status'])
-    else:
+    # 实例化成绩模型
+    score_model = Score()
+    if 'status' not in data:
         # 仅更新成绩
-        score_model = Score()
-        result = score_model.update_score(sc_id, data['score'])
+        result = score_model.update_score(sc_id, update['score'])
+    elif 'score' not in data:
+        # 仅更新状态
+        result = score_model.update_status(sc_id, update['status'])
+    else:
+        # 同时更新成绩和状态
+        result = score_model.update_score_with_status(sc_id, update['score'], update['status'])
     
     if result:
         # 更新成功
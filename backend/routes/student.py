@@ -1,12 +1,16 @@
 from flask import Blueprint, request, jsonify, session
 from ..models import Student, Class, College
-from ..utils import login_required, admin_required, student_self_required
+from ..utils import encode_cursor, decode_cursor, login_required, admin_required, student_self_required, conditional_get, cached_response, query_budget, skip_query_check
+from ..student_import import ImportFileError, read_rows, import_students
 
 # 创建学生相关的蓝图
 student_bp = Blueprint('student', __name__)
 
 @student_bp.route('/', methods=['GET'])
 @login_required
+@conditional_get('student', 'class', 'college')
+@cached_response('student', 'class', 'college')
+@query_budget(3)
 def get_students():
     """获取学生列表
     
@@ -15,6 +19,8 @@ def get_students():
     URL参数:
         page: 页码，默认为1
         search: 搜索关键词，可选
+        after: 游标分页的游标，首页传空字符串；提供该参数时忽略page，按主键定位下一页，
+               返回 {列表, next_cursor: 下一页游标，没有下一页时为null}
         
     返回:
         {
@@ -29,6 +35,7 @@ def get_students():
     # 获取页码和搜索参数
     page = int(request.args.get('page', 1))
     search = request.args.get('search', None)
+    after = request.args.get('after', None)
     
     # 实例化学生模型并获取学生列表
     student_model = Student()
@@ -53,6 +60,18 @@ def get_students():
             })
     else:
         # 管理员或教师可以查看所有学生
+        # 游标分页模式：按主键定位下一页，翻到任何位置的代价都相同
+        if after is not None:
+            try:
+                after_id = decode_cursor(after)
+            except ValueError:
+                return jsonify({'error': '无效的分页游标'}), 400
+            students, next_after = student_model.get_all_students(search=search, after=after_id)
+            return jsonify({
+                'students': students,
+                'next_cursor': encode_cursor(next_after)
+            })
+
         students, total = student_model.get_all_students(page=page, search=search)
         
         # 返回学生列表、总数和页码
@@ -64,6 +83,8 @@ def get_students():
 
 @student_bp.route('/<int:student_id>', methods=['GET'])
 @student_self_required
+@conditional_get('student', 'class', 'college')
+@query_budget(1)
 def get_student(student_id):
     """获取单个学生信息
     
@@ -95,7 +116,7 @@ def get_student(student_id):
 def add_student():
     """添加新学生
     
-    创建新的学生记录
+    创建新的学生记录，并在同一事务中为学生创建以学号为用户名的登录账户
     
     请求体:
         student_no: 学号
@@ -121,9 +142,9 @@ def add_student():
         if field not in data or not data[field]:
             return jsonify({'error': f'字段 {field} 不能为空'}), 400
     
-    # 实例化学生模型并添加学生
+    # 实例化学生模型，添加学生及其登录账户
     student_model = Student()
-    result = student_model.add_student(data)
+    result = student_model.add_student_with_account(data)
     
     if result:
         # 添加成功
@@ -132,6 +153,46 @@ def add_student():
         # 添加失败
         return jsonify({'error': '学生添加失败'}), 500
 
+@student_bp.route('/import', methods=['POST'])
+@admin_required
+@skip_query_check
+def import_student_file():
+    """批量导入学生
+    
+    从上传的CSV或XLSX文件导入学生，并为每个学生创建以学号为用户名的登录账户。
+    文件按批校验和写入，有错误的行被跳过，不影响其他行导入
+    
+    请求体（multipart/form-data）:
+        file: 导入文件，首行为表头，列名为字段名或中文列名（学号、姓名、性别、入学日期、班级ID等）
+        encoding: CSV文件的编码，可选，默认为 utf-8-sig（带或不带BOM的UTF-8），Excel另存的CSV通常为 gbk
+        dry_run: 为1时只校验不写入，可选
+        
+    返回:
+        成功: {total: 数据行数, imported: 导入数, failed: 失败行数, dry_run,
+               errors: [{row: 行号, student_no: 学号, errors: [错误信息]}]}
+        失败: {error: '错误信息'}, 状态码
+    
+    权限要求:
+        需要管理员权限
+    """
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': '请上传导入文件'}), 400
+    dry_run = request.form.get('dry_run', '').lower() in ('1', 'true', 'yes')
+    
+    try:
+        rows = read_rows(upload.stream, upload.filename, request.form.get('encoding') or None)
+        report = import_students(rows, dry_run=dry_run)
+    except LookupError:
+        return jsonify({'error': '不支持的文件编码'}), 400
+    except ImportFileError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        print(f"批量导入学生错误: {e}")
+        return jsonify({'error': '批量导入失败'}), 500
+    
+    return jsonify(report)
+
 @student_bp.route('/<int:student_id>', methods=['PUT'])
 @admin_required
 def update_student(student_id):
@@ -207,6 +268,8 @@ def delete_student(student_id):
 
 @student_bp.route('/class', methods=['GET'])
 @login_required
+@conditional_get('class', 'college')
+@query_budget(1)
 def get_classes():
     """获取班级列表
     
@@ -226,6 +289,8 @@ def get_classes():
 
 @student_bp.route('/class/<int:class_id>', methods=['GET'])
 @login_required
+@conditional_get('class', 'college')
+@query_budget(1)
 def get_class(class_id):
     """获取单个班级信息
     
@@ -392,6 +457,8 @@ def delete_class(class_id):
 
 @student_bp.route('/college', methods=['GET'])
 @login_required
+@conditional_get('college')
+@query_budget(1)
 def get_colleges():
     """获取学院列表
     
@@ -411,6 +478,8 @@ def get_colleges():
 
 @student_bp.route('/college/<int:college_id>', methods=['GET'])
 @login_required
+@conditional_get('college')
+@query_budget(1)
 def get_college(college_id):
     """获取单个学院信息
     
@@ -1,12 +1,14 @@
 from flask import Blueprint, request, jsonify, session
 from ..models import Teacher, Title, College
-from ..utils import login_required, admin_required, teacher_required
+from ..utils import encode_cursor, decode_cursor, login_required, admin_required, teacher_required, conditional_get, query_budget
 
 # 创建教师相关的蓝图
 teacher_bp = Blueprint('teacher', __name__)
 
 @teacher_bp.route('/', methods=['GET'])
 @login_required
+@conditional_get('teacher', 'college', 'title')
+@query_budget(3)
 def get_teachers():
     """获取教师列表
     
@@ -15,6 +17,8 @@ def get_teachers():
     URL参数:
         page: 页码，默认为1
         search: 搜索关键词，可选
+        after: 游标分页的游标，首页传空字符串；提供该参数时忽略page，按主键定位下一页，
+               返回 {列表, next_cursor: 下一页游标，没有下一页时为null}
         
     返回:
         成功: {
@@ -34,9 +38,22 @@ def get_teachers():
     # 获取页码和搜索参数
     page = int(request.args.get('page', 1))
     search = request.args.get('search', None)
+    after = request.args.get('after', None)
     
     # 实例化教师模型并获取教师列表
     teacher_model = Teacher()
+    # 游标分页模式：按主键定位下一页，翻到任何位置的代价都相同
+    if after is not None:
+        try:
+            after_id = decode_cursor(after)
+        except ValueError:
+            return jsonify({'error': '无效的分页游标'}), 400
+        teachers, next_after = teacher_model.get_all_teachers(search=search, after=after_id)
+        return jsonify({
+            'teachers': teachers,
+            'next_cursor': encode_cursor(next_after)
+        })
+
     teachers, total = teacher_model.get_all_teachers(page=page, search=search)
     
     # 返回教师列表、总数和页码
@@ -48,6 +65,8 @@ def get_teachers():
 
 @teacher_bp.route('/<int:teacher_id>', methods=['GET'])
 @login_required
+@conditional_get('teacher', 'college', 'title')
+@query_budget(1)
 def get_teacher(teacher_id):
     """获取单个教师信息
     
@@ -193,6 +212,8 @@ def delete_teacher(teacher_id):
 
 @teacher_bp.route('/title', methods=['GET'])
 @login_required
+@conditional_get('title')
+@query_budget(1)
 def get_titles():
     """获取职称列表
     
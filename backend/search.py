@@ -0,0 +1,258 @@
+"""进程内字符二元组搜索索引
+
+LIKE '%关键词%' 以通配符开头，无法使用索引，每次搜索都要扫描整张表。
+这里在内存中为姓名、学号/工号、课程名称/代码建立字符二元组倒排索引：
+搜索时取关键词各二元组的倒排列表求交集得到候选ID，再逐条确认包含关键词，
+最后按主键从数据库取出当前页的记录。
+
+索引在第一次搜索时从数据库全量加载，之后由模型的增删改方法在事务提交后增量维护。
+其他进程的写入通过表版本号发现：表版本号与索引记录的不同时全量重建，
+两次重建至少间隔 refresh_interval 秒；本进程的写入同步到索引时一并更新记录的版本号，不会引起重建。
+本进程写入提交到同步索引之间恰好有其他进程写入时，其他进程的这次写入要等下次版本号变化或定期重建才能反映。
+多台主机部署且版本号文件不共享时，其他主机的写入要等每隔 rebuild_interval 秒的定期重建才能反映到索引中。
+"""
+import bisect
+import threading
+import time
+from collections import defaultdict
+
+from .cache import table_versions, versions_epoch
+from .db import after_commit
+
+# 加在每个字段首尾的边界符，保证单字关键词和单字字段也能通过二元组检索
+_BEGIN = '\x02'
+_END = '\x03'
+
+
+def _normalize(value):
+    """统一转为小写字符串，与MySQL默认排序规则的大小写不敏感比较保持一致"""
+    return str(value).lower() if value is not None else ''
+
+
+def _bigrams(text):
+    """字段文本加上边界符后的全部字符二元组"""
+    padded = f'{_BEGIN}{text}{_END}'
+    return {padded[i:i + 2] for i in range(len(padded) - 1)}
+
+
+class BigramIndex:
+    """字符二元组倒排索引"""
+
+    def __init__(self):
+        self._postings = defaultdict(set)  # 二元组 -> 包含该二元组的ID集合
+        self._char_bigrams = defaultdict(set)  # 单个字符 -> 含有该字符的二元组集合
+        self._docs = {}  # ID -> 各字段规范化后的文本
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, doc_id, values):
+        """添加或替换一条记录
+
+        参数:
+            doc_id (int): 记录ID
+            values (iterable): 参与搜索的字段值
+        """
+        self.remove(doc_id)
+        texts = tuple(_normalize(value) for value in values)
+        self._docs[doc_id] = texts
+        for text in texts:
+            for gram in _bigrams(text):
+                self._postings[gram].add(doc_id)
+                for char in gram:
+                    self._char_bigrams[char].add(gram)
+
+    def remove(self, doc_id):
+        """删除一条记录"""
+        texts = self._docs.pop(doc_id, None)
+        if texts is None:
+            return
+        for text in texts:
+            for gram in _bigrams(text):
+                ids = self._postings.get(gram)
+                if ids is not None:
+                    ids.discard(doc_id)
+                    if not ids:
+                        del self._postings[gram]
+                        for char in gram:
+                            grams = self._char_bigrams.get(char)
+                            if grams is not None:
+                                grams.discard(gram)
+                                if not grams:
+                                    del self._char_bigrams[char]
+
+    def search(self, query):
+        """搜索任一字段包含关键词的记录
+
+        参数:
+            query (str): 搜索关键词
+
+        返回:
+            list: 按ID升序排列的匹配记录ID
+        """
+        query = _normalize(query)
+        if not query:
+            return sorted(self._docs)
+        if len(query) == 1:
+            candidates = set()
+            for gram in self._char_bigrams.get(query, ()):
+                candidates.update(self._postings.get(gram, ()))
+        else:
+            grams = sorted(
+                (query[i:i + 2] for i in range(len(query) - 1)),
+                key=lambda gram: len(self._postings.get(gram, ()))
+            )
+            candidates = set(self._postings.get(grams[0], ()))
+            for gram in grams[1:]:
+                if not candidates:
+                    break
+                candidates &= self._postings.get(gram, set())
+        # 二元组都命中不代表关键词连续出现，逐条确认
+        return sorted(
+            doc_id for doc_id in candidates
+            if any(query in text for text in self._docs[doc_id])
+        )
+
+
+class SearchIndex:
+    """一张表的搜索索引，负责加载、增量维护和定期重建"""
+
+    def __init__(self, loader, key, fields, table=None, rebuild_interval=600, refresh_interval=5):
+        """
+        参数:
+            loader (function): 返回全表记录（含主键和搜索字段）的函数，失败时返回None
+            key (str): 主键字段名
+            fields (tuple): 参与搜索的字段名
+            table (str): 表名，表版本号变化时重建索引；为None时只定期重建
+            rebuild_interval (int): 全量重建的间隔秒数
+            refresh_interval (int): 表版本号变化引起的两次重建之间至少间隔的秒数
+        """
+        self.loader = loader
+        self.key = key
+        self.fields = fields
+        self.table = table
+        self.rebuild_interval = rebuild_interval
+        self.refresh_interval = refresh_interval
+        self._index = None
+        self._built_at = 0
+        self._version = None  # 索引已反映的表版本号
+        self._lock = threading.Lock()  # 保护索引的读写
+        self._build_lock = threading.Lock()  # 保证同一时间只有一个线程在构建
+        self._pending = None  # 构建期间发生的增量修改，构建完成后补到新索引上
+
+    def _table_version(self):
+        if self.table is None:
+            return None
+        return versions_epoch(), table_versions(self.table)
+
+    def _is_fresh(self):
+        """索引未到定期重建时间，且表版本号未变化或距上次重建不到 refresh_interval 秒"""
+        age = time.monotonic() - self._built_at
+        if age > self.rebuild_interval:
+            return False
+        return age < self.refresh_interval or self._table_version() == self._version
+
+    def _current(self):
+        """获取可用的索引，必要时构建或重建
+
+        首次构建时其他线程等待构建完成；重建时其他线程继续使用旧索引
+        """
+        index = self._index
+        if index is not None and self._is_fresh():
+            return index
+        if index is not None:
+            if not self._build_lock.acquire(blocking=False):
+                return index
+        else:
+            self._build_lock.acquire()
+            if self._index is not None:
+                self._build_lock.release()
+                return self._index
+        try:
+            with self._lock:
+                self._pending = []
+            # 在加载之前读取版本号，加载期间其他进程的写入会在下次检查时引起重建
+            version = self._table_version()
+            rows = self.loader()
+            new_index = None
+            if rows is not None:
+                # 在锁外构建，构建期间搜索仍可使用旧索引
+                new_index = BigramIndex()
+                for row in rows:
+                    new_index.add(row[self.key], [row[field] for field in self.fields])
+            with self._lock:
+                pending, self._pending = self._pending, None
+                if new_index is not None:
+                    for doc_id, values in pending:
+                        if values is None:
+                            new_index.remove(doc_id)
+                        else:
+                            new_index.add(doc_id, values)
+                    self._index = new_index
+                    self._built_at = time.monotonic()
+                    self._version = version
+                return self._index
+        finally:
+            self._build_lock.release()
+
+    def search(self, query):
+        """搜索匹配的记录ID
+
+        返回:
+            list or None: 按ID升序排列的匹配ID，索引无法加载时返回None，调用方应退回数据库搜索
+        """
+        index = self._current()
+        if index is None:
+            return None
+        with self._lock:
+            return index.search(query)
+
+    def _apply(self, doc_id, values):
+        """把一次已提交的增量修改同步到索引，values 为None表示删除
+
+        本进程的写入已增量同步，同时把记录的表版本号推进到当前值，这次写入递增的版本号不会引起重建
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append((doc_id, values))
+            if self._index is None:
+                return
+            if values is None:
+                self._index.remove(doc_id)
+            else:
+                self._index.add(doc_id, values)
+            self._version = self._table_version()
+
+    def update(self, row):
+        """记录新增或修改后同步到索引，处于事务中时在事务提交后同步，回滚时不同步
+
+        参数:
+            row (dict): 包含主键和搜索字段的记录
+        """
+        doc_id, values = row[self.key], [row.get(field) for field in self.fields]
+        after_commit(lambda: self._apply(doc_id, values))
+
+    def remove(self, doc_id):
+        """记录删除后同步到索引，处于事务中时在事务提交后同步"""
+        after_commit(lambda: self._apply(doc_id, None))
+
+
+def page_ids(ids, page=1, items_per_page=10, after=None):
+    """从升序ID列表中取出一页
+
+    参数:
+        ids (list): 升序排列的ID
+        page (int): 页码模式下的页码
+        items_per_page (int): 每页条目数
+        after (int): 游标模式下上一页最后一个ID，为None时使用页码模式
+
+    返回:
+        tuple: 页码模式返回 (当前页ID, 总数)；游标模式返回 (当前页ID, 下一页起始ID)
+    """
+    if after is not None:
+        start = bisect.bisect_right(ids, after)
+        chunk = ids[start:start + items_per_page]
+        has_more = start + items_per_page < len(ids)
+        return chunk, (chunk[-1] if has_more and chunk else None)
+    offset = (page - 1) * items_per_page
+    return ids[offset:offset + items_per_page], len(ids)
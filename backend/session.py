@@ -0,0 +1,222 @@
+"""服务端会话
+
+Flask默认把会话数据签名后整体保存在Cookie中。SESSION_TYPE 为 filesystem 或 sqlite 时，
+会话数据改为保存在服务端，Cookie中只保存随机生成的会话ID，
+同一主机上的所有工作进程读写同一份会话数据；多台主机部署时需要把会话目录或数据库文件放在共享存储上。
+
+会话数据以JSON格式保存，只能存放可以JSON序列化的值。
+"""
+import json
+import os
+import re
+import secrets
+import sqlite3
+import tempfile
+import threading
+import time
+
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
+
+# 会话ID的格式，与 secrets.token_urlsafe(32) 生成的一致；
+# 会话ID会用作文件名，不符合格式的ID（如包含 ../）不访问存储，直接视为没有会话
+SID_RE = re.compile(r'[A-Za-z0-9_-]{43}')
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    """保存在服务端的会话"""
+
+    def __init__(self, initial=None, sid=None, new=False):
+        def on_update(session):
+            session.modified = True
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.modified = False
+
+
+class FileSessionStore:
+    """每个会话保存为会话目录下的一个文件"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, sid):
+        return os.path.join(self.directory, f'{sid}.json')
+
+    def load(self, sid):
+        """读取会话数据，不存在或已过期时返回None"""
+        try:
+            with open(self._path(sid), encoding='utf-8') as f:
+                record = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if record['expires'] < time.time():
+            self.delete(sid)
+            return None
+        return record['data']
+
+    def save(self, sid, data, expires):
+        """保存会话数据，先写临时文件再替换，其他进程不会读到写了一半的文件"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({'expires': expires, 'data': data}, f)
+            os.replace(tmp_path, self._path(sid))
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def delete(self, sid):
+        """删除会话"""
+        try:
+            os.unlink(self._path(sid))
+        except FileNotFoundError:
+            pass
+
+    def cleanup(self):
+        """删除已过期的会话文件"""
+        now = time.time()
+        for filename in os.listdir(self.directory):
+            if filename.endswith('.json'):
+                sid = filename[:-len('.json')]
+                try:
+                    with open(self._path(sid), encoding='utf-8') as f:
+                        expires = json.load(f)['expires']
+                except (OSError, ValueError, KeyError):
+                    continue
+                if expires < now:
+                    self.delete(sid)
+
+
+class SqliteSessionStore:
+    """会话保存在SQLite数据库中，每个线程使用自己的连接"""
+
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS session (
+                    sid TEXT PRIMARY KEY,
+                    data TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+
+    def _connect(self):
+        """获取当前线程的连接，fork 后的子进程重新建立连接"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=10)
+            # WAL模式下读写互不阻塞，适合多个工作进程并发访问
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def load(self, sid):
+        """读取会话数据，不存在或已过期时返回None"""
+        row = self._connect().execute(
+            "SELECT data FROM session WHERE sid = ? AND expires >= ?", (sid, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def save(self, sid, data, expires):
+        """保存会话数据"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO session (sid, data, expires) VALUES (?, ?, ?)",
+                (sid, json.dumps(data), expires)
+            )
+
+    def delete(self, sid):
+        """删除会话"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session WHERE sid = ?", (sid,))
+
+    def cleanup(self):
+        """删除已过期的会话"""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM session WHERE expires < ?", (time.time(),))
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """把会话数据保存在服务端存储中的会话接口"""
+
+    # 平均每保存多少次会话清理一次过期会话
+    cleanup_every = 1000
+
+    def __init__(self, store, lifetime):
+        """
+        参数:
+            store: FileSessionStore 或 SqliteSessionStore
+            lifetime (int): 会话有效期（秒）
+        """
+        self.store = store
+        self.lifetime = lifetime
+
+    def open_session(self, app, request):
+        sid = request.cookies.get(app.session_cookie_name)
+        if sid and SID_RE.fullmatch(sid):
+            data = self.store.load(sid)
+            if data is not None:
+                return ServerSideSession(data, sid=sid)
+        # 不接受客户端提供的未知会话ID，总是生成新的，防止会话固定攻击
+        return ServerSideSession(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+
+        if not session:
+            # 会话被清空（如登出）时删除服务端数据和Cookie
+            if session.modified:
+                if not session.new:
+                    self.store.delete(session.sid)
+                response.delete_cookie(app.session_cookie_name, domain=domain, path=path)
+            return
+
+        if not self.should_set_cookie(app, session) and not session.modified:
+            return
+
+        self.store.save(session.sid, dict(session), time.time() + self.lifetime)
+        if secrets.randbelow(self.cleanup_every) == 0:
+            try:
+                self.store.cleanup()
+            except Exception as e:
+                print(f"清理过期会话错误: {e}")
+
+        response.set_cookie(
+            app.session_cookie_name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            httponly=self.get_cookie_httponly(app),
+            domain=domain,
+            path=path,
+            secure=self.get_cookie_secure(app),
+            samesite=self.get_cookie_samesite(app)
+        )
+
+
+def init_session(app):
+    """按 SESSION_TYPE 配置应用的会话存储
+
+    cookie 使用Flask默认的签名Cookie会话；filesystem 和 sqlite 使用服务端会话
+
+    异常:
+        ValueError: 不支持的会话类型
+    """
+    session_type = app.config.get('SESSION_TYPE') or 'cookie'
+    lifetime = app.config['SESSION_LIFETIME']
+    if session_type == 'cookie':
+        return
+    if session_type == 'filesystem':
+        store = FileSessionStore(app.config['SESSION_FILE_DIR'])
+    elif session_type == 'sqlite':
+        store = SqliteSessionStore(app.config['SESSION_SQLITE_PATH'])
+    else:
+        raise ValueError(f'不支持的会话类型: {session_type}')
+    app.session_interface = ServerSideSessionInterface(store, lifetime)
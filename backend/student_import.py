@@ -0,0 +1,327 @@
+"""学生批量导入
+
+从CSV或XLSX文件导入学生，并为每个学生创建以学号为用户名的登录账户。
+
+文件按行流式读取，每 chunk_size 行为一批：先校验必填字段、格式和长度，
+检查班级是否存在、学号和身份证号是否与文件中前面的行或数据库中的记录重复，
+再把通过校验的行用批量插入在一个事务中写入。
+某一批插入失败时（如并发写入了相同学号），在一个事务中逐行用保存点重试，只跳过出错的行。
+结果为逐行的错误报告，有错误的行不影响其他行导入。
+
+XLSX文件需要安装 openpyxl。
+"""
+import codecs
+import csv
+import datetime
+import itertools
+import logging
+import os
+
+from pymysql.constants import ER
+from pymysql.err import IntegrityError
+
+try:
+    import openpyxl
+except ImportError:  # 未安装时只支持CSV
+    openpyxl = None
+
+from .config import DEFAULT_PASSWORD, IMPORT_CONFIG
+from .db import transaction, savepoint
+from .models import Student, Class, User
+
+logger = logging.getLogger('sms.import')
+
+# 文件表头到字段名的映射，支持字段名和中文列名
+HEADER_ALIASES = {
+    '学号': 'student_no',
+    '姓名': 'name',
+    '性别': 'gender',
+    '出生日期': 'birth_date',
+    '身份证号': 'id_card',
+    '入学日期': 'enrollment_date',
+    '班级ID': 'class_id',
+    '地址': 'address',
+    '电话': 'phone',
+    '邮箱': 'email',
+}
+
+FIELDS = ('student_no', 'name', 'gender', 'birth_date', 'id_card', 'enrollment_date',
+          'class_id', 'address', 'phone', 'email')
+REQUIRED_FIELDS = ('student_no', 'name', 'gender', 'enrollment_date', 'class_id')
+
+# 各字段的最大长度，与 database/schema.sql 中的定义一致
+MAX_LENGTHS = {
+    'student_no': 20,
+    'name': 20,
+    'id_card': 18,
+    'address': 100,
+    'phone': 20,
+    'email': 50,
+}
+
+GENDERS = ('男', '女')
+DATE_FORMATS = ('%Y-%m-%d', '%Y/%m/%d', '%Y.%m.%d', '%Y%m%d')
+
+
+class ImportFileError(ValueError):
+    """导入文件无法读取，如格式不支持、缺少必需的列"""
+
+
+def _map_header(header):
+    """把表头转换为字段名列表，无法识别的列为None
+
+    异常:
+        ImportFileError: 缺少必需的列
+    """
+    fields = []
+    for name in header:
+        name = str(name).strip() if name is not None else ''
+        field = HEADER_ALIASES.get(name, name)
+        fields.append(field if field in FIELDS else None)
+    missing = [field for field in REQUIRED_FIELDS if field not in fields]
+    if missing:
+        raise ImportFileError(f"文件缺少必需的列: {', '.join(missing)}")
+    return fields
+
+
+def _iter_csv(stream, encoding):
+    """逐行读取CSV，返回表头和各行的值"""
+    reader = csv.reader(codecs.iterdecode(stream, encoding))
+    try:
+        header = next(reader)
+    except StopIteration:
+        raise ImportFileError('文件为空')
+    except UnicodeDecodeError:
+        raise ImportFileError(f'文件不是 {encoding} 编码')
+    return header, reader
+
+
+def _iter_xlsx(stream):
+    """逐行读取XLSX的第一个工作表，返回表头和各行的值"""
+    if openpyxl is None:
+        raise ImportFileError('读取xlsx文件需要安装 openpyxl')
+    try:
+        workbook = openpyxl.load_workbook(stream, read_only=True, data_only=True)
+    except Exception as e:
+        raise ImportFileError(f'无法读取xlsx文件: {e}')
+    rows = workbook.worksheets[0].iter_rows(values_only=True)
+    try:
+        header = next(rows)
+    except StopIteration:
+        raise ImportFileError('文件为空')
+    return header, rows
+
+
+def read_rows(stream, filename, encoding=None):
+    """流式读取导入文件
+
+    参数:
+        stream: 以二进制方式打开的文件
+        filename (str): 文件名，按扩展名判断格式
+        encoding (str): CSV文件的编码，默认取 IMPORT_CONFIG['encoding']
+
+    返回:
+        generator: 依次产生 (行号, 字段字典)，行号从表头下一行的2开始，跳过空行
+
+    异常:
+        ImportFileError: 格式不支持、文件为空或缺少必需的列
+    """
+    extension = os.path.splitext(filename or '')[1].lower()
+    if extension == '.csv':
+        header, rows = _iter_csv(stream, encoding or IMPORT_CONFIG['encoding'])
+    elif extension == '.xlsx':
+        header, rows = _iter_xlsx(stream)
+    else:
+        raise ImportFileError('只支持 .csv 和 .xlsx 文件')
+    fields = _map_header(header)
+
+    def generate():
+        for line, values in enumerate(rows, start=2):
+            if not any(value not in (None, '') for value in values):
+                continue
+            yield line, {field: value for field, value in zip(fields, values) if field}
+    return generate()
+
+
+def _parse_date(value):
+    """把日期单元格转换为 YYYY-MM-DD，无法识别时返回None"""
+    if isinstance(value, datetime.datetime):
+        return value.date().isoformat()
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.datetime.strptime(str(value), fmt).date().isoformat()
+        except ValueError:
+            continue
+    return None
+
+
+def validate_row(raw):
+    """校验一行的字段，不访问数据库
+
+    参数:
+        raw (dict): 文件中读出的字段
+
+    返回:
+        tuple: (清洗后的学生信息, 错误信息列表)
+    """
+    data = {}
+    for field in FIELDS:
+        value = raw.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        elif isinstance(value, float) and value.is_integer():
+            # XLSX中的数字单元格读出为浮点数
+            value = int(value)
+        data[field] = value if value not in (None, '') else None
+
+    errors = [f'{field} 不能为空' for field in REQUIRED_FIELDS if data[field] is None]
+    for field, max_length in MAX_LENGTHS.items():
+        if data[field] is not None:
+            data[field] = str(data[field])
+            if len(data[field]) > max_length:
+                errors.append(f'{field} 超过 {max_length} 个字符')
+    if data['gender'] is not None and data['gender'] not in GENDERS:
+        errors.append('gender 只能为 男 或 女')
+    for field in ('birth_date', 'enrollment_date'):
+        if data[field] is not None:
+            parsed = _parse_date(data[field])
+            if parsed is None:
+                errors.append(f'{field} 不是有效的日期')
+            data[field] = parsed
+    if data['class_id'] is not None:
+        try:
+            data['class_id'] = int(data['class_id'])
+        except (TypeError, ValueError):
+            errors.append('class_id 必须是整数')
+    if data['id_card'] is not None:
+        data['id_card'] = data['id_card'].upper()
+    return data, errors
+
+
+class _ImportReport:
+    """导入结果"""
+
+    def __init__(self, dry_run):
+        self.dry_run = dry_run
+        self.total = 0
+        self.imported = 0
+        self.errors = []
+
+    def fail(self, line, data, messages):
+        self.errors.append({'row': line, 'student_no': data.get('student_no'), 'errors': messages})
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'imported': self.imported,
+            'failed': len(self.errors),
+            'dry_run': self.dry_run,
+            'errors': sorted(self.errors, key=lambda error: error['row'])
+        }
+
+
+def _check_chunk(chunk, class_ids, seen_nos, seen_cards, report):
+    """校验一批行，返回通过校验的 (行号, 学生信息) 列表
+
+    seen_nos、seen_cards 记录文件中已出现的学号和身份证号（小写）到首次出现的行号
+    """
+    validated = []
+    for line, raw in chunk:
+        data, errors = validate_row(raw)
+        if isinstance(data['class_id'], int) and data['class_id'] not in class_ids:
+            errors.append(f"班级 {data['class_id']} 不存在")
+        for value, seen, label in ((data['student_no'], seen_nos, '学号'), (data['id_card'], seen_cards, '身份证号')):
+            if value is None:
+                continue
+            first_line = seen.setdefault(value.lower(), line)
+            if first_line != line:
+                errors.append(f'{label}与第 {first_line} 行重复')
+        if errors:
+            report.fail(line, data, errors)
+        else:
+            validated.append((line, data))
+
+    existing_nos, existing_cards = Student().find_existing(
+        [data['student_no'] for _, data in validated],
+        [data['id_card'] for _, data in validated if data['id_card']]
+    )
+    passed = []
+    for line, data in validated:
+        errors = []
+        if data['student_no'].lower() in existing_nos:
+            errors.append('学号已存在')
+        if data['id_card'] and data['id_card'].lower() in existing_cards:
+            errors.append('身份证号已存在')
+        if errors:
+            report.fail(line, data, errors)
+        else:
+            passed.append((line, data))
+    return passed
+
+
+def _insert_individually(rows, password, report):
+    """整批插入失败后逐行插入，每行使用一个保存点，出错的行单独回滚"""
+    student_model = Student()
+    user_model = User()
+    with transaction():
+        for line, data in rows:
+            try:
+                # 保存点回滚时，该行登记的搜索索引更新随之丢弃
+                with savepoint():
+                    student_model.add_student(data)
+                    user_model.create_user(data['student_no'], password, 'student', student_model.db.lastrowid)
+                report.imported += 1
+            except IntegrityError as e:
+                logger.warning('第 %s 行（学号 %s）写入失败: %s', line, data['student_no'], e)
+                # 只把唯一键冲突告知用户，其他约束错误（如班级刚被删除）和异常原文只写入日志
+                report.fail(line, data, ['学号或身份证号已存在' if e.args[0] == ER.DUP_ENTRY else '写入失败'])
+            except Exception:
+                logger.exception('第 %s 行（学号 %s）写入失败', line, data['student_no'])
+                report.fail(line, data, ['写入失败'])
+
+
+def import_students(rows, chunk_size=None, password=DEFAULT_PASSWORD, dry_run=False):
+    """批量导入学生
+
+    参数:
+        rows (iterable): read_rows 产生的 (行号, 字段字典)
+        chunk_size (int): 每批的行数，默认取 IMPORT_CONFIG['chunk_size']
+        password (str): 登录账户的初始密码
+        dry_run (bool): 为True时只校验不写入
+
+    返回:
+        dict: {total: 数据行数, imported: 成功导入数（dry_run 时为通过校验的行数）, failed: 失败行数, dry_run,
+               errors: [{row: 行号, student_no: 学号, errors: [错误信息]}]}
+
+    异常:
+        ImportFileError: 文件读取到一半时出错（如编码错误）
+    """
+    chunk_size = chunk_size or IMPORT_CONFIG['chunk_size']
+    report = _ImportReport(dry_run)
+    classes = Class().get_all_classes()
+    if classes is None:
+        raise RuntimeError('查询班级列表失败')
+    class_ids = {row['class_id'] for row in classes}
+    seen_nos, seen_cards = {}, {}
+    rows = iter(rows)
+    while True:
+        try:
+            chunk = list(itertools.islice(rows, chunk_size))
+        except (UnicodeDecodeError, csv.Error) as e:
+            raise ImportFileError(f'第 {report.total + 2} 行附近读取失败: {e}')
+        if not chunk:
+            break
+        report.total += len(chunk)
+        passed = _check_chunk(chunk, class_ids, seen_nos, seen_cards, report)
+        if dry_run or not passed:
+            report.imported += len(passed)
+            continue
+        try:
+            Student().add_students_with_accounts([data for _, data in passed], password)
+            report.imported += len(passed)
+        except Exception as e:
+            logger.warning('批量导入学生失败，改为逐行导入: %s', e)
+            _insert_individually(passed, password, report)
+    return report.to_dict()
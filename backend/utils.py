@@ -1,6 +1,11 @@
 import hashlib
 import functools
-from flask import session, redirect, url_for, jsonify
+import base64
+import json
+from flask import session, redirect, url_for, jsonify, request, make_response, g
+
+from .cache import SizedCache, table_versions, versions_epoch
+from .config import RESPONSE_CACHE_CONFIG
 
 def hash_password(password):
     """对密码进行哈希处理
@@ -142,4 +147,166 @@ def paginate(items, page, per_page):
     start = (page - 1) * per_page
     end = start + per_page
     
-    return items[start:end] 
\ No newline at end of file
+    return items[start:end] 
+
+def encode_cursor(after):
+    """生成游标分页的不透明游标
+    
+    将下一页的起始主键编码为URL安全的字符串，前端只需原样传回
+    
+    参数:
+        after (int): 上一页最后一条记录的主键
+    
+    返回:
+        str or None: 游标字符串，没有下一页时返回None
+    """
+    if after is None:
+        return None
+    payload = json.dumps({'after': after}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=')
+
+def decode_cursor(cursor):
+    """解析 encode_cursor 生成的游标
+    
+    参数:
+        cursor (str): 游标字符串，空字符串表示从第一条记录开始
+    
+    返回:
+        int: 上一页最后一条记录的主键，从头开始时为0
+    
+    异常:
+        ValueError: 游标格式无效
+    """
+    if not cursor:
+        return 0
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        after = json.loads(base64.urlsafe_b64decode(padded.encode()))['after']
+    except Exception:
+        raise ValueError('无效的分页游标')
+    if not isinstance(after, int) or after < 0:
+        raise ValueError('无效的分页游标')
+    return after
+
+def conditional_get(*tables):
+    """条件GET装饰器
+    
+    根据请求路径、查询参数、当前用户身份以及相关表的版本号生成ETag，
+    请求头 If-None-Match 与之匹配时直接返回304，不执行视图函数，也不查询数据库。
+    表版本号在每次写操作后递增，数据一旦修改ETag随之改变。
+    应放在登录或权限验证装饰器之后，保证未授权的请求不会得到304
+    
+    参数:
+        tables (str): 视图返回的数据所依赖的表名
+    
+    返回:
+        function: 装饰器
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            # 在查询数据之前计算ETag，期间发生的修改只会让下次请求重新获取，不会返回过期数据
+            material = json.dumps([
+                request.full_path,
+                session.get('role'),
+                session.get('related_id'),
+                versions_epoch(),
+                table_versions(*tables)
+            ])
+            etag = hashlib.sha1(material.encode()).hexdigest()
+
+            if request.if_none_match.contains_weak(etag):
+                response = make_response('', 304)
+            else:
+                response = make_response(f(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag, weak=True)
+            # 允许浏览器缓存，但每次使用前都要带 If-None-Match 重新验证
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+        return decorated_function
+    return decorator
+
+# 列表接口的响应缓存
+_response_cache = SizedCache(
+    max_bytes=RESPONSE_CACHE_CONFIG['max_bytes'],
+    ttl=RESPONSE_CACHE_CONFIG['ttl']
+)
+
+def cached_response(*tables):
+    """响应缓存装饰器
+    
+    以路由、查询参数和当前用户身份为键缓存视图的成功响应，
+    条目记录生成时相关表的版本号，表被修改后版本号不一致即视为未命中，
+    相同的列表请求在数据未修改时不再查询数据库。
+    与 conditional_get 同时使用时放在其后
+    
+    参数:
+        tables (str): 视图返回的数据所依赖的表名
+    
+    返回:
+        function: 装饰器
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            if not RESPONSE_CACHE_CONFIG['enabled']:
+                return f(*args, **kwargs)
+
+            key = (
+                request.endpoint,
+                tuple(sorted(request.args.items(multi=True))),
+                session.get('role'),
+                session.get('related_id')
+            )
+            # 在查询数据之前读取版本号，期间发生的修改会使该条目在下次读取时失效
+            versions = table_versions(*tables)
+            entry = _response_cache.get(key, version=versions)
+            if entry is not None:
+                return make_response(entry[0], 200, {'Content-Type': entry[1]})
+
+            response = make_response(f(*args, **kwargs))
+            if response.status_code == 200 and not response.is_streamed:
+                body = response.get_data()
+                if len(body) <= RESPONSE_CACHE_CONFIG['max_entry_bytes']:
+                    _response_cache.set(key, (body, response.content_type), len(body), version=versions)
+            return response
+        return decorated_function
+    return decorator
+
+def response_cache_stats():
+    """响应缓存的条目数、占用字节数及命中和未命中次数"""
+    return _response_cache.stats()
+
+def query_budget(max_queries):
+    """声明视图函数每个请求最多执行的SQL条数
+    
+    开启请求SQL检查时，请求结束后检查实际执行的条数，超出时打印警告或抛出 QueryBudgetExceeded；
+    关闭检查时没有额外开销。检查模式为应用配置 QUERY_CHECK_MODE 的值，未设置时取环境变量 SMS_QUERY_CHECK，
+    可为 warn、raise 或 off（默认，run.py 启动的开发服务器为 warn）
+    
+    参数:
+        max_queries (int): SQL条数上限
+    
+    返回:
+        function: 装饰器
+    """
+    def decorator(f):
+        @functools.wraps(f)
+        def decorated_function(*args, **kwargs):
+            g._query_budget = max_queries
+            return f(*args, **kwargs)
+        return decorated_function
+    return decorator
+
+def skip_query_check(f):
+    """关闭视图函数的请求SQL检查
+    
+    用于批量导入等按块重复执行相同SQL的视图，重复次数随数据量增长是预期行为，不是N+1查询
+    """
+    @functools.wraps(f)
+    def decorated_function(*args, **kwargs):
+        g.pop('_query_check', None)
+        return f(*args, **kwargs)
+    return decorated_function
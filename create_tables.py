@@ -1,150 +1,35 @@
+import os
+import re
+
 import pymysql
 
-# 数据库连接配置
-DB_CONFIG = {
-    'host': 'localhost',
-    'user': 'root',
-    'password': '123456',
-    'database': 'student_management',
-    'charset': 'utf8mb4',
-    'cursorclass': pymysql.cursors.DictCursor
-}
+from backend.config import DB_CONFIG
+from backend.migrate import split_statements, upgrade
+
+# 建表脚本
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'database', 'schema.sql')
 
 def create_tables():
-    conn = pymysql.connect(**DB_CONFIG)
+    # 与应用和迁移脚本使用同一份连接配置（可由 SMS_DB_* 环境变量覆盖），保证操作的是同一个数据库
+    conn = pymysql.connect(
+        host=DB_CONFIG['host'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        database=DB_CONFIG['database'],
+        charset=DB_CONFIG['charset'],
+        cursorclass=pymysql.cursors.DictCursor
+    )
     cursor = conn.cursor()
     
     try:
-        print("创建学院表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS college (
-                college_id INT PRIMARY KEY AUTO_INCREMENT,
-                college_name VARCHAR(50) NOT NULL,
-                college_code VARCHAR(20) NOT NULL UNIQUE
-            )
-        """)
-        
-        print("创建班级表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS class (
-                class_id INT PRIMARY KEY AUTO_INCREMENT,
-                class_name VARCHAR(50) NOT NULL,
-                class_code VARCHAR(20) NOT NULL UNIQUE,
-                college_id INT NOT NULL,
-                admission_year INT NOT NULL,
-                FOREIGN KEY (college_id) REFERENCES college(college_id)
-            )
-        """)
-        
-        print("创建职称表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS title (
-                title_id INT PRIMARY KEY AUTO_INCREMENT,
-                title_name VARCHAR(20) NOT NULL,
-                title_code VARCHAR(10) NOT NULL UNIQUE
-            )
-        """)
-        
-        print("创建课程类型表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS course_type (
-                type_id INT PRIMARY KEY AUTO_INCREMENT,
-                type_name VARCHAR(20) NOT NULL,
-                type_code VARCHAR(10) NOT NULL UNIQUE
-            )
-        """)
-        
-        print("创建学生表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS student (
-                student_id INT PRIMARY KEY AUTO_INCREMENT,
-                student_no VARCHAR(20) NOT NULL UNIQUE,
-                name VARCHAR(20) NOT NULL,
-                gender ENUM('男', '女') NOT NULL,
-                birth_date DATE,
-                id_card VARCHAR(18),
-                enrollment_date DATE NOT NULL,
-                class_id INT NOT NULL,
-                address VARCHAR(100),
-                phone VARCHAR(20),
-                email VARCHAR(50),
-                status ENUM('在读', '休学', '退学', '毕业') DEFAULT '在读',
-                FOREIGN KEY (class_id) REFERENCES class(class_id)
-            )
-        """)
-        
-        print("创建教师表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS teacher (
-                teacher_id INT PRIMARY KEY AUTO_INCREMENT,
-                teacher_no VARCHAR(20) NOT NULL UNIQUE,
-                name VARCHAR(20) NOT NULL,
-                gender ENUM('男', '女') NOT NULL,
-                birth_date DATE,
-                title_id INT,
-                college_id INT NOT NULL,
-                phone VARCHAR(20),
-                email VARCHAR(50),
-                FOREIGN KEY (title_id) REFERENCES title(title_id),
-                FOREIGN KEY (college_id) REFERENCES college(college_id)
-            )
-        """)
-        
-        print("创建课程表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS course (
-                course_id INT PRIMARY KEY AUTO_INCREMENT,
-                course_code VARCHAR(20) NOT NULL UNIQUE,
-                course_name VARCHAR(50) NOT NULL,
-                credit DECIMAL(3,1) NOT NULL,
-                hours INT NOT NULL,
-                type_id INT NOT NULL,
-                college_id INT NOT NULL,
-                FOREIGN KEY (type_id) REFERENCES course_type(type_id),
-                FOREIGN KEY (college_id) REFERENCES college(college_id)
-            )
-        """)
-        
-        print("创建开课表（授课安排）...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS course_offering (
-                offering_id INT PRIMARY KEY AUTO_INCREMENT,
-                course_id INT NOT NULL,
-                teacher_id INT NOT NULL,
-                semester VARCHAR(20) NOT NULL,
-                year INT NOT NULL,
-                classroom VARCHAR(50),
-                class_time VARCHAR(50),
-                FOREIGN KEY (course_id) REFERENCES course(course_id),
-                FOREIGN KEY (teacher_id) REFERENCES teacher(teacher_id)
-            )
-        """)
-        
-        print("创建学生选课和成绩表...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS student_course (
-                sc_id INT PRIMARY KEY AUTO_INCREMENT,
-                student_id INT NOT NULL,
-                offering_id INT NOT NULL,
-                score DECIMAL(5,2),
-                status ENUM('选课中', '已修完', '已取消') DEFAULT '选课中',
-                FOREIGN KEY (student_id) REFERENCES student(student_id),
-                FOREIGN KEY (offering_id) REFERENCES course_offering(offering_id),
-                UNIQUE KEY (student_id, offering_id)
-            )
-        """)
-        
-        print("创建用户表（用于系统登录）...")
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS user (
-                user_id INT PRIMARY KEY AUTO_INCREMENT,
-                username VARCHAR(50) NOT NULL UNIQUE,
-                password VARCHAR(100) NOT NULL,
-                role ENUM('admin', 'teacher', 'student') NOT NULL,
-                related_id INT,
-                status TINYINT DEFAULT 1
-            )
-        """)
+        # 建表语句统一维护在 database/schema.sql 中，这里只执行其中的 CREATE TABLE 语句
+        with open(SCHEMA_FILE, encoding='utf-8') as f:
+            statements = split_statements(f.read())
+        for stmt in statements:
+            match = re.match(r'CREATE TABLE IF NOT EXISTS (\w+)', stmt)
+            if match:
+                print(f"创建表 {match.group(1)}...")
+                cursor.execute(stmt)
         
         # 插入初始数据
         print("插入初始数据...")
@@ -317,19 +202,13 @@ def create_tables():
         
         # 插入用户账户（除了管理员账户）
         print("插入用户账户...")
-        # 为学生创建账户
-        for student_no, student_id in student_ids.items():
-            cursor.execute("""
-                INSERT INTO user (username, password, role, related_id) 
-                VALUES (%s, %s, %s, %s)
-            """, (student_no, '123456', 'student', student_id))
-        
-        # 为教师创建账户
-        for teacher_no, teacher_id in teacher_ids.items():
-            cursor.execute("""
-                INSERT INTO user (username, password, role, related_id) 
-                VALUES (%s, %s, %s, %s)
-            """, (teacher_no, '123456', 'teacher', teacher_id))
+        # 学生和教师账户合并为一条多行INSERT，与前面的数据在同一事务中提交
+        user_data = [(student_no, '123456', 'student', student_id) for student_no, student_id in student_ids.items()]
+        user_data += [(teacher_no, '123456', 'teacher', teacher_id) for teacher_no, teacher_id in teacher_ids.items()]
+        cursor.executemany("""
+            INSERT INTO user (username, password, role, related_id) 
+            VALUES (%s, %s, %s, %s)
+        """, user_data)
         
         # 确保管理员账户存在
         cursor.execute("SELECT COUNT(*) as count FROM user WHERE username = 'admin'")
@@ -342,14 +221,22 @@ def create_tables():
         
         # 提交事务
         conn.commit()
+        
+        # 执行迁移，创建索引等后续的结构变更
+        print("执行数据库迁移...")
+        cursor.close()
+        conn.close()
+        upgrade()
         print("数据库初始化完成！")
         
     except Exception as e:
-        conn.rollback()
+        if conn.open:
+            conn.rollback()
         print(f"数据库初始化失败: {e}")
     finally:
-        cursor.close()
-        conn.close()
+        if conn.open:
+            cursor.close()
+            conn.close()
 
 if __name__ == "__main__":
     create_tables() 
\ No newline at end of file
@@ -0,0 +1,4 @@
+-- 学生、教师、课程按名称查询时使用的索引
+CREATE INDEX idx_student_name ON student (name);
+CREATE INDEX idx_teacher_name ON teacher (name);
+CREATE INDEX idx_course_name ON course (course_name);
@@ -0,0 +1,5 @@
+-- 按学年学期筛选授课安排
+CREATE INDEX idx_offering_year_semester ON course_offering (year, semester);
+
+-- 按教师查询授课安排，同时可替代 teacher_id 外键自动创建的单列索引
+CREATE INDEX idx_offering_teacher ON course_offering (teacher_id, year, semester);
@@ -0,0 +1,3 @@
+-- 按授课安排查询选课学生及其状态（如成绩录入、统计已修完人数），
+-- 同时可替代 offering_id 外键自动创建的单列索引
+CREATE INDEX idx_sc_offering_status ON student_course (offering_id, status);
@@ -2,6 +2,9 @@
 CREATE DATABASE IF NOT EXISTS student_management;
 USE student_management;
 
+-- 本文件只包含建表语句和基础数据，索引等后续结构变更放在 database/migrations 目录中，
+-- 建表后执行 python migrate.py upgrade 完成迁移（create_tables.py 会自动执行）
+
 -- 学院表
 CREATE TABLE IF NOT EXISTS college (
     college_id INT PRIMARY KEY AUTO_INCREMENT,
@@ -566,9 +566,7 @@ const app = createApp({
                     currentUser.value = response.data.user;
                     loginError.value = '';
                     // 加载初始数据
-                    await loadStudents();
-                    await loadClasses();
-                    await loadColleges();
+                    await loadBatch(['students', 'classes', 'colleges']);
                 }
             } catch (error) {
                 loginError.value = error.response?.data?.error || '登录失败，请稍后重试';
@@ -587,39 +585,109 @@ const app = createApp({
             }
         };
 
+        // 合并多个GET请求为一次 /api/batch 调用，按顺序返回各子请求的 {path, status, body}
+        // 批量请求是POST，浏览器不会缓存，这里自己保存各路径最近一次的ETag和响应体，
+        // 下次随子请求带上ETag，未修改的返回304，直接使用保存的响应体
+        const batchCache = new Map();
+        const batchGet = async (paths) => {
+            const requests = paths.map(path => ({ path, etag: batchCache.get(path)?.etag }));
+            const response = await axios.post('/api/batch', { requests });
+            return response.data.responses.map(item => {
+                const cached = batchCache.get(item.path);
+                if (item.status === 304 && cached) {
+                    return { ...item, status: 200, body: cached.body };
+                }
+                if (item.status === 200 && item.etag) {
+                    batchCache.set(item.path, { etag: item.etag, body: item.body });
+                }
+                return item;
+            });
+        };
+
+        // 可以合并加载的数据：请求路径和加载成功后的处理
+        const batchSources = {
+            students: {
+                path: () => `/api/student/?page=${studentPage.value}&search=${encodeURIComponent(studentSearch.value)}`,
+                apply: (data) => { students.value = data.students; studentTotal.value = data.total; },
+                label: '学生'
+            },
+            teachers: {
+                path: () => `/api/teacher/?page=${teacherPage.value}&search=${encodeURIComponent(teacherSearch.value)}`,
+                apply: (data) => { teachers.value = data.teachers; teacherTotal.value = data.total; },
+                label: '教师'
+            },
+            courses: {
+                path: () => `/api/course/?page=${coursePage.value}&search=${encodeURIComponent(courseSearch.value)}`,
+                apply: (data) => { courses.value = data.courses; courseTotal.value = data.total; },
+                label: '课程'
+            },
+            offerings: {
+                path: () => `/api/offering/?page=${offeringPage.value}&search=${encodeURIComponent(offeringSearch.value)}`,
+                apply: (data) => { offerings.value = data.offerings; offeringTotal.value = data.total; },
+                label: '授课安排'
+            },
+            classes: {
+                path: () => '/api/student/class',
+                apply: (data) => { classes.value = data.classes; },
+                label: '班级'
+            },
+            colleges: {
+                path: () => '/api/student/college',
+                apply: (data) => { colleges.value = data.colleges; },
+                label: '学院'
+            },
+            titles: {
+                path: () => '/api/teacher/title',
+                apply: (data) => { titles.value = data.titles; },
+                label: '职称'
+            },
+            courseTypes: {
+                path: () => '/api/course/type',
+                apply: (data) => { courseTypes.value = data.course_types; },
+                label: '课程类型'
+            }
+        };
+
+        // 一次往返加载多组数据，某一组失败不影响其他组
+        const loadBatch = async (names) => {
+            try {
+                const responses = await batchGet(names.map(name => batchSources[name].path()));
+                responses.forEach((item, index) => {
+                    const source = batchSources[names[index]];
+                    if (item.status === 200) {
+                        source.apply(item.body);
+                    } else {
+                        console.error(`加载${source.label}数据失败:`, item.body?.error || item.status);
+                    }
+                });
+            } catch (error) {
+                console.error('批量加载数据失败:', error);
+            }
+        };
+
         // 切换模块
         const activateModule = (moduleName) => {
             activeModule.value = moduleName;
             
-            // 根据模块加载数据
+            // 根据模块加载数据，同一模块所需的数据合并为一次请求
             switch (moduleName) {
                 case 'student':
-                    loadStudents();
-                    loadClasses();
-                    loadColleges();
+                    loadBatch(['students', 'classes', 'colleges']);
                     break;
                 case 'teacher':
-                    loadTeachers();
-                    loadTitles();
-                    loadColleges();
+                    loadBatch(['teachers', 'titles', 'colleges']);
                     break;
                 case 'course':
-                    loadCourses();
-                    loadCourseTypes();
-                    loadColleges();
+                    loadBatch(['courses', 'courseTypes', 'colleges']);
                     break;
                 case 'offering':
-                    loadOfferings();
-                    loadCourses();
-                    loadTeachers();
+                    loadBatch(['offerings', 'courses', 'teachers']);
                     break;
                 case 'score':
-                    loadStudents();
-                    loadOfferings();
+                    loadBatch(['students', 'offerings']);
                     break;
                 case 'class':
-                    loadClasses();
-                    loadColleges();
+                    loadBatch(['classes', 'colleges']);
                     break;
             }
         };
@@ -666,7 +734,7 @@ const app = createApp({
         // 学生管理相关函数
         const loadStudents = async () => {
             try {
-                const response = await axios.get(`/api/student/?page=${studentPage.value}&search=${studentSearch.value}`);
+                const response = await axios.get(`/api/student/?page=${studentPage.value}&search=${encodeURIComponent(studentSearch.value)}`);
                 students.value = response.data.students;
                 studentTotal.value = response.data.total;
             } catch (error) {
@@ -835,7 +903,7 @@ const app = createApp({
         // 教师管理相关函数
         const loadTeachers = async () => {
             try {
-                const response = await axios.get(`/api/teacher/?page=${teacherPage.value}&search=${teacherSearch.value}`);
+                const response = await axios.get(`/api/teacher/?page=${teacherPage.value}&search=${encodeURIComponent(teacherSearch.value)}`);
                 teachers.value = response.data.teachers;
                 teacherTotal.value = response.data.total;
             } catch (error) {
@@ -991,7 +1059,7 @@ const app = createApp({
         // 课程管理相关函数
         const loadCourses = async () => {
             try {
-                const response = await axios.get(`/api/course/?page=${coursePage.value}&search=${courseSearch.value}`);
+                const response = await axios.get(`/api/course/?page=${coursePage.value}&search=${encodeURIComponent(courseSearch.value)}`);
                 courses.value = response.data.courses;
                 courseTotal.value = response.data.total;
             } catch (error) {
@@ -1118,7 +1186,7 @@ const app = createApp({
         // 授课管理相关函数
         const loadOfferings = async () => {
             try {
-                const response = await axios.get(`/api/offering/?page=${offeringPage.value}&search=${offeringSearch.value}`);
+                const response = await axios.get(`/api/offering/?page=${offeringPage.value}&search=${encodeURIComponent(offeringSearch.value)}`);
                 offerings.value = response.data.offerings;
                 offeringTotal.value = response.data.total;
             } catch (error) {
@@ -1244,15 +1312,6 @@ const app = createApp({
         const loadStudentScores = async (studentId) => {
             if (studentId) {
                 selectedStudentId.value = studentId;
-                
-                // 加载学生信息
-                try {
-                    const response = await axios.get(`/api/student/${studentId}`);
-                    selectedStudentInfo.value = response.data.student;
-                } catch (error) {
-                    console.error('加载学生信息失败:', error);
-                    selectedStudentInfo.value = null;
-                }
             }
             
             if (!selectedStudentId.value) return;
@@ -1260,13 +1319,32 @@ const app = createApp({
             // 清空过滤条件
             scoreFilter.value = '';
             
-            // 加载成绩
+            // 学生信息和成绩合并为一次请求加载
+            const paths = [`/api/score/${selectedStudentId.value}`];
+            if (studentId) {
+                paths.push(`/api/student/${studentId}`);
+            }
             try {
-                const response = await axios.get(`/api/score/${selectedStudentId.value}`);
-                scores.value = response.data.scores;
-                allScores.value = [...response.data.scores]; // 保存完整列表用于搜索
+                const [scoreResult, studentResult] = await batchGet(paths);
+                if (studentResult) {
+                    if (studentResult.status === 200) {
+                        selectedStudentInfo.value = studentResult.body.student;
+                    } else {
+                        console.error('加载学生信息失败:', studentResult.body?.error || studentResult.status);
+                        selectedStudentInfo.value = null;
+                    }
+                }
+                if (scoreResult.status === 200) {
+                    scores.value = scoreResult.body.scores;
+                    allScores.value = [...scoreResult.body.scores]; // 保存完整列表用于搜索
+                } else {
+                    console.error('加载学生成绩数据失败:', scoreResult.body?.error || scoreResult.status);
+                }
             } catch (error) {
                 console.error('加载学生成绩数据失败:', error);
+                if (studentId) {
+                    selectedStudentInfo.value = null;
+                }
             }
         };
 
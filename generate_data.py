@@ -0,0 +1,522 @@
+"""大规模测试数据生成
+
+按参数生成学院、班级、教师、课程、各学期的授课安排、学生及其选课成绩和登录账户，
+用于在接近真实规模的数据上测试查询和接口性能。
+
+同一个随机种子和参数生成的数据完全相同（配合 --reset 时主键也相同），便于重复对比测试；
+当前学年默认固定为 DEFAULT_CURRENT_YEAR，不随运行日期变化。
+姓名、身份证号、上课时间等按真实格式生成，身份证号由学生ID决定，不会重复；成绩由学生水平、课程难度和随机波动叠加得到，
+呈近似正态分布，同一学生各科成绩相关。
+
+数据按表流式生成、分批写入，内存占用不随选课记录数增长：
+默认用多行 INSERT 写入；--method load-data 先写成临时文件再用 LOAD DATA LOCAL INFILE 导入，
+速度更快，但需要MySQL服务端开启 local_infile。
+写入期间关闭外键检查（生成的数据本身满足约束），使用 --reset 清空数据后还关闭唯一性检查，
+写入后执行 ANALYZE TABLE 更新统计信息。
+
+用法:
+    python generate_data.py --reset --students 200000 --enrollments-per-student 25 --method load-data
+"""
+import argparse
+import datetime
+import itertools
+import math
+import os
+import random
+import tempfile
+import time
+
+import pymysql
+
+from backend.config import DB_CONFIG, DEFAULT_PASSWORD
+
+# 学院：名称、代码前缀、专业、课程名称
+COLLEGES = [
+    ('计算机科学与技术学院', 'CS', ['计算机科学与技术', '软件工程', '人工智能'],
+     ['程序设计基础', '数据结构', '计算机组成原理', '操作系统', '计算机网络', '数据库系统', '编译原理', '软件工程导论', '机器学习', '算法设计与分析']),
+    ('数学与统计学院', 'MATH', ['数学与应用数学', '统计学'],
+     ['数学分析', '高等代数', '解析几何', '常微分方程', '概率论', '数理统计', '实变函数', '复变函数', '数值分析']),
+    ('物理学院', 'PHYS', ['应用物理学', '光电信息科学与工程'],
+     ['力学', '热学', '电磁学', '光学', '原子物理', '量子力学', '固体物理', '数学物理方法']),
+    ('化学化工学院', 'CHEM', ['化学', '化学工程与工艺'],
+     ['无机化学', '有机化学', '分析化学', '物理化学', '化工原理', '仪器分析', '高分子化学']),
+    ('经济管理学院', 'ECON', ['经济学', '工商管理', '会计学'],
+     ['微观经济学', '宏观经济学', '管理学原理', '会计学原理', '财务管理', '市场营销', '计量经济学', '统计学原理']),
+    ('外国语学院', 'FL', ['英语', '日语'],
+     ['综合英语', '英语听力', '英语写作', '翻译理论与实践', '英美文学', '基础日语', '语言学概论']),
+    ('文学院', 'LIT', ['汉语言文学', '秘书学'],
+     ['现代汉语', '古代汉语', '中国古代文学', '中国现当代文学', '文学概论', '外国文学', '写作']),
+    ('法学院', 'LAW', ['法学'],
+     ['法理学', '宪法学', '民法总论', '刑法学', '民事诉讼法', '行政法', '国际法', '商法']),
+    ('机械工程学院', 'ME', ['机械设计制造及其自动化', '车辆工程'],
+     ['工程制图', '理论力学', '材料力学', '机械原理', '机械设计', '工程材料', '控制工程基础']),
+    ('电子信息工程学院', 'EE', ['电子信息工程', '通信工程', '自动化'],
+     ['电路分析', '模拟电子技术', '数字电子技术', '信号与系统', '通信原理', '自动控制原理', '单片机原理']),
+    ('生命科学学院', 'BIO', ['生物科学', '生物技术'],
+     ['普通生物学', '细胞生物学', '生物化学', '遗传学', '微生物学', '分子生物学', '生态学']),
+    ('土木工程学院', 'CE', ['土木工程', '工程管理'],
+     ['结构力学', '土力学', '混凝土结构', '钢结构', '工程测量', '建筑材料', '施工技术']),
+]
+
+# 公共课，各学院学生都可能选修
+GENERAL_COURSES = ['大学英语', '高等数学', '线性代数', '大学物理', '思想道德与法治', '中国近现代史纲要', '体育', '大学生心理健康']
+
+# 姓氏按常见程度排列，越靠前被选中的概率越大
+SURNAMES = ('王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭曾肖田董袁潘于蒋蔡余杜叶程苏魏吕丁任沈姚卢'
+            '姜崔钟谭陆汪范金石廖贾夏韦付方白邹孟熊秦邱江尹薛闫段雷侯龙史陶黎贺顾毛郝龚邵万钱严覃武戴莫孔向汤')
+SURNAME_WEIGHTS = [1 / (i + 10) for i in range(len(SURNAMES))]
+MALE_CHARS = '伟刚勇毅俊峰强军平保东文辉力明永健世广志义兴良海山仁波宁贵福生龙元全国胜学祥才发武新利清飞彬富顺信子杰涛昌成康星光天达安岩中茂进林有坚和彪博诚先敬震振壮会思群豪心邦承乐绍功松善厚庆磊民友裕河哲江超浩亮政谦亨奇固之轮翰朗伯宏言若鸣朋斌梁栋维启克伦翔旭鹏泽晨辰士以建家致树炎德行时泰盛雄琛钧冠策腾楠榕风航弘'
+FEMALE_CHARS = '秀娟英华慧巧美娜静淑惠珠翠雅芝玉萍红娥玲芬芳燕彩春菊兰凤洁梅琳素云莲真环雪荣爱妹霞香月莺媛艳瑞凡佳嘉琼勤珍贞莉桂娣叶璧璐娅琦晶妍茜秋珊莎锦黛青倩婷姣婉娴瑾颖露瑶怡婵雁蓓纨仪荷丹蓉眉君琴蕊薇菁梦岚苑婕馨瑗琰韵融园艺咏卿聪澜纯毓悦昭冰爽琬茗羽希宁欣飘育滢馥筠柔竹霭凝晓欢霄枫芸菲寒伊亚宜可姬舒影荔枝丽阳妮宝贝初程梵罡恒鸿桦骅剑娇纪宽苛灵玛媚琪晴容睿烁堂唯威韦雯苇萱阅彦宇雨洋忠宗曼紫逸贤蝶菡绿蓝儿翠烟'
+
+# 籍贯：身份证地址码和地址
+REGIONS = [
+    ('110108', '北京市海淀区'), ('110105', '北京市朝阳区'), ('310115', '上海市浦东新区'), ('310104', '上海市徐汇区'),
+    ('440106', '广东省广州市天河区'), ('440305', '广东省深圳市南山区'), ('330106', '浙江省杭州市西湖区'), ('320102', '江苏省南京市玄武区'),
+    ('320508', '江苏省苏州市姑苏区'), ('420111', '湖北省武汉市洪山区'), ('430104', '湖南省长沙市岳麓区'), ('510107', '四川省成都市武侯区'),
+    ('500103', '重庆市渝中区'), ('610113', '陕西省西安市雁塔区'), ('370102', '山东省济南市历下区'), ('370202', '山东省青岛市市南区'),
+    ('410105', '河南省郑州市金水区'), ('130104', '河北省石家庄市桥西区'), ('210102', '辽宁省沈阳市和平区'), ('230103', '黑龙江省哈尔滨市南岗区'),
+    ('350102', '福建省福州市鼓楼区'), ('360102', '江西省南昌市东湖区'), ('340104', '安徽省合肥市蜀山区'), ('450103', '广西壮族自治区南宁市青秀区'),
+    ('530102', '云南省昆明市五华区'), ('520102', '贵州省贵阳市南明区'), ('620102', '甘肃省兰州市城关区'), ('120101', '天津市和平区'),
+]
+
+# 身份证校验码
+ID_CARD_WEIGHTS = (7, 9, 10, 5, 8, 4, 2, 1, 6, 3, 7, 9, 10, 5, 8, 4, 2)
+ID_CARD_CHECK = '10X98765432'
+# 学生ID一一对应到 (籍贯, 出生日期在年内的天数, 顺序码) 的组合，保证身份证号不重复，
+# 乘以与组合数互质的数打乱顺序，使相邻ID的籍贯和生日不相同
+ID_CARD_ORDERS = 500  # 顺序码3位，末位按性别取奇偶，每种组合可用500个
+ID_CARD_CAPACITY = len(REGIONS) * 365 * ID_CARD_ORDERS
+ID_CARD_MULTIPLIER = 1000003
+
+# 默认的当前学年，固定取值以保证不同时间用相同的种子生成相同的数据
+DEFAULT_CURRENT_YEAR = 2026
+
+WEEKDAYS = ('周一', '周二', '周三', '周四', '周五')
+TIME_SLOTS = ('08:00-09:40', '10:00-11:40', '14:00-15:40', '16:00-17:40', '19:00-20:40')
+BUILDINGS = 'ABCDEF'
+SEMESTERS = ('春季', '秋季')
+CREDITS = (1.0, 1.5, 2.0, 2.5, 3.0, 3.0, 3.5, 4.0, 4.0, 5.0)
+
+# 各表写入的列
+COLUMNS = {
+    'college': ('college_id', 'college_name', 'college_code'),
+    'class': ('class_id', 'class_name', 'class_code', 'college_id', 'admission_year'),
+    'teacher': ('teacher_id', 'teacher_no', 'name', 'gender', 'birth_date', 'title_id', 'college_id', 'phone', 'email'),
+    'course': ('course_id', 'course_code', 'course_name', 'credit', 'hours', 'type_id', 'college_id'),
+    'course_offering': ('offering_id', 'course_id', 'teacher_id', 'semester', 'year', 'classroom', 'class_time'),
+    'student': ('student_id', 'student_no', 'name', 'gender', 'birth_date', 'id_card', 'enrollment_date',
+                'class_id', 'address', 'phone', 'email', 'status'),
+    'student_course': ('student_id', 'offering_id', 'score', 'status'),
+    'user': ('username', 'password', 'role', 'related_id'),
+}
+
+# 主键列，用于在已有数据之后继续编号
+PRIMARY_KEYS = {
+    'college': 'college_id',
+    'class': 'class_id',
+    'teacher': 'teacher_id',
+    'course': 'course_id',
+    'course_offering': 'offering_id',
+    'student': 'student_id',
+}
+
+
+def connect(local_infile=False):
+    """连接数据库，使用 backend/config.py 中的连接参数（可由环境变量覆盖）"""
+    return pymysql.connect(
+        host=DB_CONFIG['host'],
+        user=DB_CONFIG['user'],
+        password=DB_CONFIG['password'],
+        database=DB_CONFIG['database'],
+        charset=DB_CONFIG['charset'],
+        local_infile=local_infile,
+        autocommit=False
+    )
+
+
+class Generator:
+    """确定性的测试数据生成器
+
+    各表的生成方法都是生成器，按 COLUMNS 中列的顺序逐行产生元组；
+    必须按 colleges、classes、teachers、courses、offerings、students、enrollments、users 的顺序调用，
+    后面的表依赖前面生成的主键
+    """
+
+    def __init__(self, args, start_ids, title_ids, type_ids):
+        """
+        参数:
+            args: 命令行参数
+            start_ids (dict): 表名 -> 已有数据的最大主键，新数据从其下一个开始编号
+            title_ids (dict): 职称代码 -> 职称ID
+            type_ids (dict): 课程类型代码 -> 课程类型ID
+        """
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.start_ids = start_ids
+        self.title_ids = title_ids
+        self.type_ids = type_ids
+        self.current_year = args.current_year
+        self.first_year = args.current_year - args.years + 1
+        # 学期按时间排序，最后一个学期视为正在进行
+        self.terms = [(year, semester) for year in range(self.first_year, self.current_year + 1) for semester in SEMESTERS]
+
+        self.colleges = []  # [(college_id, 代码前缀, 学院序号)]
+        self.classes = []  # [(class_id, 学院序号, 入学年份)]
+        self.teachers_by_college = {}  # 学院序号 -> [teacher_id]
+        self.courses = []  # [(course_id, 学院序号，公共课为None)]
+        self.offerings_by_term = []  # 学期序号 -> [(offering_id, 学院序号, 难度)]
+        self.own_offerings_by_term = []  # 学期序号 -> {学院序号: [(offering_id, 难度)]}
+        self.students = []  # [(student_id, 学院序号, 入学年份, 水平)]
+        self.student_nos = []
+        self.teacher_nos = []
+
+    def _next_ids(self, table, count):
+        start = self.start_ids.get(table, 0) + 1
+        return range(start, start + count)
+
+    def _name(self, gender):
+        """生成姓名，约七成为双字名"""
+        rng = self.rng
+        surname = rng.choices(SURNAMES, weights=SURNAME_WEIGHTS)[0]
+        chars = MALE_CHARS if gender == '男' else FEMALE_CHARS
+        length = 2 if rng.random() < 0.7 else 1
+        return surname + ''.join(rng.choice(chars) for _ in range(length))
+
+    def _birth_date(self, year):
+        return datetime.date(year, 1, 1) + datetime.timedelta(days=self.rng.randrange(365))
+
+    def _phone(self):
+        return '1' + self.rng.choice('35789') + ''.join(self.rng.choice('0123456789') for _ in range(9))
+
+    @staticmethod
+    def _id_card_parts(student_id):
+        """由学生ID得到籍贯序号、出生日期在年内的天数和顺序码序号，不同的ID得到不同的组合"""
+        key = student_id * ID_CARD_MULTIPLIER % ID_CARD_CAPACITY
+        key, region_index = divmod(key, len(REGIONS))
+        order, day = divmod(key, 365)
+        return region_index, day, order
+
+    @staticmethod
+    def _id_card(region, birth_date, order, gender):
+        """生成带正确校验码的18位身份证号，顺序码末位奇数为男、偶数为女"""
+        body = f"{region}{birth_date.strftime('%Y%m%d')}{order * 2 + (1 if gender == '男' else 0):03d}"
+        check = ID_CARD_CHECK[sum(int(d) * w for d, w in zip(body, ID_CARD_WEIGHTS)) % 11]
+        return body + check
+
+    def colleges_rows(self):
+        for index, college_id in enumerate(self._next_ids('college', self.args.colleges)):
+            name, prefix, _, _ = COLLEGES[index % len(COLLEGES)]
+            if index >= len(COLLEGES):
+                name = f'{name}（第{index // len(COLLEGES) + 1}分院）'
+            self.colleges.append((college_id, prefix, index % len(COLLEGES)))
+            yield college_id, name, f'{prefix}{college_id:02d}'
+
+    def classes_rows(self):
+        """班级平均分配到各学院和各入学年份"""
+        years = list(range(self.first_year, self.current_year + 1))
+        counters = {}
+        for index, class_id in enumerate(self._next_ids('class', self.args.classes)):
+            college_index = index % len(self.colleges)
+            college_id, prefix, template = self.colleges[college_index]
+            year = years[index // len(self.colleges) % len(years)]
+            majors = COLLEGES[template][2]
+            major = majors[index // (len(self.colleges) * len(years)) % len(majors)]
+            number = counters[(college_index, year, major)] = counters.get((college_index, year, major), 0) + 1
+            self.classes.append((class_id, college_index, year))
+            yield class_id, f'{major}{year}级{number}班', f'{prefix}{year}-{class_id:04d}', college_id, year
+
+    def teachers_rows(self):
+        rng = self.rng
+        title_codes = [code for code in ('PROF', 'ASSO_PROF', 'LECT') if code in self.title_ids] or list(self.title_ids)
+        title_weights = {'PROF': 2, 'ASSO_PROF': 3.5, 'LECT': 4.5}
+        for index, teacher_id in enumerate(self._next_ids('teacher', self.args.teachers)):
+            college_index = index % len(self.colleges)
+            self.teachers_by_college.setdefault(college_index, []).append(teacher_id)
+            gender = '男' if rng.random() < 0.55 else '女'
+            teacher_no = f'T{teacher_id:06d}'
+            self.teacher_nos.append((teacher_no, teacher_id))
+            title_code = rng.choices(title_codes, weights=[title_weights.get(code, 1) for code in title_codes])[0]
+            yield (
+                teacher_id, teacher_no, self._name(gender), gender,
+                self._birth_date(rng.randint(1960, 1992)).isoformat(),
+                self.title_ids[title_code], self.colleges[college_index][0], self._phone(),
+                f'{teacher_no.lower()}@example.edu.cn'
+            )
+
+    def courses_rows(self):
+        """约一成为公共课，其余按学院分配；课程名称用完后加上序号"""
+        rng = self.rng
+        type_codes = [code for code in ('REQ', 'ELEC', 'GEN') if code in self.type_ids] or list(self.type_ids)
+        used = {}
+        for index, course_id in enumerate(self._next_ids('course', self.args.courses)):
+            if index % 10 == 9:
+                college_index = None
+                names = GENERAL_COURSES
+                owner_index = index % len(self.colleges)
+                type_code = 'GEN' if 'GEN' in self.type_ids else type_codes[0]
+            else:
+                college_index = owner_index = index % len(self.colleges)
+                names = COLLEGES[self.colleges[college_index][2]][3]
+                type_code = rng.choices(type_codes, weights=[5 if code == 'REQ' else 3 for code in type_codes])[0]
+            base = rng.choice(names)
+            count = used[(college_index, base)] = used.get((college_index, base), 0) + 1
+            name = base if count == 1 else f'{base}（{count}）'
+            credit = rng.choice(CREDITS)
+            self.courses.append((course_id, college_index))
+            college_id, prefix, _ = self.colleges[owner_index]
+            yield course_id, f'{prefix}{course_id:04d}', name, credit, int(credit * 16), self.type_ids[type_code], college_id
+
+    def offerings_rows(self):
+        """每个学期开设 offerings_per_semester 门课，由开课学院的教师讲授"""
+        rng = self.rng
+        ids = iter(self._next_ids('course_offering', self.args.offerings_per_semester * len(self.terms)))
+        all_teachers = [teacher_id for teachers in self.teachers_by_college.values() for teacher_id in teachers]
+        for year, semester in self.terms:
+            term_offerings = []
+            own = {}
+            for _ in range(self.args.offerings_per_semester):
+                offering_id = next(ids)
+                course_id, college_index = rng.choice(self.courses)
+                teachers = self.teachers_by_college.get(college_index) or all_teachers
+                difficulty = rng.gauss(0, self.args.score_stddev * 0.3)
+                term_offerings.append((offering_id, college_index, difficulty))
+                if college_index is not None:
+                    own.setdefault(college_index, []).append((offering_id, difficulty))
+                classroom = f'{rng.choice(BUILDINGS)}{rng.randint(1, 5)}{rng.randint(1, 30):02d}'
+                class_time = f'{rng.choice(WEEKDAYS)} {rng.choice(TIME_SLOTS)}'
+                yield offering_id, course_id, rng.choice(teachers), semester, year, classroom, class_time
+            self.offerings_by_term.append(term_offerings)
+            self.own_offerings_by_term.append(own)
+
+    def students_rows(self):
+        rng = self.rng
+        for student_id in self._next_ids('student', self.args.students):
+            class_id, college_index, year = rng.choice(self.classes)
+            gender = '男' if rng.random() < 0.52 else '女'
+            # 籍贯、生日（年份除外）和顺序码由学生ID决定，保证身份证号不重复
+            region_index, day, order = self._id_card_parts(student_id)
+            region, address = REGIONS[region_index]
+            birth_date = datetime.date(year - 18 - (1 if rng.random() < 0.2 else 0), 1, 1) + datetime.timedelta(days=day)
+            student_no = f'{year}{student_id:07d}'
+            ability = rng.gauss(0, self.args.score_stddev * 0.5)
+            self.students.append((student_id, college_index, year, ability))
+            self.student_nos.append((student_no, student_id))
+            if year <= self.current_year - 4:
+                status = '毕业' if rng.random() < 0.96 else '退学'
+            else:
+                status = rng.choices(('在读', '休学', '退学'), weights=(97, 2, 1))[0]
+            yield (
+                student_id, student_no, self._name(gender), gender, birth_date.isoformat(),
+                self._id_card(region, birth_date, order, gender), f'{year}-09-01', class_id,
+                f'{address}{rng.randint(1, 300)}号', self._phone(), f'{student_no}@stu.example.edu.cn', status
+            )
+
+    def _score(self, ability, difficulty):
+        """成绩 = 平均分 + 学生水平 + 课程难度 + 随机波动，按0.5分取整并限制在0~100"""
+        noise = self.rng.gauss(0, self.args.score_stddev * math.sqrt(1 - 0.25 - 0.09))
+        score = round((self.args.score_mean + ability - difficulty + noise) * 2) / 2
+        return min(100.0, max(0.0, score))
+
+    def enrollments_rows(self):
+        """每个学生在入学后的学期中选课，约七成选本学院开设的课程
+
+        选课数与已就读的学期数成正比，全体学生平均为 enrollments_per_student；
+        已结束学期的课程已修完并有成绩（少量已取消），最后一个学期的课程为选课中
+        """
+        rng = self.rng
+        last_term = len(self.terms) - 1
+        first_terms = {year: self.terms.index((year, '秋季')) for year in range(self.first_year, self.current_year + 1)}
+        term_counts = {year: min(8, last_term + 1 - first_term) for year, first_term in first_terms.items()}
+        average_terms = sum(term_counts[year] for _, _, year, _ in self.students) / max(1, len(self.students))
+        per_term = self.args.enrollments_per_student / average_terms
+        for student_id, college_index, year, ability in self.students:
+            first_term = first_terms[year]
+            student_terms = list(range(first_term, first_term + term_counts[year]))
+            expected = per_term * len(student_terms)
+            count = max(1, round(rng.gauss(expected, expected * 0.15)))
+            chosen = set()
+            for _ in range(count * 3):
+                if len(chosen) >= count:
+                    break
+                term = rng.choice(student_terms)
+                own = self.own_offerings_by_term[term].get(college_index)
+                if own and rng.random() < 0.7:
+                    offering_id, difficulty = rng.choice(own)
+                else:
+                    offering_id, _, difficulty = rng.choice(self.offerings_by_term[term])
+                if offering_id in chosen:
+                    continue
+                chosen.add(offering_id)
+                if term == last_term:
+                    yield student_id, offering_id, None, '选课中'
+                elif rng.random() < 0.02:
+                    yield student_id, offering_id, None, '已取消'
+                else:
+                    yield student_id, offering_id, self._score(ability, difficulty), '已修完'
+
+    def users_rows(self):
+        """学生和教师的登录账户，用户名为学号或工号"""
+        for student_no, student_id in self.student_nos:
+            yield student_no, DEFAULT_PASSWORD, 'student', student_id
+        for teacher_no, teacher_id in self.teacher_nos:
+            yield teacher_no, DEFAULT_PASSWORD, 'teacher', teacher_id
+
+
+def _batches(rows, size):
+    rows = iter(rows)
+    while True:
+        batch = list(itertools.islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert_rows(conn, table, columns, rows, batch_size):
+    """用多行 INSERT 分批写入，每批提交一次
+
+    返回:
+        int: 写入的行数
+    """
+    sql = f"INSERT INTO `{table}` ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})"
+    total = 0
+    with conn.cursor() as cursor:
+        for batch in _batches(rows, batch_size):
+            # executemany 会把整批参数拼成一条多行 INSERT
+            cursor.executemany(sql, batch)
+            conn.commit()
+            total += len(batch)
+    return total
+
+
+def _tsv_value(value):
+    """转换为 LOAD DATA 默认格式的字段：NULL 写作 \\N，转义反斜杠、制表符和换行"""
+    if value is None:
+        return '\\N'
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+
+def load_data_rows(conn, table, columns, rows, batch_size):
+    """写入临时文件后用 LOAD DATA LOCAL INFILE 导入
+
+    返回:
+        int: 写入的行数
+    """
+    total = 0
+    with tempfile.NamedTemporaryFile('w', encoding='utf-8', suffix='.tsv', newline='\n', delete=False) as f:
+        path = f.name
+        for row in rows:
+            f.write('\t'.join(_tsv_value(value) for value in row) + '\n')
+            total += 1
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE `{table}` CHARACTER SET utf8mb4 ({', '.join(columns)})",
+                (path,)
+            )
+        conn.commit()
+    finally:
+        os.unlink(path)
+    return total
+
+
+def reset_data(cursor):
+    """清空除管理员账户、职称和课程类型以外的数据"""
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in ('student_course', 'course_offering', 'student', 'course', 'teacher', 'class', 'college'):
+        cursor.execute(f"TRUNCATE TABLE {table}")
+    cursor.execute("DELETE FROM user WHERE role != 'admin'")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='生成大规模测试数据')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子，相同的种子和参数生成相同的数据')
+    parser.add_argument('--colleges', type=int, default=12, help='学院数')
+    parser.add_argument('--classes', type=int, default=400, help='班级数')
+    parser.add_argument('--students', type=int, default=20000, help='学生数')
+    parser.add_argument('--teachers', type=int, default=800, help='教师数')
+    parser.add_argument('--courses', type=int, default=600, help='课程数')
+    parser.add_argument('--offerings-per-semester', type=int, default=600, help='每学期的授课安排数')
+    parser.add_argument('--enrollments-per-student', type=int, default=25, help='每个学生的平均选课数')
+    parser.add_argument('--years', type=int, default=4, help='生成最近几个学年的班级和授课安排')
+    parser.add_argument('--current-year', type=int, default=DEFAULT_CURRENT_YEAR,
+                        help=f'当前学年，该年秋季学期的选课为选课中（默认{DEFAULT_CURRENT_YEAR}）')
+    parser.add_argument('--score-mean', type=float, default=76.0, help='成绩平均分')
+    parser.add_argument('--score-stddev', type=float, default=11.0, help='成绩标准差')
+    parser.add_argument('--method', choices=('insert', 'load-data'), default='insert',
+                        help='写入方式：多行INSERT，或LOAD DATA LOCAL INFILE（需服务端开启 local_infile）')
+    parser.add_argument('--batch-size', type=int, default=5000, help='多行INSERT每批的行数')
+    parser.add_argument('--reset', action='store_true', help='写入前清空现有的学院、班级、教师、课程、学生、选课数据和非管理员账户')
+    args = parser.parse_args()
+    for name in ('colleges', 'classes', 'students', 'teachers', 'courses', 'offerings_per_semester', 'years'):
+        if getattr(args, name) < 1:
+            parser.error(f"--{name.replace('_', '-')} 必须大于0")
+    return args
+
+
+def main():
+    args = parse_args()
+    conn = connect(local_infile=args.method == 'load-data')
+    cursor = conn.cursor(pymysql.cursors.DictCursor)
+    try:
+        if args.reset:
+            print("清空现有数据...")
+            reset_data(cursor)
+            conn.commit()
+
+        cursor.execute("SELECT title_id, title_code FROM title")
+        title_ids = {row['title_code']: row['title_id'] for row in cursor.fetchall()}
+        cursor.execute("SELECT type_id, type_code FROM course_type")
+        type_ids = {row['type_code']: row['type_id'] for row in cursor.fetchall()}
+        if not title_ids or not type_ids:
+            print("职称或课程类型数据为空，请先运行 python create_tables.py")
+            raise SystemExit(1)
+
+        start_ids = {}
+        for table, key in PRIMARY_KEYS.items():
+            cursor.execute(f"SELECT COALESCE(MAX({key}), 0) AS max_id FROM {table}")
+            start_ids[table] = cursor.fetchone()['max_id']
+        if start_ids['student'] + args.students >= ID_CARD_CAPACITY:
+            print(f"学生ID超过 {ID_CARD_CAPACITY - 1}，无法生成不重复的身份证号，请减少学生数或使用 --reset")
+            raise SystemExit(1)
+
+        # 生成的数据满足外键约束，写入期间关闭检查以加快导入；
+        # 生成的数据之间不会重复，但可能与表中已有的学号、工号、用户名等重复，只有清空后才关闭唯一性检查
+        cursor.execute("SET SESSION foreign_key_checks = 0")
+        if args.reset:
+            cursor.execute("SET SESSION unique_checks = 0")
+
+        generator = Generator(args, start_ids, title_ids, type_ids)
+        write = load_data_rows if args.method == 'load-data' else insert_rows
+        steps = (
+            ('学院', 'college', generator.colleges_rows),
+            ('班级', 'class', generator.classes_rows),
+            ('教师', 'teacher', generator.teachers_rows),
+            ('课程', 'course', generator.courses_rows),
+            ('授课安排', 'course_offering', generator.offerings_rows),
+            ('学生', 'student', generator.students_rows),
+            ('选课和成绩', 'student_course', generator.enrollments_rows),
+            ('用户账户', 'user', generator.users_rows),
+        )
+        started = time.perf_counter()
+        for label, table, rows in steps:
+            step_started = time.perf_counter()
+            count = write(conn, table, COLUMNS[table], rows(), args.batch_size)
+            print(f"插入{label}数据: {count} 行，用时 {time.perf_counter() - step_started:.1f} 秒")
+
+        cursor.execute("SET SESSION foreign_key_checks = 1, unique_checks = 1")
+        print("更新表统计信息...")
+        cursor.execute("ANALYZE TABLE college, class, teacher, course, course_offering, student, student_course, user")
+        cursor.fetchall()
+        print(f"测试数据生成完成，共用时 {time.perf_counter() - started:.1f} 秒")
+    except pymysql.MySQLError as e:
+        conn.rollback()
+        print(f"生成测试数据失败: {e}")
+        raise SystemExit(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# Gunicorn 生产环境配置
+#
+# 启动方式：python serve.py（或 gunicorn -c gunicorn.conf.py backend.app:app）
+# 各项均可通过环境变量覆盖，容量规划见 README.md 中的“生产环境部署”一节
+import multiprocessing
+import os
+
+# 监听地址
+bind = os.environ.get('SMS_BIND', '0.0.0.0:5000')
+
+# 工作进程数，默认按CPU核数计算
+workers = int(os.environ.get('SMS_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+
+# 每个工作进程的线程数，请求大部分时间在等待MySQL返回，多线程可以提高单进程吞吐
+threads = int(os.environ.get('SMS_THREADS', 4))
+worker_class = 'gthread'
+
+# 每个线程处理请求时占用一个数据库连接，连接池上限不应小于线程数，
+# 未单独配置时按线程数设置（需在加载应用、读取 backend/config.py 之前设置）
+os.environ.setdefault('SMS_DB_POOL_MAX_SIZE', str(threads))
+os.environ.setdefault('SMS_DB_POOL_MIN_SIZE', str(min(2, threads)))
+
+# 生产环境关闭调试模式
+os.environ.setdefault('SMS_DEBUG', '0')
+
+# 在主进程中加载应用后再 fork 工作进程，启动更快、共享只读内存；
+# 数据库连接池和共享版本号文件在工作进程中按进程ID重新建立
+preload_app = True
+
+# 每个工作进程处理一定数量的请求后平滑重启，防止内存持续增长；
+# 加上随机抖动，避免所有工作进程同时重启
+max_requests = int(os.environ.get('SMS_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('SMS_MAX_REQUESTS_JITTER', 200))
+
+# 请求处理超时后工作进程被强制重启；收到 HUP/TERM 后等待进行中的请求完成的最长时间
+timeout = int(os.environ.get('SMS_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('SMS_GRACEFUL_TIMEOUT', 30))
+keepalive = 5
+
+# 主进程ID文件，平滑重启时执行 kill -HUP $(cat 该文件)
+pidfile = os.environ.get('SMS_PIDFILE') or None
+
+# 日志输出到标准输出/标准错误
+accesslog = os.environ.get('SMS_ACCESS_LOG', '-')
+errorlog = os.environ.get('SMS_ERROR_LOG', '-')
+loglevel = os.environ.get('SMS_LOG_LEVEL', 'info')
+
+
+def worker_exit(server, worker):
+    """工作进程退出前写入最后一次指标快照"""
+    from backend.metrics import flush
+    flush(force=True)
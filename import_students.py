@@ -0,0 +1,47 @@
+import argparse
+import csv
+import sys
+
+from backend.student_import import ImportFileError, read_rows, import_students
+
+
+def main():
+    parser = argparse.ArgumentParser(description='从CSV或XLSX文件批量导入学生')
+    parser.add_argument('file', help='导入文件（.csv 或 .xlsx），首行为表头')
+    parser.add_argument('--encoding', default=None, help='CSV文件的编码，默认为 utf-8-sig（带或不带BOM的UTF-8），Excel另存的CSV通常为 gbk')
+    parser.add_argument('--chunk-size', type=int, default=None, help='每批校验和写入的行数')
+    parser.add_argument('--dry-run', action='store_true', help='只校验不写入')
+    parser.add_argument('--errors', default=None, help='把出错的行写入该CSV文件')
+    args = parser.parse_args()
+
+    try:
+        with open(args.file, 'rb') as f:
+            report = import_students(
+                read_rows(f, args.file, args.encoding),
+                chunk_size=args.chunk_size, dry_run=args.dry_run
+            )
+    except (OSError, LookupError, ImportFileError) as e:
+        print(f"读取导入文件失败: {e}")
+        raise SystemExit(1)
+    except Exception as e:
+        print(f"批量导入学生失败: {e}")
+        raise SystemExit(1)
+
+    for error in report['errors']:
+        print(f"第 {error['row']} 行 ({error['student_no'] or '无学号'}): {'；'.join(error['errors'])}")
+    action = '通过校验' if args.dry_run else '导入'
+    print(f"共 {report['total']} 行，{action} {report['imported']} 行，失败 {report['failed']} 行")
+
+    if args.errors and report['errors']:
+        with open(args.errors, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['行号', '学号', '错误'])
+            for error in report['errors']:
+                writer.writerow([error['row'], error['student_no'], '；'.join(error['errors'])])
+        print(f"出错的行已写入 {args.errors}")
+    if report['failed']:
+        sys.exit(2)
+
+
+if __name__ == "__main__":
+    main()
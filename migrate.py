@@ -0,0 +1,33 @@
+import argparse
+
+from backend.migrate import upgrade, status
+
+
+def main():
+    parser = argparse.ArgumentParser(description='数据库迁移工具')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    upgrade_parser = subparsers.add_parser('upgrade', help='执行尚未执行的迁移')
+    upgrade_parser.add_argument('--target', type=int, default=None, help='只升级到指定版本')
+    subparsers.add_parser('status', help='查看各迁移的执行情况')
+
+    args = parser.parse_args()
+
+    if args.command == 'upgrade':
+        try:
+            done = upgrade(args.target)
+        except Exception as e:
+            print(f"数据库迁移失败: {e}")
+            raise SystemExit(1)
+        if done:
+            print(f"已执行 {len(done)} 个迁移")
+        else:
+            print("数据库已是最新版本")
+    else:
+        for item in status():
+            state = f"已执行 ({item['applied_at']})" if item['applied_at'] else "未执行"
+            print(f"{item['version']:03d}_{item['name']}: {state}")
+
+
+if __name__ == "__main__":
+    main()
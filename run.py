@@ -1,3 +1,8 @@
+import os
+
+# 开发服务器默认开启请求SQL检查，打印疑似N+1查询的警告
+os.environ.setdefault('SMS_QUERY_CHECK', 'warn')
+
 from backend.app import app
 
 if __name__ == '__main__':
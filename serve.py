@@ -0,0 +1,42 @@
+import argparse
+import os
+import sys
+
+# Gunicorn 配置文件路径
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gunicorn.conf.py')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='以多进程、多线程方式启动学生信息管理系统（生产环境）')
+    parser.add_argument('--bind', help='监听地址，默认 0.0.0.0:5000')
+    parser.add_argument('--workers', type=int, help='工作进程数，默认 CPU核数*2+1')
+    parser.add_argument('--threads', type=int, help='每个工作进程的线程数，默认 4')
+    parser.add_argument('--max-requests', type=int, help='工作进程处理多少个请求后平滑重启，0 表示不重启，默认 2000')
+    parser.add_argument('--pidfile', help='主进程ID文件，用于 kill -HUP 平滑重启')
+    args = parser.parse_args()
+
+    # 命令行参数通过环境变量传给 gunicorn.conf.py
+    options = {
+        'SMS_BIND': args.bind,
+        'SMS_WORKERS': args.workers,
+        'SMS_THREADS': args.threads,
+        'SMS_MAX_REQUESTS': args.max_requests,
+        'SMS_PIDFILE': args.pidfile,
+    }
+    for name, value in options.items():
+        if value is not None:
+            os.environ[name] = str(value)
+
+    try:
+        from gunicorn.app.wsgiapp import run
+    except ImportError:
+        print("未安装 gunicorn，请先运行 pip install -r requirements.txt（gunicorn 不支持Windows）")
+        raise SystemExit(1)
+
+    # 与命令行执行 gunicorn -c gunicorn.conf.py backend.app:app 相同
+    sys.argv = ['gunicorn', '-c', CONFIG_FILE, 'backend.app:app']
+    run()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import os
+import sqlite3
+import uuid
+
+import pytest
+
+from backend import db
+from tests.fakes import FakeConnection, SqliteConnection
+
+# SqliteConnection 测试用的表结构，只包含测试涉及的表和约束
+SQLITE_SCHEMA = """
+    CREATE TABLE student (
+        student_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        student_no TEXT NOT NULL UNIQUE,
+        name TEXT NOT NULL,
+        gender TEXT NOT NULL,
+        birth_date TEXT,
+        id_card TEXT UNIQUE,
+        enrollment_date TEXT NOT NULL,
+        class_id INTEGER NOT NULL,
+        address TEXT,
+        phone TEXT,
+        email TEXT,
+        status TEXT NOT NULL DEFAULT '在读'
+    );
+    CREATE TABLE user (
+        user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT NOT NULL UNIQUE,
+        password TEXT NOT NULL,
+        role TEXT NOT NULL,
+        related_id INTEGER
+    );
+"""
+
+
+def _install_pool(monkeypatch, creator):
+    pool = db.ConnectionPool(creator=creator, min_size=0, max_size=2)
+    monkeypatch.setattr(db, '_pool', pool)
+    monkeypatch.setattr(db, '_pool_pid', os.getpid())
+    return pool
+
+
+@pytest.fixture
+def fake_pool(monkeypatch):
+    """把进程内连接池换成只记录SQL的假连接，返回执行过的SQL列表"""
+    FakeConnection.executed = []
+    _install_pool(monkeypatch, FakeConnection)
+    return FakeConnection.executed
+
+
+@pytest.fixture
+def sqlite_db(monkeypatch):
+    """把进程内连接池换成内存SQLite数据库的连接，返回用于检查数据的连接"""
+    database = f'file:{uuid.uuid4().hex}?mode=memory&cache=shared'
+    # 保持一个连接打开，内存数据库在最后一个连接关闭后才会销毁
+    keeper = sqlite3.connect(database, uri=True, check_same_thread=False)
+    keeper.executescript(SQLITE_SCHEMA)
+    _install_pool(monkeypatch, lambda: SqliteConnection(database))
+    yield keeper
+    keeper.close()
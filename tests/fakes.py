@@ -0,0 +1,138 @@
+"""测试用的假数据库连接
+
+FakeConnection 只记录执行的SQL、总是返回空结果；
+SqliteConnection 在内存SQLite数据库上执行SQL（把 %s 占位符换成 ?），
+用于需要真实的唯一约束和事务回滚的测试。两者都可以作为 ConnectionPool 的 creator。
+"""
+import sqlite3
+
+
+class FakeCursor:
+    """只记录SQL、总是返回空结果的游标"""
+
+    def __init__(self, executed):
+        self.executed = executed
+        self.lastrowid = None
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        return 0
+
+    def executemany(self, sql, params_list):
+        self.executed.append(sql)
+        return len(params_list)
+
+    def fetchall(self):
+        return []
+
+    def fetchone(self):
+        return None
+
+    def fetchmany(self, size=None):
+        return []
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class FakeConnection:
+    """代替 pymysql 连接，执行的SQL记录在类属性 executed 中
+
+    alive 为False时 ping 失败，用于模拟已断开的连接
+    """
+
+    executed = []
+
+    def __init__(self):
+        self.open = True
+        self.alive = True
+        self.pings = 0
+
+    def cursor(self, cursor_class=None):
+        return FakeCursor(self.executed)
+
+    def ping(self, reconnect=False):
+        self.pings += 1
+        if not self.alive:
+            raise ConnectionError('连接已断开')
+
+    def begin(self):
+        self.executed.append('BEGIN')
+
+    def commit(self):
+        self.executed.append('COMMIT')
+
+    def rollback(self):
+        self.executed.append('ROLLBACK')
+
+    def close(self):
+        self.open = False
+
+
+class SqliteCursor:
+    """在SQLite上执行MySQL风格占位符SQL的游标，结果行为字典"""
+
+    def __init__(self, conn):
+        self._cursor = conn.cursor()
+        self.lastrowid = None
+        self.rowcount = 0
+
+    def execute(self, sql, params=None):
+        self._cursor.execute(sql.replace('%s', '?'), tuple(params or ()))
+        self.lastrowid = self._cursor.lastrowid
+        self.rowcount = self._cursor.rowcount
+        return self.rowcount
+
+    def executemany(self, sql, params_list):
+        self._cursor.executemany(sql.replace('%s', '?'), [tuple(params) for params in params_list])
+        self.rowcount = self._cursor.rowcount
+        return self.rowcount
+
+    def _row(self, row):
+        return dict(zip([column[0] for column in self._cursor.description], row))
+
+    def fetchall(self):
+        return [self._row(row) for row in self._cursor.fetchall()]
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return self._row(row) if row is not None else None
+
+    def close(self):
+        self._cursor.close()
+
+
+class SqliteConnection:
+    """共用同一个内存SQLite数据库的连接，事务由 begin/commit/rollback 显式控制"""
+
+    def __init__(self, database):
+        self._conn = sqlite3.connect(database, uri=True, isolation_level=None, check_same_thread=False)
+        self.open = True
+
+    def cursor(self, cursor_class=None):
+        return SqliteCursor(self._conn)
+
+    def ping(self, reconnect=False):
+        pass
+
+    def begin(self):
+        self._conn.execute('BEGIN')
+
+    def commit(self):
+        if self._conn.in_transaction:
+            self._conn.execute('COMMIT')
+
+    def rollback(self):
+        if self._conn.in_transaction:
+            self._conn.execute('ROLLBACK')
+
+    def close(self):
+        self._conn.close()
+        self.open = False
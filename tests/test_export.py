@@ -0,0 +1,54 @@
+"""列表导出（backend/export.py）的测试
+
+用假连接代替导出连接，检查每个进程同时存在的导出连接数不超过 EXPORT_CONFIG['max_connections']。
+"""
+import threading
+
+import pytest
+
+from backend import export
+from backend.export import ExportBusyError, open_rows
+from tests.fakes import FakeConnection
+
+
+@pytest.fixture
+def connections(monkeypatch):
+    """导出连接上限为1、不等待，返回已建立的假连接列表"""
+    FakeConnection.executed = []
+    created = []
+
+    def create_connection():
+        conn = FakeConnection()
+        created.append(conn)
+        return conn
+    monkeypatch.setattr(export, 'create_connection', create_connection)
+    monkeypatch.setattr(export, '_connection_slots', threading.BoundedSemaphore(1))
+    monkeypatch.setitem(export.EXPORT_CONFIG, 'acquire_timeout', 0)
+    return created
+
+
+def test_limits_concurrent_connections(connections):
+    rows = open_rows('SELECT 1', ())
+    with pytest.raises(ExportBusyError):
+        open_rows('SELECT 1', ())
+    assert len(connections) == 1
+
+    rows.close()
+    rows.close()
+    assert not connections[0].open
+    open_rows('SELECT 1', ()).close()
+    assert len(connections) == 2
+
+
+def test_failed_connection_releases_slot(connections, monkeypatch):
+    def refuse():
+        raise ConnectionError('无法连接')
+    create_connection = export.create_connection
+    monkeypatch.setattr(export, 'create_connection', refuse)
+    with pytest.raises(ConnectionError):
+        open_rows('SELECT 1', ())
+
+    monkeypatch.setattr(export, 'create_connection', create_connection)
+    rows = open_rows('SELECT 1', ())
+    assert list(rows) == []
+    rows.close()
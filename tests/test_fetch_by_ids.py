@@ -0,0 +1,60 @@
+"""按主键批量查询（backend/models.py 中的 _fetch_by_ids、_fetch_id_page）的测试
+
+使用内存SQLite数据库（conftest.py 中的 sqlite_db），把 ID_CHUNK_SIZE 调小以检查分块。
+"""
+import pytest
+
+from backend import models
+from backend.models import Database, _fetch_by_ids, _fetch_id_page
+
+SELECT_SQL = "SELECT s.student_id, s.name FROM student s"
+
+
+@pytest.fixture
+def database(sqlite_db, monkeypatch):
+    """插入5个学生，每块2个ID，返回记录了执行SQL的 Database"""
+    for i in range(1, 6):
+        sqlite_db.execute(
+            "INSERT INTO student (student_no, name, gender, enrollment_date, class_id) VALUES (?, ?, '男', '2023-09-01', 1)",
+            (f'S{i:03d}', f'学生{i}')
+        )
+    sqlite_db.commit()
+    monkeypatch.setattr(models, 'ID_CHUNK_SIZE', 2)
+
+    database = Database()
+    database.queries = []
+    execute_query = database.execute_query
+
+    def recording_query(sql, params=None):
+        database.queries.append(params)
+        return execute_query(sql, params)
+    database.execute_query = recording_query
+    return database
+
+
+def test_chunks_ids(database):
+    rows = _fetch_by_ids(database, SELECT_SQL, 's.student_id', [1, 2, 3, 4, 5])
+    assert database.queries == [(1, 2), (3, 4), (5,)]
+    assert {student_id: row['name'] for student_id, row in rows.items()} == {
+        1: '学生1', 2: '学生2', 3: '学生3', 4: '学生4', 5: '学生5'
+    }
+
+
+def test_deduplicates_ids(database):
+    rows = _fetch_by_ids(database, SELECT_SQL, 's.student_id', [3, 1, 3, 1, 3])
+    assert database.queries == [(3, 1)]
+    assert sorted(rows) == [1, 3]
+
+
+def test_missing_and_empty_ids(database):
+    assert sorted(_fetch_by_ids(database, SELECT_SQL, 's.student_id', [2, 99])) == [2]
+    database.queries.clear()
+    assert _fetch_by_ids(database, SELECT_SQL, 's.student_id', []) == {}
+    assert database.queries == []
+
+
+def test_id_page_keeps_index_order(database):
+    rows, total = _fetch_id_page(database, SELECT_SQL, 's.student_id', [1, 2, 4, 5, 99], page=2, items_per_page=2)
+    assert [row['student_id'] for row in rows] == [4, 5]
+    assert total == 5
+    assert database.queries == [(4, 5)]
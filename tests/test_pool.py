@@ -0,0 +1,169 @@
+"""数据库连接池（backend/db.py 中的 ConnectionPool、get_pool）的测试
+
+连接池的 creator 换成不连接MySQL的假连接（tests/fakes.py 中的 FakeConnection）；
+空闲淘汰和存活检测用可手动推进的时钟代替 time.monotonic。
+"""
+import os
+import threading
+import types
+
+import pytest
+
+from backend import db
+from backend.db import ConnectionPool, PoolTimeoutError
+from tests.fakes import FakeConnection
+
+
+class Clock:
+    """手动推进的 time.monotonic"""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(db, 'time', types.SimpleNamespace(monotonic=clock))
+    return clock
+
+
+def test_checkout_and_return():
+    pool = ConnectionPool(creator=FakeConnection, min_size=0, max_size=2)
+    first = pool.acquire()
+    second = pool.acquire()
+    assert first is not second
+    assert pool.stats()['in_use'] == 2
+
+    pool.release(second)
+    assert pool.acquire() is second
+    pool.release(second)
+    pool.release(first)
+    stats = pool.stats()
+    assert (stats['size'], stats['idle'], stats['in_use']) == (2, 2, 0)
+    assert (stats['created'], stats['acquired'], stats['reused']) == (2, 3, 1)
+
+    # 最近归还的连接最先借出
+    assert pool.acquire() is first
+
+
+def test_release_discard_and_closed_connections():
+    pool = ConnectionPool(creator=FakeConnection, min_size=0, max_size=2)
+    broken = pool.acquire()
+    pool.release(broken, discard=True)
+    assert not broken.open
+
+    closed = pool.acquire()
+    closed.close()
+    pool.release(closed)
+    stats = pool.stats()
+    assert (stats['size'], stats['idle'], stats['closed']) == (0, 0, 2)
+
+
+def test_timeout_when_exhausted():
+    pool = ConnectionPool(creator=FakeConnection, min_size=0, max_size=1, acquire_timeout=0.05)
+    pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0)
+    stats = pool.stats()
+    assert (stats['size'], stats['timeouts']) == (1, 2)
+
+
+def test_blocks_until_connection_returned():
+    pool = ConnectionPool(creator=FakeConnection, min_size=0, max_size=1)
+    conn = pool.acquire()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(pool.acquire(timeout=5)))
+    waiter.start()
+    waiter.join(0.1)
+    assert waiter.is_alive()
+
+    pool.release(conn)
+    waiter.join(5)
+    assert result == [conn]
+    assert pool.stats()['waits'] >= 1
+    assert pool.stats()['created'] == 1
+
+
+def test_idle_eviction_keeps_min_size(clock):
+    pool = ConnectionPool(creator=FakeConnection, min_size=1, max_size=3, idle_timeout=300, ping_interval=1000)
+    conns = [pool.acquire() for _ in range(3)]
+    for conn in conns:
+        pool.release(conn)
+
+    clock.now += 301
+    kept = pool.acquire()
+    # 多余的空闲连接被关闭，保留 min_size 个
+    assert sum(not conn.open for conn in conns) == 2
+    assert kept.open
+    stats = pool.stats()
+    assert (stats['size'], stats['closed']) == (1, 2)
+
+
+def test_no_eviction_before_idle_timeout(clock):
+    pool = ConnectionPool(creator=FakeConnection, min_size=0, max_size=2, idle_timeout=300, ping_interval=1000)
+    conns = [pool.acquire() for _ in range(2)]
+    for conn in conns:
+        pool.release(conn)
+
+    clock.now += 299
+    assert pool.acquire() is conns[1]
+    assert all(conn.open for conn in conns)
+
+
+def test_ping_before_reuse(clock):
+    pool = ConnectionPool(creator=FakeConnection, min_size=0, max_size=2, ping_interval=30)
+    conn = pool.acquire()
+    pool.release(conn)
+
+    # 空闲时间未超过 ping_interval 时不检测
+    clock.now += 10
+    assert pool.acquire() is conn
+    assert conn.pings == 0
+    pool.release(conn)
+
+    clock.now += 31
+    assert pool.acquire() is conn
+    assert conn.pings == 1
+    pool.release(conn)
+
+
+def test_dead_connection_discarded(clock):
+    pool = ConnectionPool(creator=FakeConnection, min_size=0, max_size=2, ping_interval=30)
+    dead = pool.acquire()
+    pool.release(dead)
+    dead.alive = False
+
+    clock.now += 31
+    conn = pool.acquire()
+    assert conn is not dead
+    assert not dead.open
+    stats = pool.stats()
+    assert (stats['size'], stats['ping_failures'], stats['created']) == (1, 1, 2)
+
+
+def test_get_pool_recreated_after_fork(monkeypatch):
+    monkeypatch.setitem(db.DB_POOL_CONFIG, 'creator', FakeConnection)
+    monkeypatch.setitem(db.DB_POOL_CONFIG, 'min_size', 1)
+    monkeypatch.setattr(db, '_pool', None)
+    monkeypatch.setattr(db, '_pool_pid', None)
+
+    pool = db.get_pool()
+    assert db.get_pool() is pool
+    assert pool.stats()['idle'] == 1
+    inherited = pool._idle[0][0]
+
+    # 模拟 fork 后的子进程：连接池由其他进程ID创建
+    monkeypatch.setattr(db, '_pool_pid', os.getpid() + 1)
+    assert db.pool_stats() is None
+    child_pool = db.get_pool()
+    assert child_pool is not pool
+    assert db._pool_pid == os.getpid()
+    assert child_pool.stats()['idle'] == 1
+    # 继承来的连接不关闭，以免断开父进程的连接
+    assert inherited.open
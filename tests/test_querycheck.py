@@ -0,0 +1,80 @@
+"""请求SQL检查（backend/querycheck.py）的测试
+
+用不连接MySQL的假连接替换连接池（conftest.py 中的 fake_pool），视图照常通过 Database 执行SQL并通知监听器，
+在 raise 模式下检查超出 query_budget 或疑似N+1查询的请求会抛出 QueryBudgetExceeded。
+"""
+import pytest
+
+from backend.app import create_app
+from backend.models import Database
+from backend.querycheck import QueryBudgetExceeded
+from backend.utils import query_budget
+
+
+def _run_queries(count, sql='SELECT * FROM student WHERE student_id = %s'):
+    database = Database()
+    for i in range(count):
+        database.execute_query(sql, (i,))
+
+
+@pytest.fixture
+def client(fake_pool):
+    """raise 模式的应用，注册几个执行指定条数SQL的视图"""
+    app = create_app({'TESTING': True, 'QUERY_CHECK_MODE': 'raise', 'QUERY_REPEAT_THRESHOLD': 5})
+
+    @app.route('/api/_test/one')
+    @query_budget(1)
+    def one_query():
+        _run_queries(1)
+        return {'ok': True}
+
+    @app.route('/api/_test/over')
+    @query_budget(1)
+    def over_budget():
+        _run_queries(2, 'SELECT * FROM course WHERE course_id = %s')
+        return {'ok': True}
+
+    @app.route('/api/_test/loop')
+    def n_plus_one():
+        _run_queries(6)
+        return {'ok': True}
+
+    client = app.test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['role'] = 'admin'
+    return client
+
+
+def test_within_budget(client, fake_pool):
+    response = client.get('/api/_test/one')
+    assert response.status_code == 200
+    assert len(fake_pool) == 1
+
+
+def test_budget_exceeded_raises(client):
+    with pytest.raises(QueryBudgetExceeded, match='超出预算 1 条'):
+        client.get('/api/_test/over')
+
+
+def test_repeated_query_shape_raises(client):
+    with pytest.raises(QueryBudgetExceeded, match='疑似N\\+1查询'):
+        client.get('/api/_test/loop')
+
+
+def test_batch_sums_sub_request_budgets(client, fake_pool):
+    # 两个子请求各执行1条SQL，各自的预算为1条，合计2条，未超出
+    response = client.post('/api/batch', json={'requests': [
+        {'path': '/api/_test/one'}, {'path': '/api/_test/one'}
+    ]})
+    assert response.status_code == 200
+    assert [item['status'] for item in response.get_json()['responses']] == [200, 200]
+    assert len(fake_pool) == 2
+
+
+def test_batch_budget_exceeded_raises(client):
+    # 预算合计2条，实际执行3条
+    with pytest.raises(QueryBudgetExceeded, match='超出预算 2 条'):
+        client.post('/api/batch', json={'requests': [
+            {'path': '/api/_test/one'}, {'path': '/api/_test/over'}
+        ]})
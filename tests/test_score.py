@@ -0,0 +1,46 @@
+"""更新成绩（PUT /api/score/<sc_id>）的校验测试
+
+用假连接（conftest.py 中的 fake_pool）执行，检查部分更新按 validate_score 的规则校验，
+通过校验的请求执行对应的更新语句。
+"""
+import pytest
+
+from backend.app import create_app
+
+
+@pytest.fixture
+def client(fake_pool):
+    client = create_app({'TESTING': True}).test_client()
+    with client.session_transaction() as session:
+        session['user_id'] = 1
+        session['role'] = 'teacher'
+    return client
+
+
+@pytest.mark.parametrize('body, error', [
+    ({}, '请提供成绩或状态'),
+    ([80], '请提供成绩或状态'),
+    ({'score': 101}, '成绩必须在0-100之间'),
+    ({'score': True}, '成绩必须是数字'),
+    ({'score': 'abc'}, '成绩必须是数字'),
+    ({'score': None}, '已修完状态必须填写成绩'),
+    ({'status': '已修完'}, '已修完状态必须填写成绩'),
+    ({'status': '在修'}, '状态必须是 选课中、已修完、已取消 之一'),
+    ({'score': -1, 'status': '已修完'}, '成绩必须在0-100之间'),
+])
+def test_invalid_update_rejected(client, fake_pool, body, error):
+    response = client.put('/api/score/1', json=body)
+    assert response.status_code == 400
+    assert response.get_json() == {'error': error}
+    assert not any('UPDATE student_course' in sql for sql in fake_pool)
+
+
+@pytest.mark.parametrize('body, statement', [
+    ({'score': '85.5'}, "SET score = %s, status = '已修完'"),
+    ({'status': '已取消'}, 'SET score = NULL, status = %s'),
+    ({'score': 90, 'status': '已修完'}, 'SET score = %s, status = %s'),
+    ({'score': 90, 'status': '选课中'}, 'SET score = %s, status = %s'),
+])
+def test_partial_update_statement(client, fake_pool, body, statement):
+    client.put('/api/score/1', json=body)
+    assert [sql for sql in fake_pool if 'UPDATE student_course' in sql and statement in sql]
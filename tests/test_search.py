@@ -0,0 +1,97 @@
+"""进程内搜索索引（backend/search.py）的测试"""
+import uuid
+
+from backend.cache import bump_table_versions
+from backend.search import BigramIndex, SearchIndex, page_ids
+
+
+def _index(docs):
+    index = BigramIndex()
+    for doc_id, values in docs.items():
+        index.add(doc_id, values)
+    return index
+
+
+def test_bigram_search_substring_and_case():
+    index = _index({1: ['张三', 'S2021001'], 2: ['李四', 's2021002'], 3: ['张三丰', 'T001']})
+    assert index.search('张三') == [1, 3]
+    assert index.search('三丰') == [3]
+    assert index.search('s2021') == [1, 2]
+    assert index.search('S2021002') == [2]
+    assert index.search('王五') == []
+
+
+def test_bigram_search_single_char_and_empty_query():
+    index = _index({1: ['张三', 'S1'], 2: ['李四', 'S2']})
+    assert index.search('四') == [2]
+    assert index.search('s') == [1, 2]
+    assert index.search('') == [1, 2]
+
+
+def test_bigram_search_requires_contiguous_match():
+    # 关键词的二元组“ab”“bc”都出现，但“abc”并不连续出现
+    index = _index({1: ['ab-bc']})
+    assert index.search('abc') == []
+
+
+def test_bigram_add_replaces_and_remove_prunes():
+    index = _index({1: ['张三', 'S1']})
+    index.add(1, ['李四', 'S1'])
+    assert index.search('张') == []
+    assert index.search('李四') == [1]
+    index.remove(1)
+    index.remove(1)
+    assert len(index) == 0
+    assert index.search('李') == []
+    assert not index._postings
+    assert not index._char_bigrams
+
+
+def test_page_ids_page_mode():
+    ids = list(range(1, 26))
+    assert page_ids(ids, page=1, items_per_page=10) == (list(range(1, 11)), 25)
+    assert page_ids(ids, page=3, items_per_page=10) == ([21, 22, 23, 24, 25], 25)
+    assert page_ids(ids, page=4, items_per_page=10) == ([], 25)
+
+
+def test_page_ids_cursor_mode():
+    ids = [2, 4, 6, 8, 10]
+    assert page_ids(ids, items_per_page=2, after=0) == ([2, 4], 4)
+    assert page_ids(ids, items_per_page=2, after=4) == ([6, 8], 8)
+    assert page_ids(ids, items_per_page=2, after=8) == ([10], None)
+    assert page_ids(ids, items_per_page=2, after=5) == ([6, 8], 8)
+
+
+def _search_index():
+    """使用独立表名的索引，返回 (索引, 表名, 数据, 加载次数列表)"""
+    table = f'test_{uuid.uuid4().hex[:8]}'
+    rows = {1: '张三'}
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [{'id': doc_id, 'name': name} for doc_id, name in rows.items()]
+    return SearchIndex(loader, 'id', ('name',), table=table, refresh_interval=0), table, rows, loads
+
+
+def test_own_writes_do_not_rebuild():
+    index, table, rows, loads = _search_index()
+    assert index.search('张') == [1]
+    # 本进程写入：写语句递增版本号，提交后增量同步到索引
+    bump_table_versions(table)
+    rows[2] = '张四'
+    index.update({'id': 2, 'name': '张四'})
+    assert index.search('张') == [1, 2]
+    assert len(loads) == 1
+
+
+def test_other_process_writes_rebuild():
+    index, table, rows, loads = _search_index()
+    assert index.search('张') == [1]
+    # 其他进程写入：只有版本号变化，本进程的索引没有增量同步
+    rows[3] = '张五'
+    bump_table_versions(table)
+    assert index.search('张') == [1, 3]
+    assert len(loads) == 2
+    assert index.search('张') == [1, 3]
+    assert len(loads) == 2
@@ -0,0 +1,68 @@
+"""学生记录与登录账户同步的测试
+
+添加学生时同时创建以学号为用户名的登录账户，删除学生时删除该账户，修改学号时同步修改用户名；
+使用内存SQLite数据库（conftest.py 中的 sqlite_db），唯一约束和事务回滚与MySQL一致。
+"""
+import pytest
+
+from backend.app import create_app
+from backend.models import Student
+
+
+@pytest.fixture
+def app(sqlite_db):
+    app = create_app({'TESTING': True})
+    with app.app_context():
+        yield app
+
+
+def _student(student_no='S001', id_card=None):
+    return {
+        'student_no': student_no, 'name': '张三', 'gender': '男', 'birth_date': '2005-01-01',
+        'id_card': id_card, 'enrollment_date': '2023-09-01', 'class_id': 1,
+        'address': None, 'phone': None, 'email': None, 'status': '在读',
+    }
+
+
+def _accounts(sqlite_db):
+    return sqlite_db.execute("SELECT username, role, related_id FROM user ORDER BY user_id").fetchall()
+
+
+def test_add_delete_readd(app, sqlite_db):
+    student_model = Student()
+    student_id = student_model.add_student_with_account(_student())
+    assert student_id
+    assert _accounts(sqlite_db) == [('S001', 'student', student_id)]
+
+    assert student_model.delete_student(student_id)
+    assert _accounts(sqlite_db) == []
+    assert sqlite_db.execute("SELECT COUNT(*) FROM student").fetchone() == (0,)
+
+    # 学号对应的用户名已随学生删除，重新添加同一学号不会因用户名重复而失败
+    new_id = student_model.add_student_with_account(_student())
+    assert new_id and new_id != student_id
+    assert _accounts(sqlite_db) == [('S001', 'student', new_id)]
+
+
+def test_add_rolls_back_when_username_taken(app, sqlite_db):
+    sqlite_db.execute("INSERT INTO user (username, password, role) VALUES ('S001', 'x', 'teacher')")
+    sqlite_db.commit()
+    assert Student().add_student_with_account(_student()) is False
+    assert sqlite_db.execute("SELECT COUNT(*) FROM student").fetchone() == (0,)
+
+
+def test_update_renames_account(app, sqlite_db):
+    student_model = Student()
+    student_id = student_model.add_student_with_account(_student())
+    assert student_model.update_student(student_id, _student('S002'))
+    assert _accounts(sqlite_db) == [('S002', 'student', student_id)]
+
+
+def test_update_rolls_back_when_username_taken(app, sqlite_db):
+    student_model = Student()
+    student_id = student_model.add_student_with_account(_student())
+    sqlite_db.execute("INSERT INTO user (username, password, role) VALUES ('T100', 'x', 'teacher')")
+    sqlite_db.commit()
+    assert student_model.update_student(student_id, _student('T100')) is False
+    assert sqlite_db.execute("SELECT student_no FROM student").fetchall() == [('S001',)]
+    assert ('S001', 'student', student_id) in _accounts(sqlite_db)
@@ -0,0 +1,40 @@
+"""学生导入逐行重试（backend/student_import.py 中的 _insert_individually）的测试
+
+用假连接（conftest.py 中的 fake_pool）执行，add_student 按学号抛出指定的数据库异常，
+检查错误报告中只有固定的错误信息，不包含数据库异常原文。
+"""
+import pytest
+from pymysql.err import IntegrityError, OperationalError
+
+from backend import student_import
+from backend.models import Student
+
+
+@pytest.fixture
+def failing_add(fake_pool, monkeypatch):
+    """学号到 add_student 抛出的异常的映射"""
+    errors = {}
+
+    def add_student(self, data):
+        if data['student_no'] in errors:
+            raise errors[data['student_no']]
+        return True
+    monkeypatch.setattr(Student, 'add_student', add_student)
+    return errors
+
+
+def test_row_errors_hide_database_messages(failing_add):
+    failing_add['S002'] = IntegrityError(1062, "Duplicate entry 'S002' for key 'student_no'")
+    failing_add['S003'] = IntegrityError(1452, 'Cannot add or update a child row: a foreign key constraint fails')
+    failing_add['S004'] = OperationalError(1205, 'Lock wait timeout exceeded')
+    rows = [(line, {'student_no': f'S{line - 1:03d}'}) for line in range(2, 6)]
+    report = student_import._ImportReport(dry_run=False)
+
+    student_import._insert_individually(rows, '123456', report)
+
+    assert report.imported == 1
+    assert report.errors == [
+        {'row': 3, 'student_no': 'S002', 'errors': ['学号或身份证号已存在']},
+        {'row': 4, 'student_no': 'S003', 'errors': ['写入失败']},
+        {'row': 5, 'student_no': 'S004', 'errors': ['写入失败']},
+    ]